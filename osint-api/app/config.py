@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Literal
 import json
 
 
@@ -20,6 +20,29 @@ class Settings(BaseSettings):
 
     ALLOWED_ORIGINS: List[str] = ["*"]
 
+    # Tweet list totals: "exact" COUNT(*), "estimated" from planner statistics,
+    # or "cached" exact counts per theme reused for TWEET_COUNT_CACHE_TTL seconds
+    TWEET_COUNT_STRATEGY: Literal["exact", "estimated", "cached"] = "exact"
+    TWEET_COUNT_CACHE_TTL: int = 300
+    # theme_code comes from the request, so the "cached" totals are an LRU of this size
+    TWEET_COUNT_CACHE_MAX_ENTRIES: int = 1000
+
+    # Text search configs OR-ed together when a search has no language filter
+    SEARCH_TEXT_CONFIGS: List[str] = ["simple", "english", "arabic"]
+
+    # How often the in-memory refined topic catalog checks for a new refinement run
+    TOPIC_CATALOG_CHECK_SECONDS: int = 30
+
+    # In-memory user_network graph (/analytics/network/k-hop, /pagerank, /degree):
+    # how often to check last_seen for new rows, and how often to reload from scratch
+    NETWORK_GRAPH_CHECK_SECONDS: int = 300
+    NETWORK_GRAPH_FULL_RELOAD_SECONDS: int = 86400
+    # Start loading the graph when the API starts instead of on the first request
+    NETWORK_GRAPH_WARM_ON_STARTUP: bool = True
+    # user_network.target_type values whose target_id is a user id (shares nodes with source_user_id)
+    NETWORK_GRAPH_USER_TARGET_TYPES: List[str] = ["user"]
+    NETWORK_GRAPH_MAX_KHOP_NODES: int = 100000
+
     # Table names
     TWEETS_TABLE: str = "tweets_deduplicated"
     COLLECTIONS_TABLE: str = "tweet_collections"
@@ -34,6 +57,10 @@ class Settings(BaseSettings):
     TWEET_TOPICS_TABLE: str = "tweet_topics"
     AUTHOR_TOPICS_TABLE: str = "author_topics"
     TOPIC_EVOLUTION_TABLE: str = "topic_evolution"
+    THEME_TOPIC_DAILY_TABLE: str = "theme_topic_daily"
+    TOPIC_AUTHOR_FIRST_SEEN_TABLE: str = "topic_author_first_seen"
+    AUTHOR_INTELLIGENCE_TABLE: str = "author_intelligence"
+    AUTHOR_COMMUNITIES_TABLE: str = "author_communities"
 
     class Config:
         env_file = ".env"
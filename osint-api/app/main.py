@@ -1,8 +1,11 @@
+import asyncio
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
 from app.config import settings
+from app.repositories.network_graph import network_graph
 from app.routers import tweets, themes, projects, analytics, monitored_users, topics, topic_analytics
 
 
@@ -10,9 +13,15 @@ from app.routers import tweets, themes, projects, analytics, monitored_users, to
 async def lifespan(app: FastAPI):
     # Startup
     print("Starting OSINT Monitoring API...")
+    warm_up = None
+    if settings.NETWORK_GRAPH_WARM_ON_STARTUP:
+        # In the background so the API accepts requests while the graph loads
+        warm_up = asyncio.create_task(network_graph.warm())
     yield
     # Shutdown
     print("Shutting down OSINT Monitoring API...")
+    if warm_up is not None:
+        warm_up.cancel()
 
 
 # Create FastAPI app
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, DateTime, Text
+from sqlalchemy import Column, String, Integer, BigInteger, Float, Date, DateTime, Text
 from app.database import Base
 from app.config import settings
 
@@ -21,4 +21,43 @@ class UserNetwork(Base):
     expanded_url = Column(Text)
 
     first_seen = Column(DateTime(timezone=True))
-    last_seen = Column(DateTime(timezone=True))
\ No newline at end of file
+    last_seen = Column(DateTime(timezone=True))
+
+
+class AuthorIntelligence(Base):
+    __tablename__ = settings.AUTHOR_INTELLIGENCE_TABLE
+    __table_args__ = {"schema": settings.POSTGRES_SCHEMA}
+
+    analysis_date = Column(Date, primary_key=True)
+    author_id = Column(BigInteger, primary_key=True)
+    analysis_period = Column(String, primary_key=True)
+
+    influence_score = Column(Float)
+    authority_score = Column(Float)
+    coordination_risk_score = Column(Float)
+    betweenness_centrality = Column(Float)
+    network_reach = Column(Integer)
+    cross_reference_rate = Column(Float)
+    semantic_diversity_score = Column(Float)
+    hashtag_coordination_score = Column(Float)
+    monitoring_priority_score = Column(Float)
+    amplification_factor = Column(Float)
+
+    computed_at = Column(DateTime(timezone=True))
+
+
+class AuthorCommunity(Base):
+    """Louvain community assignments written by scripts/intel_computation/compute_communities.py"""
+    __tablename__ = settings.AUTHOR_COMMUNITIES_TABLE
+    __table_args__ = {"schema": settings.POSTGRES_SCHEMA}
+
+    analysis_date = Column(Date, primary_key=True)
+    analysis_window = Column(String, primary_key=True)
+    author_id = Column(String, primary_key=True)
+
+    community_id = Column(Integer, nullable=False)
+    community_size = Column(Integer, nullable=False)
+    weighted_degree = Column(Float)
+    modularity = Column(Float, nullable=False)
+
+    computed_at = Column(DateTime(timezone=True))
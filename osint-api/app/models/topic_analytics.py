@@ -1,9 +1,19 @@
-from sqlalchemy import Column, String, Integer, Float, DateTime, Boolean, UniqueConstraint
+from sqlalchemy import Column, String, Integer, Float, DateTime, Date, Boolean, UniqueConstraint
 from sqlalchemy.dialects.postgresql import JSONB, ARRAY
+from sqlalchemy.orm import deferred
+from sqlalchemy.types import UserDefinedType
 from app.database import Base
 from app.config import settings
 
 
+class HLL(UserDefinedType):
+    """postgres-hll sketch; only read through hll_* SQL functions"""
+    cache_ok = True
+
+    def get_col_spec(self, **kw):
+        return "hll"
+
+
 class TweetTopic(Base):
     __tablename__ = settings.TWEET_TOPICS_TABLE
     __table_args__ = {"schema": settings.POSTGRES_SCHEMA}
@@ -50,9 +60,36 @@ class TopicEvolution(Base):
     hour = Column(Integer, nullable=False)
     tweet_count = Column(Integer)
     unique_authors = Column(Integer)
+    # Hourly unique-author sketch; merged with hll_union_agg for wider windows
+    authors = deferred(Column(HLL))
     new_authors = Column(Integer)
     avg_probability = Column(Float)
     top_keywords = Column(JSONB)
     total_engagement = Column(Integer)
     viral_tweets = Column(Integer)
-    growth_rate = Column(Float)
\ No newline at end of file
+    growth_rate = Column(Float)
+
+
+class ThemeTopicDaily(Base):
+    __tablename__ = settings.THEME_TOPIC_DAILY_TABLE
+    __table_args__ = {"schema": settings.POSTGRES_SCHEMA}
+
+    date = Column(Date, primary_key=True)
+    theme_code = Column(String, primary_key=True)
+    theme_name = Column(String)
+    topic_id = Column(Integer, primary_key=True)
+    tweet_count = Column(Integer)
+    probability_sum = Column(Float)
+    authors = Column(HLL)
+    computed_at = Column(DateTime(timezone=True))
+
+
+class TopicAuthorFirstSeen(Base):
+    __tablename__ = settings.TOPIC_AUTHOR_FIRST_SEEN_TABLE
+    __table_args__ = {"schema": settings.POSTGRES_SCHEMA}
+
+    topic_id = Column(Integer, primary_key=True)
+    author_id = Column(String, primary_key=True)
+    first_seen = Column(DateTime(timezone=True))
+    first_tweet_id = Column(String)
+    updated_at = Column(DateTime(timezone=True))
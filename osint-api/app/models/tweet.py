@@ -1,5 +1,6 @@
 from sqlalchemy import Column, String, Integer, DateTime, Text, Boolean, Numeric, BigInteger
-from sqlalchemy.dialects.postgresql import ARRAY, JSONB
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, TSVECTOR
+from sqlalchemy.orm import deferred
 from app.database import Base
 from app.config import settings
 
@@ -61,4 +62,7 @@ class Tweet(Base):
 
     # Timestamps
     fetched_at = Column(DateTime(timezone=True))
-    processed_at = Column(DateTime(timezone=True))
\ No newline at end of file
+    processed_at = Column(DateTime(timezone=True))
+
+    # Full-text search (scripts/tweet_search); deferred so it is never loaded with rows
+    search_vector = deferred(Column(TSVECTOR))
\ No newline at end of file
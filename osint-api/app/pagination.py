@@ -0,0 +1,60 @@
+import base64
+from datetime import datetime
+from typing import Optional, Tuple, List
+
+from fastapi import HTTPException
+from sqlalchemy import desc, tuple_
+
+from app.models.tweet import Tweet
+
+
+def encode_cursor(created_at: datetime, tweet_id: str) -> str:
+    """Encode a (created_at, tweet_id) position as an opaque cursor string"""
+    raw = f"{created_at.isoformat()}|{tweet_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Decode a cursor string back into (created_at, tweet_id); raises ValueError if malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        created_at, tweet_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), tweet_id
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def parse_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, str]]:
+    """Decode a cursor query parameter, answering 400 if it is malformed"""
+    if not cursor:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def next_cursor(tweets: List[Tweet], limit: int) -> Optional[str]:
+    """Cursor pointing after the last tweet of a full page, or None on the last page"""
+    if len(tweets) < limit or not tweets:
+        return None
+    last = tweets[-1]
+    if last.created_at is None:
+        return None
+    return encode_cursor(last.created_at, last.tweet_id)
+
+
+def apply_keyset(query, after: Optional[Tuple[datetime, str]], limit: int, offset: int = 0):
+    """
+    Order a tweet query newest-first and page it.
+    With a cursor, seek past (created_at, tweet_id) instead of scanning OFFSET rows.
+    """
+    if after:
+        query = query.filter(tuple_(Tweet.created_at, Tweet.tweet_id) < tuple_(*after))
+
+    query = query.order_by(desc(Tweet.created_at), desc(Tweet.tweet_id)).limit(limit)
+
+    if offset and not after:
+        query = query.offset(offset)
+    return query
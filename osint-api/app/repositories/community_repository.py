@@ -0,0 +1,196 @@
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, and_, cast, String
+
+from app.models.network import AuthorCommunity, AuthorIntelligence
+from app.models.profile import UserProfile
+
+
+class CommunityRepository:
+    """Read side of author_communities, rolled up per community"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    def _intelligence_join(self):
+        # Same author, date and window as the community run
+        return and_(
+            cast(AuthorIntelligence.author_id, String) == AuthorCommunity.author_id,
+            AuthorIntelligence.analysis_date == AuthorCommunity.analysis_date,
+            AuthorIntelligence.analysis_period == AuthorCommunity.analysis_window
+        )
+
+    async def get_latest_date(self, window: str) -> Optional[date]:
+        """Most recent analysis_date with community assignments for `window`"""
+        query = (
+            select(func.max(AuthorCommunity.analysis_date))
+            .filter(AuthorCommunity.analysis_window == window)
+        )
+        result = await self.db.execute(query)
+        return result.scalar()
+
+    async def get_communities(
+        self,
+        window: str,
+        analysis_date: date,
+        min_size: int = 2,
+        limit: int = 50,
+        offset: int = 0,
+        top_members: int = 5
+    ) -> Tuple[List[Dict[str, Any]], int, Optional[float]]:
+        """
+        Communities of one run, largest first, with member intelligence
+        rollups and their most connected members.
+        Returns (communities, total matching communities, modularity).
+        """
+        run_filter = and_(
+            AuthorCommunity.analysis_window == window,
+            AuthorCommunity.analysis_date == analysis_date,
+            AuthorCommunity.community_size >= min_size
+        )
+
+        summary = await self.db.execute(
+            select(
+                func.count(func.distinct(AuthorCommunity.community_id)),
+                func.max(AuthorCommunity.modularity)
+            ).filter(run_filter)
+        )
+        total, modularity = summary.one()
+
+        rollup_query = (
+            select(
+                AuthorCommunity.community_id,
+                func.count().label('size'),
+                func.sum(AuthorCommunity.weighted_degree).label('total_weighted_degree'),
+                func.count(AuthorIntelligence.author_id).label('scored_authors'),
+                func.avg(AuthorIntelligence.coordination_risk_score).label('avg_coordination_risk'),
+                func.max(AuthorIntelligence.coordination_risk_score).label('max_coordination_risk'),
+                func.avg(AuthorIntelligence.influence_score).label('avg_influence'),
+                func.max(AuthorIntelligence.betweenness_centrality).label('max_betweenness')
+            )
+            .outerjoin(AuthorIntelligence, self._intelligence_join())
+            .filter(run_filter)
+            .group_by(AuthorCommunity.community_id)
+            .order_by(AuthorCommunity.community_id)
+            .limit(limit)
+            .offset(offset)
+        )
+        rows = (await self.db.execute(rollup_query)).all()
+
+        community_ids = [row.community_id for row in rows]
+        members = await self._top_members(window, analysis_date, community_ids, top_members)
+
+        communities = [
+            {
+                'community_id': row.community_id,
+                'size': row.size,
+                'total_weighted_degree': float(row.total_weighted_degree or 0),
+                'scored_authors': row.scored_authors,
+                'avg_coordination_risk': row.avg_coordination_risk,
+                'max_coordination_risk': row.max_coordination_risk,
+                'avg_influence': row.avg_influence,
+                'max_betweenness': row.max_betweenness,
+                'top_members': members.get(row.community_id, [])
+            }
+            for row in rows
+        ]
+        return communities, total, modularity
+
+    async def _top_members(
+        self,
+        window: str,
+        analysis_date: date,
+        community_ids: List[int],
+        per_community: int
+    ) -> Dict[int, List[Dict[str, Any]]]:
+        """Highest weighted-degree members of each community"""
+        if not community_ids or per_community <= 0:
+            return {}
+
+        ranked = (
+            select(
+                AuthorCommunity.community_id,
+                AuthorCommunity.author_id,
+                AuthorCommunity.weighted_degree,
+                func.row_number().over(
+                    partition_by=AuthorCommunity.community_id,
+                    order_by=AuthorCommunity.weighted_degree.desc()
+                ).label('rank')
+            )
+            .filter(
+                AuthorCommunity.analysis_window == window,
+                AuthorCommunity.analysis_date == analysis_date,
+                AuthorCommunity.community_id.in_(community_ids)
+            )
+            .subquery()
+        )
+
+        query = (
+            select(ranked.c.community_id, ranked.c.author_id, ranked.c.weighted_degree,
+                   UserProfile.username)
+            .outerjoin(UserProfile, UserProfile.user_id == ranked.c.author_id)
+            .filter(ranked.c.rank <= per_community)
+            .order_by(ranked.c.community_id, ranked.c.rank)
+        )
+
+        members: Dict[int, List[Dict[str, Any]]] = {}
+        for row in (await self.db.execute(query)).all():
+            members.setdefault(row.community_id, []).append({
+                'author_id': row.author_id,
+                'username': row.username,
+                'weighted_degree': float(row.weighted_degree or 0)
+            })
+        return members
+
+    async def get_members(
+        self,
+        window: str,
+        analysis_date: date,
+        community_id: int,
+        limit: int = 100,
+        offset: int = 0
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """Members of one community with their intelligence scores, most connected first"""
+        member_filter = and_(
+            AuthorCommunity.analysis_window == window,
+            AuthorCommunity.analysis_date == analysis_date,
+            AuthorCommunity.community_id == community_id
+        )
+
+        count_result = await self.db.execute(
+            select(func.count()).select_from(AuthorCommunity).filter(member_filter)
+        )
+        total = count_result.scalar()
+
+        query = (
+            select(
+                AuthorCommunity.author_id,
+                AuthorCommunity.weighted_degree,
+                UserProfile.username,
+                AuthorIntelligence.coordination_risk_score,
+                AuthorIntelligence.influence_score,
+                AuthorIntelligence.betweenness_centrality,
+                AuthorIntelligence.monitoring_priority_score
+            )
+            .outerjoin(AuthorIntelligence, self._intelligence_join())
+            .outerjoin(UserProfile, UserProfile.user_id == AuthorCommunity.author_id)
+            .filter(member_filter)
+            .order_by(AuthorCommunity.weighted_degree.desc(), AuthorCommunity.author_id)
+            .limit(limit)
+            .offset(offset)
+        )
+
+        members = [
+            {
+                'author_id': row.author_id,
+                'username': row.username,
+                'weighted_degree': float(row.weighted_degree or 0),
+                'coordination_risk_score': row.coordination_risk_score,
+                'influence_score': row.influence_score,
+                'betweenness_centrality': row.betweenness_centrality,
+                'monitoring_priority_score': row.monitoring_priority_score
+            }
+            for row in (await self.db.execute(query)).all()
+        ]
+        return members, total
@@ -1,10 +1,12 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
+from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, and_
 from app.models.monitored_user import MonitoredUser
 from app.models.tweet import Tweet
 from app.models.project import Project
 from app.models.network import UserNetwork
+from app.pagination import apply_keyset
 
 
 class MonitoredUserRepository:
@@ -29,6 +31,60 @@ class MonitoredUserRepository:
         result = await self.db.execute(query)
         return result.scalars().all()
 
+    async def get_monitored_users_with_stats(
+        self,
+        project_id: Optional[int] = None,
+        active_only: bool = False
+    ) -> List[dict]:
+        """Get monitored users with project name and tweet statistics in one query"""
+        user_filters = []
+        if active_only:
+            user_filters.append(MonitoredUser.is_active == True)
+        if project_id:
+            user_filters.append(MonitoredUser.project_id == project_id)
+
+        # Aggregate only the authors that are monitored, grouped by author_id
+        monitored_ids = select(MonitoredUser.user_id).filter(
+            MonitoredUser.user_id.isnot(None), *user_filters
+        )
+        tweet_stats = (
+            select(
+                Tweet.author_id,
+                func.count(Tweet.tweet_id).label("tweet_count"),
+                func.max(Tweet.created_at).label("latest_tweet_at"),
+                func.sum(Tweet.total_engagement).label("total_engagement")
+            )
+            .filter(Tweet.author_id.in_(monitored_ids))
+            .group_by(Tweet.author_id)
+            .subquery()
+        )
+
+        query = (
+            select(
+                MonitoredUser,
+                Project.name.label("project_name"),
+                func.coalesce(tweet_stats.c.tweet_count, 0).label("tweet_count"),
+                tweet_stats.c.latest_tweet_at,
+                func.coalesce(tweet_stats.c.total_engagement, 0).label("total_engagement")
+            )
+            .outerjoin(Project, MonitoredUser.project_id == Project.id)
+            .outerjoin(tweet_stats, tweet_stats.c.author_id == MonitoredUser.user_id)
+            .filter(*user_filters)
+            .order_by(MonitoredUser.username)
+        )
+        result = await self.db.execute(query)
+
+        return [
+            {
+                "user": row.MonitoredUser,
+                "project_name": row.project_name,
+                "tweet_count": row.tweet_count,
+                "latest_tweet_at": row.latest_tweet_at,
+                "total_engagement": row.total_engagement
+            }
+            for row in result
+        ]
+
     async def get_monitored_user_by_id(self, user_id: int) -> Optional[MonitoredUser]:
         """Get monitored user by ID"""
         query = select(MonitoredUser).filter(MonitoredUser.id == user_id)
@@ -45,16 +101,12 @@ class MonitoredUserRepository:
         self,
         user_id: str,
         limit: int = 50,
-        offset: int = 0
+        offset: int = 0,
+        after: Optional[Tuple[datetime, str]] = None
     ) -> List[Tweet]:
         """Get tweets from a monitored user"""
-        query = (
-            select(Tweet)
-            .filter(Tweet.author_id == user_id)
-            .order_by(Tweet.created_at.desc())
-            .limit(limit)
-            .offset(offset)
-        )
+        query = select(Tweet).filter(Tweet.author_id == user_id)
+        query = apply_keyset(query, after, limit, offset)
         result = await self.db.execute(query)
         return result.scalars().all()
 
@@ -0,0 +1,535 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import async_session
+from app.models.network import UserNetwork
+from app.config import settings
+
+# Rows fetched per round trip while loading user_network
+FETCH_SIZE = 50000
+
+
+def _edge_positions(indptr: np.ndarray, nodes: np.ndarray) -> np.ndarray:
+    """Positions in the CSR edge arrays of every edge of `nodes`"""
+    starts = indptr[nodes].astype(np.int64)
+    lengths = indptr[nodes + 1].astype(np.int64) - starts
+    total = int(lengths.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int64)
+    # Start of each node's run, shifted by where that run begins in the output
+    offsets = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+    return offsets + np.arange(total, dtype=np.int64)
+
+
+def _top_k(scores: np.ndarray, k: int, candidates: Optional[np.ndarray] = None) -> np.ndarray:
+    """Indices of the k highest scores (restricted to `candidates`), best first"""
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if candidates is None:
+        candidates = np.arange(len(scores))
+    if len(candidates) > k:
+        part = np.argpartition(-scores[candidates], k - 1)[:k]
+        candidates = candidates[part]
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+class CSRGraph:
+    """
+    Immutable snapshot of user_network as compressed sparse rows.
+
+    Nodes are interned to int32 indices; edges are stored once sorted by
+    source (out-CSR) and once by target (in-CSR), each with int16
+    relationship codes and float32 total_weight.
+    """
+
+    def __init__(self, node_ids: List[str], node_types: np.ndarray, type_names: List[str],
+                 labels: Dict[int, str], rel_names: List[str],
+                 src: np.ndarray, dst: np.ndarray, rel: np.ndarray, weight: np.ndarray,
+                 loaded_until: Optional[datetime]):
+        n = len(node_ids)
+        self.node_ids = node_ids
+        self.node_index = {node_id: i for i, node_id in enumerate(node_ids)}
+        self.node_types = node_types
+        self.type_names = type_names
+        self.labels = labels
+        self.rel_names = rel_names
+        self.loaded_until = loaded_until
+        self.built_at = time.time()
+
+        # Edge arrays arrive sorted by (src, rel, dst)
+        self.src = src
+        self.out_dst = dst
+        self.out_rel = rel
+        self.out_weight = weight
+        self.out_indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=n), out=self.out_indptr[1:])
+
+        order = np.argsort(dst, kind="stable")
+        self.in_src = src[order]
+        self.in_rel = rel[order]
+        self.in_weight = weight[order]
+        self.in_indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(dst, minlength=n), out=self.in_indptr[1:])
+
+        # Weighted degree in both directions, used to rank k-hop results
+        self.strength = (
+            np.bincount(src, weights=weight, minlength=n)
+            + np.bincount(dst, weights=weight, minlength=n)
+        )
+
+    @property
+    def node_count(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.src)
+
+    def rel_codes(self, relationship_types: Optional[Sequence[str]]) -> Optional[np.ndarray]:
+        """Codes for the given relationship types (None = all types)"""
+        if not relationship_types:
+            return None
+        return np.array(
+            [self.rel_names.index(r) for r in relationship_types if r in self.rel_names],
+            dtype=np.int16
+        )
+
+    def edge_mask(self, rel: np.ndarray, codes: Optional[np.ndarray]) -> Optional[np.ndarray]:
+        return None if codes is None else np.isin(rel, codes)
+
+    def node_type_mask(self, node_type: Optional[str]) -> Optional[np.ndarray]:
+        if not node_type:
+            return None
+        if node_type not in self.type_names:
+            return np.empty(0, dtype=np.int64)
+        return np.flatnonzero(self.node_types == self.type_names.index(node_type))
+
+    def describe(self, i: int) -> Dict:
+        return {
+            "node_id": self.node_ids[i],
+            "node_type": self.type_names[self.node_types[i]],
+            "username": self.labels.get(i)
+        }
+
+    def k_hop(self, start: int, k: int, direction: str, codes: Optional[np.ndarray],
+              max_nodes: int) -> Dict:
+        """Breadth-first levels around `start`; stops early once max_nodes are reached"""
+        csrs = []
+        if direction in ("out", "both"):
+            csrs.append((self.out_indptr, self.out_dst, self.out_rel))
+        if direction in ("in", "both"):
+            csrs.append((self.in_indptr, self.in_src, self.in_rel))
+
+        visited = np.zeros(self.node_count, dtype=bool)
+        visited[start] = True
+        frontier = np.array([start], dtype=np.int64)
+        levels = []
+        reached = 0
+        truncated = False
+
+        for _ in range(k):
+            found = []
+            for indptr, neighbours, rel in csrs:
+                positions = _edge_positions(indptr, frontier)
+                if codes is not None:
+                    positions = positions[np.isin(rel[positions], codes)]
+                found.append(neighbours[positions])
+
+            frontier = np.unique(np.concatenate(found)) if found else np.empty(0, dtype=np.int64)
+            frontier = frontier[~visited[frontier]]
+            if len(frontier) == 0:
+                break
+
+            if reached + len(frontier) > max_nodes:
+                # Keep the strongest nodes of the level that overflows
+                frontier = _top_k(self.strength, max_nodes - reached, frontier)
+                truncated = True
+
+            visited[frontier] = True
+            levels.append(frontier)
+            reached += len(frontier)
+            if truncated:
+                break
+
+        return {"levels": levels, "truncated": truncated}
+
+    def degree(self, codes: Optional[np.ndarray], direction: str, weighted: bool) -> np.ndarray:
+        mask = self.edge_mask(self.out_rel, codes)
+        src = self.src if mask is None else self.src[mask]
+        dst = self.out_dst if mask is None else self.out_dst[mask]
+        weights = None
+        if weighted:
+            weights = self.out_weight if mask is None else self.out_weight[mask]
+
+        scores = np.zeros(self.node_count, dtype=np.float64)
+        if direction in ("out", "both"):
+            scores += np.bincount(src, weights=weights, minlength=self.node_count)
+        if direction in ("in", "both"):
+            scores += np.bincount(dst, weights=weights, minlength=self.node_count)
+        return scores
+
+    def pagerank(self, codes: Optional[np.ndarray], damping: float,
+                 max_iterations: int = 100, tolerance: float = 1e-8) -> Dict:
+        """Weighted PageRank by power iteration; dangling mass is spread uniformly"""
+        n = self.node_count
+        if n == 0:
+            return {"scores": np.empty(0), "iterations": 0, "delta": 0.0}
+
+        mask = self.edge_mask(self.out_rel, codes)
+        src = self.src if mask is None else self.src[mask]
+        dst = self.out_dst if mask is None else self.out_dst[mask]
+        weight = (self.out_weight if mask is None else self.out_weight[mask]).astype(np.float64)
+
+        out_weight = np.bincount(src, weights=weight, minlength=n)
+        dangling = out_weight == 0
+        inverse = np.zeros(n, dtype=np.float64)
+        inverse[~dangling] = 1.0 / out_weight[~dangling]
+        transition = weight * inverse[src]
+
+        rank = np.full(n, 1.0 / n)
+        iterations = 0
+        delta = 0.0
+        for iterations in range(1, max_iterations + 1):
+            spread = np.bincount(dst, weights=rank[src] * transition, minlength=n)
+            new_rank = (1.0 - damping) / n + damping * (spread + rank[dangling].sum() / n)
+            delta = float(np.abs(new_rank - rank).sum())
+            rank = new_rank
+            if delta < tolerance:
+                break
+
+        return {"scores": rank, "iterations": iterations, "delta": delta}
+
+
+class _GraphBuilder:
+    """
+    Interning tables and de-duplicated edge arrays a CSRGraph is built from.
+
+    Only touched from worker threads and only by one load at a time: the
+    incremental refresh holds NetworkGraph._lock, a full reload fills a
+    builder of its own.
+    """
+
+    def __init__(self):
+        self.node_index: Dict[str, int] = {}
+        self.node_ids: List[str] = []
+        self.node_types: List[int] = []
+        self.type_index: Dict[str, int] = {"user": 0}
+        self.type_names: List[str] = ["user"]
+        self.labels: Dict[int, str] = {}
+        self.rel_index: Dict[str, int] = {}
+        self.rel_names: List[str] = []
+        self.src = np.empty(0, dtype=np.int32)
+        self.dst = np.empty(0, dtype=np.int32)
+        self.rel = np.empty(0, dtype=np.int16)
+        self.weight = np.empty(0, dtype=np.float32)
+        self.loaded_until: Optional[datetime] = None
+
+    def intern(self, node_id: str, node_type: str) -> int:
+        index = self.node_index.get(node_id)
+        if index is None:
+            type_code = self.type_index.get(node_type)
+            if type_code is None:
+                type_code = self.type_index[node_type] = len(self.type_names)
+                self.type_names.append(node_type)
+            index = self.node_index[node_id] = len(self.node_ids)
+            self.node_ids.append(node_id)
+            self.node_types.append(type_code)
+        return index
+
+    def ingest(self, rows, user_types: set) -> tuple:
+        """Intern one partition of user_network rows; returns its edge arrays and newest last_seen"""
+        src, dst, rel, weight = [], [], [], []
+        newest = None
+        for row in rows:
+            source = self.intern(row.source_user_id, "user")
+            if row.target_type in user_types:
+                target = self.intern(row.target_id, "user")
+            else:
+                # Hashtags, URLs, ... get their own namespace so they never collide with user ids
+                target = self.intern(f"{row.target_type}:{row.target_id}", row.target_type)
+            if row.target_username:
+                self.labels[target] = row.target_username
+
+            code = self.rel_index.get(row.relationship_type)
+            if code is None:
+                code = self.rel_index[row.relationship_type] = len(self.rel_names)
+                self.rel_names.append(row.relationship_type)
+
+            src.append(source)
+            dst.append(target)
+            rel.append(code)
+            weight.append(row.total_weight or 0)
+            if row.last_seen and (newest is None or row.last_seen > newest):
+                newest = row.last_seen
+
+        return (
+            np.asarray(src, dtype=np.int32),
+            np.asarray(dst, dtype=np.int32),
+            np.asarray(rel, dtype=np.int16),
+            np.asarray(weight, dtype=np.float32),
+            newest
+        )
+
+    def merge(self, parts: List[tuple]):
+        """Append ingested partitions and keep the newest copy of each (source, relationship, target) edge"""
+        src = np.concatenate([self.src] + [p[0] for p in parts])
+        dst = np.concatenate([self.dst] + [p[1] for p in parts])
+        rel = np.concatenate([self.rel] + [p[2] for p in parts])
+        weight = np.concatenate([self.weight] + [p[3] for p in parts])
+
+        n_nodes = np.int64(max(len(self.node_ids), 1))
+        n_rels = np.int64(max(len(self.rel_names), 1))
+        keys = (src.astype(np.int64) * n_rels + rel) * n_nodes + dst
+
+        # np.unique keeps the first occurrence; scanning reversed makes that the newest row.
+        # The result is sorted by key, i.e. by (src, rel, dst), which is the out-CSR order.
+        _, first = np.unique(keys[::-1], return_index=True)
+        keep = len(keys) - 1 - first
+
+        self.src = src[keep]
+        self.dst = dst[keep]
+        self.rel = rel[keep]
+        self.weight = weight[keep]
+
+        for p in parts:
+            if p[4] and (self.loaded_until is None or p[4] > self.loaded_until):
+                self.loaded_until = p[4]
+
+    def snapshot(self) -> CSRGraph:
+        return CSRGraph(
+            node_ids=list(self.node_ids),
+            node_types=np.asarray(self.node_types, dtype=np.int16),
+            type_names=list(self.type_names),
+            labels=dict(self.labels),
+            rel_names=list(self.rel_names),
+            src=self.src,
+            dst=self.dst,
+            rel=self.rel,
+            weight=self.weight,
+            loaded_until=self.loaded_until
+        )
+
+
+class NetworkGraph:
+    """
+    Process-wide, in-memory graph over user_network.
+
+    The first request (or warm() at startup) loads the whole table;
+    afterwards, every NETWORK_GRAPH_CHECK_SECONDS the graph compares
+    MAX(last_seen) with what it has loaded and merges only rows seen since
+    then (new edges and updated weights). A full reload every
+    NETWORK_GRAPH_FULL_RELOAD_SECONDS drops deleted edges; it runs in the
+    background on its own session and is swapped in when done. Rows are
+    interned and the CSR arrays built in worker threads, and once a graph
+    exists requests keep using the current snapshot while an update runs.
+    """
+
+    def __init__(self):
+        self.graph: Optional[CSRGraph] = None
+        self._builder = _GraphBuilder()
+        self._checked_at = 0.0
+        self._full_loaded_at = 0.0
+        self._lock = asyncio.Lock()
+        self._reload_task: Optional[asyncio.Task] = None
+        self._pagerank_cache: Dict[tuple, Dict] = {}
+
+    async def _load(self, db: AsyncSession, builder: _GraphBuilder, since: Optional[datetime]) -> int:
+        """Intern rows with last_seen >= since (all rows if None) and merge them into builder"""
+        query = select(
+            UserNetwork.source_user_id,
+            UserNetwork.relationship_type,
+            UserNetwork.target_id,
+            UserNetwork.target_type,
+            UserNetwork.target_username,
+            UserNetwork.total_weight,
+            UserNetwork.last_seen
+        )
+        if since is not None:
+            query = query.where(UserNetwork.last_seen >= since)
+
+        user_types = set(settings.NETWORK_GRAPH_USER_TARGET_TYPES)
+        parts = []
+
+        result = await db.stream(query.execution_options(yield_per=FETCH_SIZE))
+        async for partition in result.partitions():
+            parts.append(await asyncio.to_thread(builder.ingest, partition, user_types))
+
+        if parts:
+            await asyncio.to_thread(builder.merge, parts)
+        return sum(len(p[0]) for p in parts)
+
+    async def _full_load(self, db: AsyncSession) -> tuple:
+        """Load user_network from scratch into a new builder and snapshot it"""
+        builder = _GraphBuilder()
+        await self._load(db, builder, since=None)
+        graph = await asyncio.to_thread(builder.snapshot)
+        return builder, graph
+
+    def _install(self, builder: _GraphBuilder, graph: CSRGraph):
+        self._builder = builder
+        self.graph = graph
+        self._pagerank_cache = {}
+
+    async def _reload(self):
+        """Background full reload; the current snapshot serves requests until it is swapped in"""
+        try:
+            async with async_session() as db:
+                builder, graph = await self._full_load(db)
+        except Exception as e:
+            # Keep the current graph; the next check starts another attempt
+            print(f"Network graph reload failed: {e}")
+            return
+
+        async with self._lock:
+            # Rows merged incrementally meanwhile are newer than the reload's
+            # loaded_until, so the next check picks them up again
+            self._install(builder, graph)
+            self._full_loaded_at = time.monotonic()
+
+    def _fresh(self) -> bool:
+        return self.graph is not None and time.monotonic() - self._checked_at < settings.NETWORK_GRAPH_CHECK_SECONDS
+
+    async def refresh(self, db: AsyncSession, force: bool = False) -> CSRGraph:
+        """Load or incrementally update the graph when user_network has moved on"""
+        if not force and self.graph is not None and (self._fresh() or self._lock.locked()):
+            # Up to date, or another request is already updating it
+            return self.graph
+
+        async with self._lock:
+            # Another request may have refreshed while we waited
+            if not force and self._fresh():
+                return self.graph
+
+            if force or self.graph is None:
+                # Nothing to serve yet (or asked for a clean graph): load in full and wait
+                self._install(*await self._full_load(db))
+                self._full_loaded_at = time.monotonic()
+            else:
+                if (time.monotonic() - self._full_loaded_at >= settings.NETWORK_GRAPH_FULL_RELOAD_SECONDS
+                        and (self._reload_task is None or self._reload_task.done())):
+                    self._reload_task = asyncio.create_task(self._reload())
+
+                result = await db.execute(select(func.max(UserNetwork.last_seen)))
+                latest = result.scalar()
+                loaded_until = self._builder.loaded_until
+                if latest is not None and (loaded_until is None or latest > loaded_until):
+                    # >= re-reads rows stamped at the watermark; the merge de-duplicates them
+                    await self._load(db, self._builder, since=loaded_until)
+                    self._install(self._builder, await asyncio.to_thread(self._builder.snapshot))
+
+            self._checked_at = time.monotonic()
+            return self.graph
+
+    async def warm(self):
+        """Load the graph at startup so the first request does not pay for it"""
+        try:
+            async with async_session() as db:
+                await self.refresh(db)
+        except Exception as e:
+            print(f"Network graph warm-up failed: {e}")
+
+    def invalidate(self):
+        """Force a last_seen check on the next query"""
+        self._checked_at = 0.0
+
+    async def stats(self, db: AsyncSession) -> Dict:
+        graph = await self.refresh(db)
+        return {
+            "nodes": graph.node_count,
+            "edges": graph.edge_count,
+            "relationship_types": {
+                name: int(count)
+                for name, count in zip(graph.rel_names, np.bincount(graph.out_rel, minlength=len(graph.rel_names)))
+            },
+            "node_types": {
+                name: int(count)
+                for name, count in zip(graph.type_names, np.bincount(graph.node_types, minlength=len(graph.type_names)))
+            },
+            "loaded_until": graph.loaded_until,
+            "built_at": datetime.fromtimestamp(graph.built_at)
+        }
+
+    async def k_hop(
+        self,
+        db: AsyncSession,
+        node_id: str,
+        k: int = 2,
+        direction: str = "out",
+        relationship_types: Optional[Sequence[str]] = None,
+        limit: int = 100
+    ) -> Optional[Dict]:
+        """Nodes within k hops of node_id, by hop then weighted degree; None if the node is unknown"""
+        graph = await self.refresh(db)
+        start = graph.node_index.get(node_id)
+        if start is None:
+            return None
+
+        result = graph.k_hop(
+            start, k, direction, graph.rel_codes(relationship_types),
+            settings.NETWORK_GRAPH_MAX_KHOP_NODES
+        )
+
+        nodes = []
+        for hop, level in enumerate(result["levels"], start=1):
+            if len(nodes) >= limit:
+                break
+            for i in _top_k(graph.strength, min(limit - len(nodes), len(level)), level):
+                nodes.append({**graph.describe(i), "hop": hop, "score": float(graph.strength[i])})
+
+        return {
+            "node": graph.describe(start),
+            "hop_counts": [len(level) for level in result["levels"]],
+            "total": sum(len(level) for level in result["levels"]),
+            "truncated": result["truncated"],
+            "nodes": nodes
+        }
+
+    async def degree(
+        self,
+        db: AsyncSession,
+        relationship_types: Optional[Sequence[str]] = None,
+        direction: str = "in",
+        weighted: bool = False,
+        node_type: Optional[str] = None,
+        limit: int = 50
+    ) -> List[Dict]:
+        """Top nodes by (weighted) in/out/total degree"""
+        graph = await self.refresh(db)
+        scores = await asyncio.to_thread(graph.degree, graph.rel_codes(relationship_types), direction, weighted)
+        top = _top_k(scores, limit, graph.node_type_mask(node_type))
+        return [{**graph.describe(i), "score": float(scores[i])} for i in top if scores[i] > 0]
+
+    async def pagerank(
+        self,
+        db: AsyncSession,
+        relationship_types: Optional[Sequence[str]] = None,
+        damping: float = 0.85,
+        node_type: Optional[str] = None,
+        limit: int = 50
+    ) -> Dict:
+        """Top nodes by weighted PageRank; scores are cached until the graph changes"""
+        graph = await self.refresh(db)
+        key = (tuple(sorted(relationship_types or ())), damping)
+        result = self._pagerank_cache.get(key)
+        if result is None:
+            result = await asyncio.to_thread(graph.pagerank, graph.rel_codes(relationship_types), damping)
+            if graph is self.graph:
+                self._pagerank_cache[key] = result
+
+        scores = result["scores"]
+        top = _top_k(scores, limit, graph.node_type_mask(node_type))
+        return {
+            "iterations": result["iterations"],
+            "converged_delta": result["delta"],
+            "nodes": [{**graph.describe(i), "score": float(scores[i])} for i in top]
+        }
+
+
+# Shared by all network endpoints
+network_graph = NetworkGraph()
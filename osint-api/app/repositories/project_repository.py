@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import List, Optional, Dict
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 from app.models.project import Project
@@ -41,4 +41,35 @@ class ProjectRepository:
         return {
             "theme_count": theme_count.scalar() or 0,
             "monitored_user_count": user_count.scalar() or 0
-        }
\ No newline at end of file
+        }
+
+    async def get_projects_stats(self, project_ids: List[int]) -> Dict[int, dict]:
+        """Get statistics for many projects at once using grouped counts"""
+        stats = {
+            project_id: {"theme_count": 0, "monitored_user_count": 0}
+            for project_id in project_ids
+        }
+        if not project_ids:
+            return stats
+
+        # Count themes per project
+        theme_query = (
+            select(Theme.project_id, func.count(Theme.id).label("theme_count"))
+            .filter(Theme.project_id.in_(project_ids))
+            .group_by(Theme.project_id)
+        )
+        theme_result = await self.db.execute(theme_query)
+        for row in theme_result:
+            stats[row.project_id]["theme_count"] = row.theme_count
+
+        # Count monitored users per project
+        user_query = (
+            select(MonitoredUser.project_id, func.count(MonitoredUser.id).label("user_count"))
+            .filter(MonitoredUser.project_id.in_(project_ids))
+            .group_by(MonitoredUser.project_id)
+        )
+        user_result = await self.db.execute(user_query)
+        for row in user_result:
+            stats[row.project_id]["monitored_user_count"] = row.user_count
+
+        return stats
@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import List, Optional, Dict
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 from app.models.theme import Theme
@@ -23,6 +23,22 @@ class ThemeRepository:
         result = await self.db.execute(query)
         return result.scalars().all()
 
+    async def get_themes_by_projects(self, project_ids: List[int]) -> Dict[int, List[Theme]]:
+        """Get themes for several projects in one query, grouped by project ID"""
+        themes_by_project = {project_id: [] for project_id in project_ids}
+        if not project_ids:
+            return themes_by_project
+
+        query = (
+            select(Theme)
+            .filter(Theme.project_id.in_(project_ids))
+            .order_by(Theme.project_id, Theme.id)
+        )
+        result = await self.db.execute(query)
+        for theme in result.scalars().all():
+            themes_by_project[theme.project_id].append(theme)
+        return themes_by_project
+
     async def get_theme_by_code(self, theme_code: str) -> Optional[Theme]:
         """Get theme by code"""
         query = select(Theme).filter(Theme.code == theme_code)
@@ -69,6 +85,54 @@ class ThemeRepository:
             "query_count": query_count
         }
 
+    async def get_themes_stats(self, theme_codes: List[str]) -> Dict[str, dict]:
+        """Get statistics for many themes at once, keyed by theme code"""
+        if not theme_codes:
+            return {}
+
+        tweet_stats = (
+            select(
+                TweetCollection.theme_code,
+                func.count(func.distinct(TweetCollection.tweet_id)).label("tweet_count"),
+                func.max(TweetCollection.last_collected_at).label("last_collected_at")
+            )
+            .filter(TweetCollection.theme_code.in_(theme_codes))
+            .group_by(TweetCollection.theme_code)
+            .subquery()
+        )
+
+        query_stats = (
+            select(
+                Query.theme_id,
+                func.count(Query.id).label("query_count")
+            )
+            .group_by(Query.theme_id)
+            .subquery()
+        )
+
+        # One statement: themes joined to both grouped aggregates
+        query = (
+            select(
+                Theme.code,
+                func.coalesce(tweet_stats.c.tweet_count, 0).label("tweet_count"),
+                tweet_stats.c.last_collected_at,
+                func.coalesce(query_stats.c.query_count, 0).label("query_count")
+            )
+            .outerjoin(tweet_stats, tweet_stats.c.theme_code == Theme.code)
+            .outerjoin(query_stats, query_stats.c.theme_id == Theme.id)
+            .filter(Theme.code.in_(theme_codes))
+        )
+        result = await self.db.execute(query)
+
+        return {
+            row.code: {
+                "tweet_count": row.tweet_count,
+                "last_collected_at": row.last_collected_at,
+                "query_count": row.query_count
+            }
+            for row in result
+        }
+
     async def get_theme_with_project(self, theme_code: str) -> dict:
         """Get theme with project information"""
         query = (
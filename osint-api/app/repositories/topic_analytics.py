@@ -3,11 +3,12 @@ from datetime import datetime, timedelta
 from sqlalchemy import select, func, and_, or_, case, text
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
-from app.models.topic import TopicDefinition, TopicDefinitionRefined
-from app.models.topic_analytics import TweetTopic, AuthorTopic, TopicEvolution
-from app.models.tweet import Tweet
+from app.models.topic import TopicDefinition
+from app.models.topic_analytics import (
+    AuthorTopic, TopicEvolution, ThemeTopicDaily, TopicAuthorFirstSeen
+)
 from app.models.theme import Theme
-from app.models.collection import TweetCollection
+from app.repositories.topic_catalog import topic_catalog
 
 
 class TopicAnalyticsRepository:
@@ -20,21 +21,14 @@ class TopicAnalyticsRepository:
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None
     ) -> Dict[str, Any]:
-        """Get analytics on topics related to themes"""
+        """
+        Get analytics on topics related to themes.
+        Reads the precomputed theme_topic_daily aggregate (scripts/topic_evolution/
+        compute_theme_topics.py): day rows are summed and unique-author sketches
+        merged, so date filters apply at whole-day granularity.
+        """
 
-        # Base query to link themes with topics via tweet collections
-        base_query = (
-            select(
-                TweetCollection.theme_name,
-                TweetTopic.topic_id,
-                func.count(func.distinct(TweetTopic.tweet_id)).label('tweet_count'),
-                func.avg(TweetTopic.probability).label('avg_probability'),
-                func.count(func.distinct(Tweet.author_id)).label('unique_authors')
-            )
-            .join(TweetTopic, TweetTopic.tweet_id == TweetCollection.tweet_id)
-            .join(Tweet, Tweet.tweet_id == TweetCollection.tweet_id)
-            .where(TweetTopic.topic_id != -1)  # Exclude outliers
-        )
+        filters = []
 
         # Apply filters
         if theme_id:
@@ -43,26 +37,54 @@ class TopicAnalyticsRepository:
             theme_result = await self.db.execute(theme_query)
             theme = theme_result.scalar_one_or_none()
             if theme:
-                base_query = base_query.where(TweetCollection.theme_code == theme.code)
+                filters.append(ThemeTopicDaily.theme_code == theme.code)
 
         if start_date:
-            base_query = base_query.where(Tweet.created_at >= start_date)
+            filters.append(ThemeTopicDaily.date >= start_date.date())
         if end_date:
-            base_query = base_query.where(Tweet.created_at <= end_date)
+            filters.append(ThemeTopicDaily.date <= end_date.date())
 
-        # Group by theme and topic
-        base_query = base_query.group_by(
-            TweetCollection.theme_name,
-            TweetTopic.topic_id
+        base_query = (
+            select(
+                ThemeTopicDaily.theme_name,
+                ThemeTopicDaily.topic_id,
+                func.sum(ThemeTopicDaily.tweet_count).label('tweet_count'),
+                (
+                    func.sum(ThemeTopicDaily.probability_sum) /
+                    func.nullif(func.sum(ThemeTopicDaily.tweet_count), 0)
+                ).label('avg_probability'),
+                func.hll_cardinality(
+                    func.hll_union_agg(ThemeTopicDaily.authors)
+                ).label('unique_authors')
+            )
+            .where(*filters)
+            # Group by theme and topic
+            .group_by(ThemeTopicDaily.theme_name, ThemeTopicDaily.topic_id)
         )
 
         result = await self.db.execute(base_query)
         raw_data = result.all()
 
+        # Authors posting in several topics of a theme must be counted once,
+        # so merge every topic's sketches per theme rather than adding counts
+        theme_authors_query = (
+            select(
+                ThemeTopicDaily.theme_name,
+                func.hll_cardinality(
+                    func.hll_union_agg(ThemeTopicDaily.authors)
+                ).label('unique_authors')
+            )
+            .where(*filters)
+            .group_by(ThemeTopicDaily.theme_name)
+        )
+        theme_authors_result = await self.db.execute(theme_authors_query)
+        theme_authors = {
+            row.theme_name: int(round(row.unique_authors or 0))
+            for row in theme_authors_result.all()
+        }
+
         # Get refined topic information
-        refined_query = select(TopicDefinitionRefined)
-        refined_result = await self.db.execute(refined_query)
-        refined_topics = {t.topic_id: t for t in refined_result.scalars().all()}
+        refined_topics = await topic_catalog.get_many(self.db, {row.topic_id for row in raw_data})
 
         # Organize results by theme
         analytics = {}
@@ -73,7 +95,7 @@ class TopicAnalyticsRepository:
                     'theme_name': theme_name,
                     'topics': [],
                     'total_tweets': 0,
-                    'total_authors': 0
+                    'total_authors': theme_authors.get(theme_name, 0)
                 }
 
             refined = refined_topics.get(row.topic_id)
@@ -82,14 +104,13 @@ class TopicAnalyticsRepository:
                 'refined_name': refined.refined_name if refined else f"Topic {row.topic_id}",
                 'category': refined.category if refined else None,
                 'monitoring_priority': refined.monitoring_priority if refined else 'medium',
-                'tweet_count': row.tweet_count,
+                'tweet_count': int(row.tweet_count or 0),
                 'avg_probability': float(row.avg_probability) if row.avg_probability else 0,
-                'unique_authors': row.unique_authors
+                'unique_authors': int(round(row.unique_authors or 0))
             }
 
             analytics[theme_name]['topics'].append(topic_info)
-            analytics[theme_name]['total_tweets'] += row.tweet_count
-            analytics[theme_name]['total_authors'] += row.unique_authors
+            analytics[theme_name]['total_tweets'] += topic_info['tweet_count']
 
         # Sort topics within each theme by tweet count
         for theme_data in analytics.values():
@@ -97,6 +118,67 @@ class TopicAnalyticsRepository:
 
         return analytics
 
+    async def get_topic_unique_authors(
+        self,
+        topic_ids: Optional[List[int]] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """
+        Distinct authors per topic, and across all selected topics, for any window.
+        Merges the hourly author sketches stored in topic_evolution, so the window
+        is aligned to whole hours and no tweets are rescanned.
+        """
+
+        filters = [TopicEvolution.authors.isnot(None)]
+        if topic_ids:
+            filters.append(TopicEvolution.topic_id.in_(topic_ids))
+        if start_date:
+            filters.append(TopicEvolution.date >= start_date)
+        if end_date:
+            filters.append(TopicEvolution.date < end_date)
+
+        per_topic_query = (
+            select(
+                TopicEvolution.topic_id,
+                func.sum(TopicEvolution.tweet_count).label('tweet_count'),
+                func.hll_cardinality(
+                    func.hll_union_agg(TopicEvolution.authors)
+                ).label('unique_authors')
+            )
+            .where(*filters)
+            .group_by(TopicEvolution.topic_id)
+        )
+        result = await self.db.execute(per_topic_query)
+        rows = result.all()
+
+        combined_query = select(
+            func.hll_cardinality(func.hll_union_agg(TopicEvolution.authors))
+        ).where(*filters)
+        combined_result = await self.db.execute(combined_query)
+        combined = combined_result.scalar()
+
+        refined_topics = await topic_catalog.get_many(self.db, {row.topic_id for row in rows})
+
+        topics = [
+            {
+                'topic_id': row.topic_id,
+                'topic_name': refined_topics.get(row.topic_id).refined_name
+                             if row.topic_id in refined_topics else f"Topic {row.topic_id}",
+                'tweet_count': int(row.tweet_count or 0),
+                'unique_authors': int(round(row.unique_authors or 0))
+            }
+            for row in rows
+        ]
+        topics.sort(key=lambda x: x['unique_authors'], reverse=True)
+
+        return {
+            'start_date': start_date.isoformat() if start_date else None,
+            'end_date': end_date.isoformat() if end_date else None,
+            'topics': topics,
+            'total_authors': int(round(combined or 0))
+        }
+
     async def get_author_expertise(
         self,
         topic_id: Optional[int] = None,
@@ -105,8 +187,16 @@ class TopicAnalyticsRepository:
     ) -> List[Dict[str, Any]]:
         """Get authors with expertise in specific topics"""
 
+        # first_seen comes from the maintained topic_author_first_seen index when available
         query = (
-            select(AuthorTopic)
+            select(AuthorTopic, TopicAuthorFirstSeen.first_seen)
+            .outerjoin(
+                TopicAuthorFirstSeen,
+                and_(
+                    TopicAuthorFirstSeen.topic_id == AuthorTopic.topic_id,
+                    TopicAuthorFirstSeen.author_id == AuthorTopic.author_id
+                )
+            )
             .where(AuthorTopic.tweet_count >= min_tweet_count)
         )
 
@@ -119,15 +209,10 @@ class TopicAnalyticsRepository:
         ).limit(limit)
 
         result = await self.db.execute(query)
-        author_topics = result.scalars().all()
+        rows = result.all()
 
         # Get refined topic names
-        topic_ids = list(set(at.topic_id for at in author_topics))
-        refined_query = select(TopicDefinitionRefined).where(
-            TopicDefinitionRefined.topic_id.in_(topic_ids)
-        )
-        refined_result = await self.db.execute(refined_query)
-        refined_topics = {t.topic_id: t for t in refined_result.scalars().all()}
+        refined_topics = await topic_catalog.get_many(self.db, {at.topic_id for at, _ in rows})
 
         return [
             {
@@ -138,13 +223,48 @@ class TopicAnalyticsRepository:
                 'tweet_count': at.tweet_count,
                 'avg_probability': float(at.avg_probability) if at.avg_probability else 0,
                 'max_probability': float(at.max_probability) if at.max_probability else 0,
-                'first_seen': at.first_seen.isoformat() if at.first_seen else None,
+                'first_seen': (first_seen or at.first_seen).isoformat() if (first_seen or at.first_seen) else None,
                 'last_seen': at.last_seen.isoformat() if at.last_seen else None,
                 'active_days': at.active_days,
                 'total_engagement': at.total_engagement,
                 'avg_engagement': float(at.avg_engagement) if at.avg_engagement else 0
             }
-            for at in author_topics
+            for at, first_seen in rows
+        ]
+
+    async def get_new_authors_by_topic(
+        self,
+        topic_id: int,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """Authors whose first post about a topic falls in the window, newest first"""
+
+        query = select(TopicAuthorFirstSeen).where(TopicAuthorFirstSeen.topic_id == topic_id)
+
+        if start_date:
+            query = query.where(TopicAuthorFirstSeen.first_seen >= start_date)
+        if end_date:
+            query = query.where(TopicAuthorFirstSeen.first_seen < end_date)
+
+        query = query.order_by(TopicAuthorFirstSeen.first_seen.desc()).limit(limit)
+
+        result = await self.db.execute(query)
+        first_seen_rows = result.scalars().all()
+
+        refined = await topic_catalog.get(self.db, topic_id)
+        topic_name = refined.refined_name if refined else f"Topic {topic_id}"
+
+        return [
+            {
+                'author_id': fs.author_id,
+                'topic_id': fs.topic_id,
+                'topic_name': topic_name,
+                'first_seen': fs.first_seen.isoformat(),
+                'first_tweet_id': fs.first_tweet_id
+            }
+            for fs in first_seen_rows
         ]
 
     async def get_topic_evolution_trends(
@@ -187,12 +307,7 @@ class TopicAnalyticsRepository:
         evolutions = result.scalars().all()
 
         # Get refined topic names
-        unique_topic_ids = list(set(e.topic_id for e in evolutions))
-        refined_query = select(TopicDefinitionRefined).where(
-            TopicDefinitionRefined.topic_id.in_(unique_topic_ids)
-        )
-        refined_result = await self.db.execute(refined_query)
-        refined_topics = {t.topic_id: t for t in refined_result.scalars().all()}
+        refined_topics = await topic_catalog.get_many(self.db, {e.topic_id for e in evolutions})
 
         return [
             {
@@ -273,15 +388,7 @@ class TopicAnalyticsRepository:
         rows = result.all()
 
         # Get refined topic names
-        unique_topic_ids = list(set(row.topic_id for row in rows))
-        if unique_topic_ids:
-            refined_query = select(TopicDefinitionRefined).where(
-                TopicDefinitionRefined.topic_id.in_(unique_topic_ids)
-            )
-            refined_result = await self.db.execute(refined_query)
-            refined_topics = {t.topic_id: t for t in refined_result.scalars().all()}
-        else:
-            refined_topics = {}
+        refined_topics = await topic_catalog.get_many(self.db, {row.topic_id for row in rows})
 
         return [
             {
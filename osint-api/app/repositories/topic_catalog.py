@@ -0,0 +1,101 @@
+import asyncio
+import time
+from typing import List, Optional, Dict
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.topic import TopicDefinitionRefined
+from app.config import settings
+
+
+def _desc_nulls_first(value):
+    """Sort key reproducing Postgres `ORDER BY x DESC` (NULLs first) with reverse=True"""
+    return (value is None, value or 0)
+
+
+class TopicCatalog:
+    """
+    Process-wide, in-memory copy of topic_definitions_refined.
+
+    Refined topics only change when scripts/topic_refinement/refine_topics.py
+    runs, so the table is loaded once and reused across requests. Every
+    TOPIC_CATALOG_CHECK_SECONDS the catalog compares a cheap version stamp
+    (MAX(processed_at), COUNT(*)) against the loaded one and reloads on change.
+    """
+
+    def __init__(self):
+        self._topics: Dict[int, TopicDefinitionRefined] = {}
+        self._version = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def _current_version(self, db: AsyncSession) -> tuple:
+        query = select(
+            func.max(TopicDefinitionRefined.processed_at),
+            func.count(TopicDefinitionRefined.topic_id)
+        )
+        result = await db.execute(query)
+        return tuple(result.first())
+
+    async def refresh(self, db: AsyncSession, force: bool = False):
+        """Reload the catalog if the version stamp changed (or if forced)"""
+        now = time.monotonic()
+        if not force and self._version is not None and now - self._checked_at < settings.TOPIC_CATALOG_CHECK_SECONDS:
+            return
+
+        async with self._lock:
+            # Another request may have refreshed while we waited
+            if not force and self._version is not None and time.monotonic() - self._checked_at < settings.TOPIC_CATALOG_CHECK_SECONDS:
+                return
+
+            version = await self._current_version(db)
+            if force or version != self._version:
+                result = await db.execute(select(TopicDefinitionRefined))
+                self._topics = {t.topic_id: t for t in result.scalars().all()}
+                self._version = version
+
+            self._checked_at = time.monotonic()
+
+    def invalidate(self):
+        """Force a version check on the next lookup"""
+        self._checked_at = 0.0
+
+    async def get(self, db: AsyncSession, topic_id: int) -> Optional[TopicDefinitionRefined]:
+        """Get a refined topic by ID"""
+        await self.refresh(db)
+        return self._topics.get(topic_id)
+
+    async def get_many(self, db: AsyncSession, topic_ids) -> Dict[int, TopicDefinitionRefined]:
+        """Get refined topics for the given IDs, keyed by topic_id (missing IDs are skipped)"""
+        await self.refresh(db)
+        return {tid: self._topics[tid] for tid in topic_ids if tid in self._topics}
+
+    async def all(self, db: AsyncSession) -> Dict[int, TopicDefinitionRefined]:
+        """All refined topics keyed by topic_id"""
+        await self.refresh(db)
+        return dict(self._topics)
+
+    async def filter(
+        self,
+        db: AsyncSession,
+        category: Optional[str] = None,
+        monitoring_priority: Optional[str] = None,
+        min_quality_score: Optional[float] = None
+    ) -> List[TopicDefinitionRefined]:
+        """Refined topics matching category / priority / quality, ordered by relevance then quality"""
+        await self.refresh(db)
+
+        topics = [
+            t for t in self._topics.values()
+            if (not category or t.category == category)
+            and (not monitoring_priority or t.monitoring_priority == monitoring_priority)
+            and (not min_quality_score or (t.quality_score is not None and t.quality_score >= min_quality_score))
+        ]
+        topics.sort(
+            key=lambda t: (_desc_nulls_first(t.relevance_to_project), _desc_nulls_first(t.quality_score)),
+            reverse=True
+        )
+        return topics
+
+
+# Shared by all topic endpoints
+topic_catalog = TopicCatalog()
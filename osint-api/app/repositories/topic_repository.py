@@ -1,7 +1,9 @@
-from typing import List, Optional, Dict, Any
-from sqlalchemy import select, func, and_, or_
+from typing import List, Optional, Dict, Any, Tuple
+from sqlalchemy import select, func, and_, literal
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.topic import TopicDefinition, TopicDefinitionRefined
+from app.config import settings
+from app.repositories.topic_catalog import topic_catalog
 
 
 class TopicRepository:
@@ -18,32 +20,17 @@ class TopicRepository:
         """
         Get refined topics - ALWAYS use refined over raw topics
         """
-        query = select(TopicDefinitionRefined)
-
-        if category:
-            query = query.where(TopicDefinitionRefined.category == category)
-
-        if monitoring_priority:
-            query = query.where(TopicDefinitionRefined.monitoring_priority == monitoring_priority)
-
-        if min_quality_score:
-            query = query.where(TopicDefinitionRefined.quality_score >= min_quality_score)
-
-        query = query.order_by(
-            TopicDefinitionRefined.relevance_to_project.desc(),
-            TopicDefinitionRefined.quality_score.desc()
-        ).limit(limit)
-
-        result = await self.db.execute(query)
-        return result.scalars().all()
+        topics = await topic_catalog.filter(
+            self.db,
+            category=category,
+            monitoring_priority=monitoring_priority,
+            min_quality_score=min_quality_score
+        )
+        return topics[:limit]
 
     async def get_refined_topic_by_id(self, topic_id: int) -> Optional[TopicDefinitionRefined]:
         """Get a single refined topic by ID"""
-        query = select(TopicDefinitionRefined).where(
-            TopicDefinitionRefined.topic_id == topic_id
-        )
-        result = await self.db.execute(query)
-        return result.scalar_one_or_none()
+        return await topic_catalog.get(self.db, topic_id)
 
     async def get_topic_with_refinement(self, topic_id: int) -> Dict[str, Any]:
         """
@@ -88,15 +75,17 @@ class TopicRepository:
         """
         Get all refined topics grouped by category
         """
-        query = select(TopicDefinitionRefined).where(
-            TopicDefinitionRefined.monitoring_priority != 'ignore'
-        ).order_by(
-            TopicDefinitionRefined.category,
-            TopicDefinitionRefined.relevance_to_project.desc()
-        )
-
-        result = await self.db.execute(query)
-        topics = result.scalars().all()
+        catalog = await topic_catalog.all(self.db)
+        topics = [
+            t for t in catalog.values()
+            if t.monitoring_priority is not None and t.monitoring_priority != 'ignore'
+        ]
+        # Category ascending (NULLs last), then relevance descending (NULLs first)
+        topics.sort(key=lambda t: (
+            t.relevance_to_project is None,
+            t.relevance_to_project or 0
+        ), reverse=True)
+        topics.sort(key=lambda t: (t.category is None, t.category or ''))
 
         # Group by category
         categorized = {}
@@ -149,29 +138,66 @@ class TopicRepository:
             for t in topics
         ]
 
-    async def search_refined_topics(self, search_term: str) -> List[TopicDefinitionRefined]:
+    def _search_document(self):
         """
-        Search refined topics by name, label, or keywords
+        Searchable text for a refined topic. Must match the expression of the
+        trigram index in scripts/topic_refinement/sql/create_topic_search_index.sql
         """
-        search_pattern = f'%{search_term}%'
+        return getattr(func, settings.POSTGRES_SCHEMA).topic_search_text(
+            TopicDefinitionRefined.refined_name,
+            TopicDefinitionRefined.refined_label,
+            TopicDefinitionRefined.category,
+            TopicDefinitionRefined.subcategory,
+            TopicDefinitionRefined.clean_keywords
+        )
+
+    async def search_refined_topics(self, search_term: str, limit: int = 50) -> List[TopicDefinitionRefined]:
+        """
+        Search refined topics by name, label, or keywords (substring match)
+        """
+        search_pattern = f'%{search_term.lower()}%'
 
         query = select(TopicDefinitionRefined).where(
-            or_(
-                TopicDefinitionRefined.refined_name.ilike(search_pattern),
-                TopicDefinitionRefined.refined_label.ilike(search_pattern),
-                TopicDefinitionRefined.category.ilike(search_pattern),
-                TopicDefinitionRefined.subcategory.ilike(search_pattern),
-                func.array_to_string(
-                    TopicDefinitionRefined.clean_keywords, ' '
-                ).ilike(search_pattern)
-            )
+            self._search_document().like(search_pattern)
         ).order_by(
             TopicDefinitionRefined.relevance_to_project.desc()
-        )
+        ).limit(limit)
 
         result = await self.db.execute(query)
         return result.scalars().all()
 
+    async def fuzzy_search_refined_topics(
+        self,
+        search_term: str,
+        limit: int = 50,
+        min_similarity: float = 0.3
+    ) -> List[Tuple[TopicDefinitionRefined, float]]:
+        """
+        Typo-tolerant search ranked by trigram word similarity.
+        Returns (topic, similarity) pairs, best match first.
+        """
+        term = search_term.lower()
+        document = self._search_document()
+        similarity = func.word_similarity(term, document)
+
+        # `<%` only uses the index with the threshold set on the connection
+        await self.db.execute(
+            select(func.set_config('pg_trgm.word_similarity_threshold', str(min_similarity), True))
+        )
+
+        query = select(
+            TopicDefinitionRefined,
+            similarity.label('similarity')
+        ).where(
+            literal(term).op('<%')(document)
+        ).order_by(
+            similarity.desc(),
+            TopicDefinitionRefined.relevance_to_project.desc()
+        ).limit(limit)
+
+        result = await self.db.execute(query)
+        return [(row.TopicDefinitionRefined, float(row.similarity)) for row in result]
+
     async def get_topic_statistics(self) -> Dict[str, Any]:
         """
         Get overall statistics about refined topics
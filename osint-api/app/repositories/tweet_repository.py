@@ -1,10 +1,30 @@
-from typing import Optional, List
+import time
+from collections import OrderedDict
+from typing import Optional, List, Tuple
+from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, desc
+from sqlalchemy import select, func, desc, text, cast
+from sqlalchemy.dialects.postgresql import REGCONFIG
 from sqlalchemy.orm import selectinload
 
 from app.models.tweet import Tweet
 from app.models.collection import TweetCollection
+from app.pagination import apply_keyset
+from app.config import settings
+
+# Exact totals per theme_code (None = all tweets) as (total, expires_at),
+# shared across requests by the "cached" count strategy; least recently used first
+_count_cache: "OrderedDict[Optional[str], Tuple[int, float]]" = OrderedDict()
+
+
+def _cache_count(theme_code: Optional[str], total: int, now: float):
+    """Store a total, dropping expired entries and then the least recently used beyond the cap"""
+    for key in [k for k, (_, expires_at) in _count_cache.items() if expires_at <= now]:
+        del _count_cache[key]
+    _count_cache[theme_code] = (total, now + settings.TWEET_COUNT_CACHE_TTL)
+    _count_cache.move_to_end(theme_code)
+    while len(_count_cache) > settings.TWEET_COUNT_CACHE_MAX_ENTRIES:
+        _count_cache.popitem(last=False)
 
 
 class TweetRepository:
@@ -15,9 +35,10 @@ class TweetRepository:
         self,
         theme_code: Optional[str] = None,
         limit: int = 50,
-        offset: int = 0
+        offset: int = 0,
+        after: Optional[Tuple[datetime, str]] = None
     ) -> List[Tweet]:
-        """Get tweets with optional theme filtering"""
+        """Get tweets with optional theme filtering; `after` is a decoded keyset cursor"""
         query = select(Tweet)
 
         if theme_code:
@@ -26,8 +47,7 @@ class TweetRepository:
                 Tweet.tweet_id == TweetCollection.tweet_id
             ).filter(TweetCollection.theme_code == theme_code)
 
-        query = query.order_by(desc(Tweet.created_at))
-        query = query.limit(limit).offset(offset)
+        query = apply_keyset(query, after, limit, offset)
 
         result = await self.db.execute(query)
         return result.scalars().all()
@@ -51,39 +71,140 @@ class TweetRepository:
         result = await self.db.execute(query)
         return result.scalar() or 0
 
+    async def estimate_tweets(self, theme_code: Optional[str] = None) -> Optional[int]:
+        """
+        Estimate tweet count from planner statistics instead of scanning.
+        Returns None when the statistics can't answer (table never analyzed,
+        theme not among the most common values).
+        """
+        schema = settings.POSTGRES_SCHEMA
+
+        if not theme_code:
+            query = text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table)")
+            result = await self.db.execute(query, {"table": f"{schema}.{settings.TWEETS_TABLE}"})
+            estimate = result.scalar()
+            return estimate if estimate is not None and estimate >= 0 else None
+
+        # Same selectivity the planner uses: table size x most-common-value frequency
+        query = text("""
+            SELECT (c.reltuples * m.freq)::bigint
+            FROM pg_class c
+            JOIN pg_stats s
+              ON s.schemaname = :schema AND s.tablename = :table_name AND s.attname = 'theme_code'
+            CROSS JOIN LATERAL unnest(s.most_common_vals::text::text[], s.most_common_freqs) AS m(val, freq)
+            WHERE c.oid = to_regclass(:table)
+              AND m.val = :theme_code
+              AND c.reltuples >= 0
+        """)
+        result = await self.db.execute(query, {
+            "schema": schema,
+            "table_name": settings.COLLECTIONS_TABLE,
+            "table": f"{schema}.{settings.COLLECTIONS_TABLE}",
+            "theme_code": theme_code
+        })
+        return result.scalar()
+
+    async def get_total(self, theme_code: Optional[str] = None) -> Tuple[int, str]:
+        """
+        Total tweets for list responses using the configured TWEET_COUNT_STRATEGY.
+        Returns (total, strategy that actually produced it).
+        """
+        strategy = settings.TWEET_COUNT_STRATEGY
+
+        if strategy == "estimated":
+            estimate = await self.estimate_tweets(theme_code)
+            if estimate is not None:
+                return estimate, "estimated"
+
+        elif strategy == "cached":
+            now = time.monotonic()
+            cached = _count_cache.get(theme_code)
+            if cached and cached[1] > now:
+                _count_cache.move_to_end(theme_code)
+                return cached[0], "cached"
+
+            total = await self.count_tweets(theme_code=theme_code)
+            _cache_count(theme_code, total, time.monotonic())
+            return total, "exact"
+
+        return await self.count_tweets(theme_code=theme_code), "exact"
+
     async def get_tweets_by_theme(
         self,
         theme_code: str,
         limit: int = 50,
-        offset: int = 0
+        offset: int = 0,
+        after: Optional[Tuple[datetime, str]] = None
     ) -> List[Tweet]:
         """Get tweets for a specific theme"""
         query = (
             select(Tweet)
             .join(TweetCollection, Tweet.tweet_id == TweetCollection.tweet_id)
             .filter(TweetCollection.theme_code == theme_code)
-            .order_by(desc(Tweet.created_at))
-            .limit(limit)
-            .offset(offset)
         )
+        query = apply_keyset(query, after, limit, offset)
 
         result = await self.db.execute(query)
         return result.scalars().all()
 
+    def _search_tsquery(self, search_term: str, lang: Optional[str] = None):
+        """
+        Build the tsquery for a search. websearch_to_tsquery handles "phrases",
+        OR and -exclusions. Without a language, the query is parsed with every
+        configured text search config and OR-ed, so stemmed documents in any of
+        them still match while the GIN index stays usable.
+        """
+        if lang:
+            config = getattr(func, settings.POSTGRES_SCHEMA).tweet_search_config(lang)
+            return func.websearch_to_tsquery(config, search_term)
+
+        tsquery = None
+        for config in settings.SEARCH_TEXT_CONFIGS:
+            part = func.websearch_to_tsquery(cast(config, REGCONFIG), search_term)
+            tsquery = part if tsquery is None else tsquery.op("||")(part)
+        return tsquery
+
     async def search_tweets(
         self,
         search_term: str,
+        lang: Optional[str] = None,
+        order: str = "relevance",
         limit: int = 50,
-        offset: int = 0
+        offset: int = 0,
+        after: Optional[Tuple[datetime, str]] = None
     ) -> List[Tweet]:
-        """Search tweets by text content"""
-        query = (
-            select(Tweet)
-            .filter(Tweet.text.ilike(f"%{search_term}%"))
-            .order_by(desc(Tweet.created_at))
-            .limit(limit)
-            .offset(offset)
-        )
+        """
+        Full-text search over tweet text.
+        order="relevance" ranks with ts_rank; order="recent" is newest-first
+        and supports keyset cursors.
+        """
+        tsquery = self._search_tsquery(search_term, lang)
+        query = select(Tweet).filter(Tweet.search_vector.op("@@")(tsquery))
+        if lang:
+            query = query.filter(Tweet.lang == lang)
+
+        if order == "recent":
+            query = apply_keyset(query, after, limit, offset)
+        else:
+            query = (
+                query.order_by(
+                    desc(func.ts_rank(Tweet.search_vector, tsquery)),
+                    desc(Tweet.created_at),
+                    desc(Tweet.tweet_id)
+                )
+                .limit(limit)
+                .offset(offset)
+            )
 
         result = await self.db.execute(query)
-        return result.scalars().all()
\ No newline at end of file
+        return result.scalars().all()
+
+    async def count_search_results(self, search_term: str, lang: Optional[str] = None) -> int:
+        """Count all tweets matching a full-text search"""
+        tsquery = self._search_tsquery(search_term, lang)
+        query = select(func.count(Tweet.tweet_id)).filter(Tweet.search_vector.op("@@")(tsquery))
+        if lang:
+            query = query.filter(Tweet.lang == lang)
+
+        result = await self.db.execute(query)
+        return result.scalar() or 0
@@ -1,11 +1,17 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, List
+from datetime import date
 
 from app.database import get_db
 from app.auth.api_key import verify_api_key
 from app.repositories.network_repository import NetworkRepository
-from app.schemas.network import TopUserSchema, NetworkAnalyticsResponse
+from app.repositories.network_graph import network_graph
+from app.repositories.community_repository import CommunityRepository
+from app.schemas.network import (
+    TopUserSchema, NetworkAnalyticsResponse, KHopResponse, CentralityResponse, NetworkGraphStats,
+    CommunityListResponse, CommunityMembersResponse
+)
 
 router = APIRouter(
     prefix="/analytics",
@@ -86,4 +92,143 @@ async def get_user_network(
             for item in network_data
         ],
         "total": len(network_data)
-    }
\ No newline at end of file
+    }
+
+
+@router.get("/network/k-hop/{node_id}", response_model=KHopResponse)
+async def get_k_hop_neighborhood(
+    node_id: str,
+    k: int = Query(2, ge=1, le=6, description="Number of hops"),
+    direction: str = Query("out", pattern="^(out|in|both)$", description="Follow outgoing, incoming or both edges"),
+    relationship_type: Optional[List[str]] = Query(None, description="Restrict to these relationship types"),
+    limit: int = Query(100, ge=1, le=5000, description="Nodes returned (nearest hops first)"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Users/targets within k hops of a node, served from the in-memory graph"""
+    result = await network_graph.k_hop(
+        db, node_id, k=k, direction=direction,
+        relationship_types=relationship_type, limit=limit
+    )
+    if result is None:
+        raise HTTPException(status_code=404, detail="Node not found in user network")
+
+    return KHopResponse(k=k, direction=direction, relationship_types=relationship_type, **result)
+
+
+@router.get("/network/pagerank", response_model=CentralityResponse)
+async def get_pagerank(
+    relationship_type: Optional[List[str]] = Query(None, description="Restrict to these relationship types"),
+    damping: float = Query(0.85, gt=0, lt=1),
+    node_type: Optional[str] = Query(None, description="Only return nodes of this type (user, hashtag, ...)"),
+    limit: int = Query(50, ge=1, le=1000),
+    db: AsyncSession = Depends(get_db)
+):
+    """Top nodes by weighted PageRank (edge weight = total_weight)"""
+    result = await network_graph.pagerank(
+        db, relationship_types=relationship_type, damping=damping,
+        node_type=node_type, limit=limit
+    )
+    return CentralityResponse(
+        metric="pagerank",
+        relationship_types=relationship_type,
+        iterations=result["iterations"],
+        nodes=result["nodes"]
+    )
+
+
+@router.get("/network/degree", response_model=CentralityResponse)
+async def get_degree_centrality(
+    relationship_type: Optional[List[str]] = Query(None, description="Restrict to these relationship types"),
+    direction: str = Query("in", pattern="^(out|in|both)$"),
+    weighted: bool = Query(False, description="Sum total_weight instead of counting edges"),
+    node_type: Optional[str] = Query(None, description="Only return nodes of this type (user, hashtag, ...)"),
+    limit: int = Query(50, ge=1, le=1000),
+    db: AsyncSession = Depends(get_db)
+):
+    """Top nodes by in/out/total degree"""
+    nodes = await network_graph.degree(
+        db, relationship_types=relationship_type, direction=direction,
+        weighted=weighted, node_type=node_type, limit=limit
+    )
+    metric = f"{'weighted_' if weighted else ''}{direction}_degree"
+    return CentralityResponse(metric=metric, relationship_types=relationship_type, nodes=nodes)
+
+
+@router.get("/network/graph-stats", response_model=NetworkGraphStats)
+async def get_network_graph_stats(
+    db: AsyncSession = Depends(get_db)
+):
+    """Size of the in-memory network graph and when it was last refreshed"""
+    return await network_graph.stats(db)
+
+
+async def _community_run_date(repo: CommunityRepository, window: str,
+                              analysis_date: Optional[date]) -> date:
+    if analysis_date:
+        return analysis_date
+    latest = await repo.get_latest_date(window)
+    if latest is None:
+        raise HTTPException(status_code=404, detail=f"No community detection run for window {window}")
+    return latest
+
+
+@router.get("/network/communities", response_model=CommunityListResponse)
+async def get_communities(
+    window: str = Query("7_days", pattern="^(7_days|30_days|90_days)$", description="Analysis window"),
+    analysis_date: Optional[date] = Query(None, description="Run date (default: latest run for the window)"),
+    min_size: int = Query(2, ge=1, description="Skip communities with fewer members"),
+    top_members: int = Query(5, ge=0, le=50, description="Most connected members listed per community"),
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_db)
+):
+    """Author communities (Louvain on the window's reply/retweet/mention graph), largest first, with coordination/influence rollups"""
+    repo = CommunityRepository(db)
+    run_date = await _community_run_date(repo, window, analysis_date)
+    communities, total, modularity = await repo.get_communities(
+        window=window,
+        analysis_date=run_date,
+        min_size=min_size,
+        limit=limit,
+        offset=offset,
+        top_members=top_members
+    )
+
+    return CommunityListResponse(
+        window=window,
+        analysis_date=run_date,
+        modularity=modularity,
+        total=total,
+        communities=communities
+    )
+
+
+@router.get("/network/communities/{community_id}", response_model=CommunityMembersResponse)
+async def get_community_members(
+    community_id: int,
+    window: str = Query("7_days", pattern="^(7_days|30_days|90_days)$", description="Analysis window"),
+    analysis_date: Optional[date] = Query(None, description="Run date (default: latest run for the window)"),
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_db)
+):
+    """Members of one community with their intelligence scores, most connected first"""
+    repo = CommunityRepository(db)
+    run_date = await _community_run_date(repo, window, analysis_date)
+    members, total = await repo.get_members(
+        window=window,
+        analysis_date=run_date,
+        community_id=community_id,
+        limit=limit,
+        offset=offset
+    )
+    if total == 0:
+        raise HTTPException(status_code=404, detail="Community not found")
+
+    return CommunityMembersResponse(
+        window=window,
+        analysis_date=run_date,
+        community_id=community_id,
+        total=total,
+        members=members
+    )
@@ -11,6 +11,7 @@ from app.schemas.monitored_user import (
     MonitoredUserRelationshipSchema
 )
 from app.schemas.tweet import TweetSchema, TweetListResponse
+from app.pagination import parse_cursor, next_cursor
 
 router = APIRouter(
     prefix="/monitored-users",
@@ -28,25 +29,15 @@ async def get_monitored_users(
     """Get list of all monitored users with statistics"""
     repo = MonitoredUserRepository(db)
 
-    # Get users based on filters
-    if active_only:
-        users = await repo.get_active_monitored_users(project_id)
-    else:
-        users = await repo.get_all_monitored_users(project_id)
+    # Users, project names and tweet statistics in a single query
+    rows = await repo.get_monitored_users_with_stats(
+        project_id=project_id,
+        active_only=active_only
+    )
 
-    # Add statistics and project info to each user
     users_with_stats = []
-    for user in users:
-        # Get stats using the Twitter user_id if available
-        if user.user_id:
-            stats = await repo.get_monitored_user_stats(user.user_id)
-        else:
-            stats = {"tweet_count": 0, "latest_tweet_at": None, "total_engagement": 0}
-
-        # Get project name
-        user_with_project = await repo.get_monitored_user_with_project(user.id)
-        project_name = user_with_project["project_name"] if user_with_project else None
-
+    for row in rows:
+        user = row["user"]
         user_data = MonitoredUserWithStatsSchema(
             id=user.id,
             project_id=user.project_id,
@@ -57,10 +48,10 @@ async def get_monitored_users(
             is_active=user.is_active,
             created_at=user.created_at,
             metadata=user.metadata_json,
-            tweet_count=stats["tweet_count"],
-            latest_tweet_at=stats["latest_tweet_at"],
-            total_engagement=stats["total_engagement"],
-            project_name=project_name
+            tweet_count=row["tweet_count"],
+            latest_tweet_at=row["latest_tweet_at"],
+            total_engagement=row["total_engagement"],
+            project_name=row["project_name"]
         )
         users_with_stats.append(user_data)
 
@@ -114,9 +105,11 @@ async def get_monitored_user_tweets(
     user_id: int,
     limit: int = Query(50, ge=1, le=1000),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous response's next_cursor (overrides offset)"),
     db: AsyncSession = Depends(get_db)
 ):
     """Get tweets from a monitored user"""
+    after = parse_cursor(cursor)
     repo = MonitoredUserRepository(db)
 
     # Get the monitored user
@@ -131,7 +124,8 @@ async def get_monitored_user_tweets(
     tweets = await repo.get_tweets_by_monitored_user(
         user_id=user.user_id,
         limit=limit,
-        offset=offset
+        offset=offset,
+        after=after
     )
 
     # Get total count
@@ -140,8 +134,10 @@ async def get_monitored_user_tweets(
     return TweetListResponse(
         tweets=[TweetSchema.model_validate(tweet) for tweet in tweets],
         total=stats["tweet_count"],
+        total_strategy="exact",
         limit=limit,
-        offset=offset
+        offset=offset,
+        next_cursor=next_cursor(tweets, limit)
     )
 
 
@@ -30,11 +30,16 @@ async def get_projects(
     else:
         projects = await repo.get_all_projects()
 
+    # Load stats and themes for all projects with a fixed number of queries
+    project_ids = [project.id for project in projects]
+    stats_by_project = await repo.get_projects_stats(project_ids)
+    themes_by_project = await theme_repo.get_themes_by_projects(project_ids)
+
     # Build response with themes and stats
     projects_with_data = []
     for project in projects:
-        stats = await repo.get_project_stats(project.id)
-        themes = await theme_repo.get_themes_by_project(project.id)
+        stats = stats_by_project[project.id]
+        themes = themes_by_project[project.id]
 
         project_data = ProjectWithThemesSchema(
             id=project.id,
@@ -8,6 +8,7 @@ from app.repositories.theme_repository import ThemeRepository
 from app.repositories.tweet_repository import TweetRepository
 from app.schemas.theme import ThemeWithStatsSchema, ThemeDetailSchema, ThemeListResponse
 from app.schemas.tweet import TweetSchema, TweetListResponse
+from app.pagination import parse_cursor, next_cursor
 
 router = APIRouter(
     prefix="/themes",
@@ -33,10 +34,13 @@ async def get_themes(
     else:
         themes = await repo.get_all_themes()
 
-    # Add statistics to each theme
+    # Fetch statistics for all themes in a single query
+    stats_by_code = await repo.get_themes_stats([theme.code for theme in themes])
+    empty_stats = {"tweet_count": 0, "last_collected_at": None, "query_count": 0}
+
     themes_with_stats = []
     for theme in themes:
-        stats = await repo.get_theme_stats(theme.code)
+        stats = stats_by_code.get(theme.code, empty_stats)
         theme_data = ThemeWithStatsSchema(
             id=theme.id,
             project_id=theme.project_id,
@@ -98,9 +102,11 @@ async def get_theme_tweets(
     theme_code: str,
     limit: int = Query(50, ge=1, le=1000),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous response's next_cursor (overrides offset)"),
     db: AsyncSession = Depends(get_db)
 ):
     """Get tweets for a specific theme"""
+    after = parse_cursor(cursor)
     tweet_repo = TweetRepository(db)
 
     # Verify theme exists
@@ -113,13 +119,16 @@ async def get_theme_tweets(
     tweets = await tweet_repo.get_tweets_by_theme(
         theme_code=theme_code,
         limit=limit,
-        offset=offset
+        offset=offset,
+        after=after
     )
-    total = await tweet_repo.count_tweets(theme_code=theme_code)
+    total, total_strategy = await tweet_repo.get_total(theme_code=theme_code)
 
     return TweetListResponse(
         tweets=[TweetSchema.model_validate(tweet) for tweet in tweets],
         total=total,
+        total_strategy=total_strategy,
         limit=limit,
-        offset=offset
+        offset=offset,
+        next_cursor=next_cursor(tweets, limit)
     )
\ No newline at end of file
@@ -9,7 +9,9 @@ from app.repositories.topic_analytics import TopicAnalyticsRepository
 from app.schemas.topic_analytics import (
     ThemeTopicAnalytics,
     AuthorExpertise,
+    TopicNewAuthor,
     TopicEvolutionTrend,
+    TopicUniqueAuthors,
     TopicAnalyticsQuery,
     AuthorExpertiseQuery,
     EvolutionTrendQuery
@@ -60,6 +62,27 @@ async def get_top_authors_by_topic(
     )
 
 
+@router.get("/new-authors-by-topic", response_model=List[TopicNewAuthor])
+async def get_new_authors_by_topic(
+    topic_id: int = Query(..., description="Topic ID"),
+    start_date: Optional[datetime] = Query(None, description="First seen on or after"),
+    end_date: Optional[datetime] = Query(None, description="First seen before"),
+    limit: int = Query(100, le=1000, description="Maximum results to return"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get authors who started posting about a topic within a time window.
+    Useful for spotting new voices joining a narrative.
+    """
+    repo = TopicAnalyticsRepository(db)
+    return await repo.get_new_authors_by_topic(
+        topic_id=topic_id,
+        start_date=start_date,
+        end_date=end_date,
+        limit=limit
+    )
+
+
 @router.get("/topic-trends-over-time", response_model=List[TopicEvolutionTrend])
 async def get_topic_trends_over_time(
     topic_ids: Optional[str] = Query(None, description="Comma-separated topic IDs"),
@@ -86,6 +109,28 @@ async def get_topic_trends_over_time(
 
 
 
+@router.get("/unique-authors", response_model=TopicUniqueAuthors)
+async def get_unique_authors(
+    topic_ids: Optional[str] = Query(None, description="Comma-separated topic IDs"),
+    start_date: Optional[datetime] = Query(None, description="Start of window (inclusive)"),
+    end_date: Optional[datetime] = Query(None, description="End of window (exclusive)"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get distinct author counts per topic and across the selected topics.
+    Counts are HyperLogLog estimates (about 1-2% error) merged from hourly sketches.
+    """
+    parsed_topic_ids = None
+    if topic_ids:
+        parsed_topic_ids = [int(id.strip()) for id in topic_ids.split(',')]
+
+    repo = TopicAnalyticsRepository(db)
+    return await repo.get_topic_unique_authors(
+        topic_ids=parsed_topic_ids,
+        start_date=start_date,
+        end_date=end_date
+    )
+
 
 @router.post("/topics-per-theme", response_model=Dict[str, ThemeTopicAnalytics])
 async def post_topics_per_theme(
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, Query, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Literal
 
 from app.database import get_db
 from app.dependencies import get_api_key
@@ -113,13 +113,20 @@ async def get_topics_with_monitoring_actions(
 @router.get("/search", response_model=List[Dict[str, Any]])
 async def search_topics(
     q: str = Query(..., min_length=2, description="Search term"),
+    mode: Literal["fuzzy", "substring"] = Query("fuzzy", description="fuzzy: similarity-ranked, typo tolerant; substring: exact substring match"),
+    min_similarity: float = Query(0.3, ge=0, le=1, description="Minimum word similarity for fuzzy mode"),
+    limit: int = Query(50, ge=1, le=500, description="Maximum results"),
     db: AsyncSession = Depends(get_db)
 ):
     """
     Search refined topics by name, label, category, or keywords.
     """
     repo = TopicRepository(db)
-    topics = await repo.search_refined_topics(q)
+
+    if mode == "substring":
+        matches = [(t, None) for t in await repo.search_refined_topics(q, limit=limit)]
+    else:
+        matches = await repo.fuzzy_search_refined_topics(q, limit=limit, min_similarity=min_similarity)
 
     return [
         {
@@ -128,9 +135,10 @@ async def search_topics(
             'label': t.refined_label,
             'category': t.category,
             'priority': t.monitoring_priority,
-            'relevance': float(t.relevance_to_project) if t.relevance_to_project else 0
+            'relevance': float(t.relevance_to_project) if t.relevance_to_project else 0,
+            'similarity': similarity
         }
-        for t in topics
+        for t, similarity in matches
     ]
 
 
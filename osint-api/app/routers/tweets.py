@@ -1,11 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional
+from typing import Optional, Literal
 
 from app.database import get_db
 from app.auth.api_key import verify_api_key
 from app.repositories.tweet_repository import TweetRepository
 from app.schemas.tweet import TweetSchema, TweetDetailSchema, TweetListResponse
+from app.pagination import parse_cursor, next_cursor
 
 router = APIRouter(
     prefix="/tweets",
@@ -19,18 +20,22 @@ async def get_tweets(
     theme_code: Optional[str] = Query(None, description="Filter by theme code"),
     limit: int = Query(50, ge=1, le=1000, description="Number of results"),
     offset: int = Query(0, ge=0, description="Offset for pagination"),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous response's next_cursor (overrides offset)"),
     db: AsyncSession = Depends(get_db)
 ):
     """Get list of tweets with optional theme filtering"""
+    after = parse_cursor(cursor)
     repo = TweetRepository(db)
-    tweets = await repo.get_tweets(theme_code=theme_code, limit=limit, offset=offset)
-    total = await repo.count_tweets(theme_code=theme_code)
+    tweets = await repo.get_tweets(theme_code=theme_code, limit=limit, offset=offset, after=after)
+    total, total_strategy = await repo.get_total(theme_code=theme_code)
 
     return TweetListResponse(
         tweets=[TweetSchema.model_validate(tweet) for tweet in tweets],
         total=total,
+        total_strategy=total_strategy,
         limit=limit,
-        offset=offset
+        offset=offset,
+        next_cursor=next_cursor(tweets, limit)
     )
 
 
@@ -52,17 +57,34 @@ async def get_tweet(
 @router.get("/search/{search_term}", response_model=TweetListResponse)
 async def search_tweets(
     search_term: str,
+    lang: Optional[str] = Query(None, description="Only search tweets in this language (e.g. en, ar)"),
+    order: Literal["relevance", "recent"] = Query("relevance", description="Rank by relevance or newest first"),
     limit: int = Query(50, ge=1, le=1000),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous response's next_cursor (order=recent only)"),
     db: AsyncSession = Depends(get_db)
 ):
-    """Search tweets by text content"""
+    """
+    Full-text search over tweet text.
+    Supports "quoted phrases", OR, and -excluded terms.
+    """
+    after = parse_cursor(cursor)
     repo = TweetRepository(db)
-    tweets = await repo.search_tweets(search_term=search_term, limit=limit, offset=offset)
+    tweets = await repo.search_tweets(
+        search_term=search_term,
+        lang=lang,
+        order=order,
+        limit=limit,
+        offset=offset,
+        after=after
+    )
+    total = await repo.count_search_results(search_term=search_term, lang=lang)
 
     return TweetListResponse(
         tweets=[TweetSchema.model_validate(tweet) for tweet in tweets],
-        total=len(tweets),
+        total=total,
+        total_strategy="exact",
         limit=limit,
-        offset=offset
-    )
\ No newline at end of file
+        offset=offset,
+        next_cursor=next_cursor(tweets, limit) if order == "recent" else None
+    )
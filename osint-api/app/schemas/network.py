@@ -1,6 +1,6 @@
 from pydantic import BaseModel
-from typing import Optional, List
-from datetime import datetime
+from typing import Optional, List, Dict
+from datetime import date, datetime
 
 
 class NetworkRelationshipSchema(BaseModel):
@@ -35,4 +35,80 @@ class TopUserSchema(BaseModel):
 class NetworkAnalyticsResponse(BaseModel):
     relationship_type: str
     top_users: List[TopUserSchema]
-    total: int
\ No newline at end of file
+    total: int
+
+
+class GraphNodeSchema(BaseModel):
+    node_id: str
+    node_type: str
+    username: Optional[str] = None
+
+
+class RankedGraphNodeSchema(GraphNodeSchema):
+    score: float
+    hop: Optional[int] = None
+
+
+class KHopResponse(BaseModel):
+    node: GraphNodeSchema
+    k: int
+    direction: str
+    relationship_types: Optional[List[str]] = None
+    hop_counts: List[int]
+    total: int
+    truncated: bool
+    nodes: List[RankedGraphNodeSchema]
+
+
+class CentralityResponse(BaseModel):
+    metric: str
+    relationship_types: Optional[List[str]] = None
+    iterations: Optional[int] = None
+    nodes: List[RankedGraphNodeSchema]
+
+
+class NetworkGraphStats(BaseModel):
+    nodes: int
+    edges: int
+    relationship_types: Dict[str, int]
+    node_types: Dict[str, int]
+    loaded_until: Optional[datetime]
+    built_at: datetime
+
+
+class CommunityMemberSchema(BaseModel):
+    author_id: str
+    username: Optional[str] = None
+    weighted_degree: float
+    coordination_risk_score: Optional[float] = None
+    influence_score: Optional[float] = None
+    betweenness_centrality: Optional[float] = None
+    monitoring_priority_score: Optional[float] = None
+
+
+class CommunitySchema(BaseModel):
+    community_id: int
+    size: int
+    total_weighted_degree: float
+    scored_authors: int
+    avg_coordination_risk: Optional[float] = None
+    max_coordination_risk: Optional[float] = None
+    avg_influence: Optional[float] = None
+    max_betweenness: Optional[float] = None
+    top_members: List[CommunityMemberSchema]
+
+
+class CommunityListResponse(BaseModel):
+    window: str
+    analysis_date: date
+    modularity: Optional[float] = None
+    total: int
+    communities: List[CommunitySchema]
+
+
+class CommunityMembersResponse(BaseModel):
+    window: str
+    analysis_date: date
+    community_id: int
+    total: int
+    members: List[CommunityMemberSchema]
@@ -20,6 +20,20 @@ class ThemeTopicAnalytics(BaseModel):
     total_authors: int
 
 
+class TopicAuthorCount(BaseModel):
+    topic_id: int
+    topic_name: str
+    tweet_count: int
+    unique_authors: int
+
+
+class TopicUniqueAuthors(BaseModel):
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    topics: List[TopicAuthorCount]
+    total_authors: int
+
+
 class AuthorExpertise(BaseModel):
     author_id: str
     topic_id: int
@@ -34,6 +48,14 @@ class AuthorExpertise(BaseModel):
     avg_engagement: float
 
 
+class TopicNewAuthor(BaseModel):
+    author_id: str
+    topic_id: int
+    topic_name: str
+    first_seen: str
+    first_tweet_id: Optional[str] = None
+
+
 class TopicEvolutionTrend(BaseModel):
     topic_id: int
     topic_name: str
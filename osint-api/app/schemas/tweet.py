@@ -67,5 +67,7 @@ class TweetListResponse(BaseModel):
     """Response model for list of tweets"""
     tweets: List[TweetSchema]
     total: int
+    total_strategy: Optional[str] = None  # exact | estimated | cached
     limit: int
-    offset: int
\ No newline at end of file
+    offset: int
+    next_cursor: Optional[str] = None  # Pass as `cursor` to fetch the next page
\ No newline at end of file
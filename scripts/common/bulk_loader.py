@@ -0,0 +1,178 @@
+"""
+COPY-based bulk upsert for compute outputs
+
+Rows are streamed with COPY ... FROM STDIN into a temporary staging table
+shaped like the target columns, then merged into the target with a single
+INSERT ... ON CONFLICT per batch. This avoids per-row statement overhead
+(execute_values still sends and plans one large INSERT per page).
+
+The loader never commits; the caller owns the transaction.
+"""
+
+import io
+import json
+import os
+import time
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Sequence
+
+DEFAULT_BATCH_SIZE = int(os.getenv("BULK_COPY_BATCH_SIZE", 50000))
+
+
+def _escape_copy_text(value: str) -> str:
+    """Escape a value for COPY text format"""
+    return (
+        value.replace('\\', '\\\\')
+        .replace('\t', '\\t')
+        .replace('\n', '\\n')
+        .replace('\r', '\\r')
+    )
+
+
+def _array_literal(values: Sequence) -> str:
+    """Postgres array literal for a list of scalars"""
+    items = []
+    for v in values:
+        if v is None:
+            items.append('NULL')
+        else:
+            text = _to_text(v).replace('\\', '\\\\').replace('"', '\\"')
+            items.append(f'"{text}"')
+    return '{' + ','.join(items) + '}'
+
+
+def _to_text(value) -> str:
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (list, tuple)):
+        return _array_literal(value)
+    if isinstance(value, dict):
+        return json.dumps(value)
+    if isinstance(value, Decimal):
+        return format(value, 'f')
+    return str(value)
+
+
+def format_copy_row(row: Sequence) -> str:
+    """
+    One COPY text-format line. Lists/tuples become Postgres arrays and dicts
+    become JSON; pass JSON arrays pre-serialized with json.dumps.
+    """
+    return '\t'.join(
+        '\\N' if v is None else _escape_copy_text(_to_text(v))
+        for v in row
+    ) + '\n'
+
+
+class BulkLoader:
+    def __init__(
+        self,
+        conn,
+        table: str,
+        columns: List[str],
+        conflict_columns: List[str],
+        update_columns: Optional[List[str]] = None,
+        extra_updates: Optional[Dict[str, str]] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        verbose: bool = False
+    ):
+        """
+        Args:
+            conn: psycopg2 connection (search_path must resolve `table`)
+            table: Target table
+            columns: Columns supplied for each row, in order
+            conflict_columns: Unique key used for ON CONFLICT
+            update_columns: Columns overwritten on conflict (default: all non-key columns);
+                an empty list means ON CONFLICT DO NOTHING
+            extra_updates: Additional SET expressions on conflict, e.g. {'processed_at': 'NOW()'}
+            batch_size: Rows per COPY + merge round trip
+            verbose: Print progress and rows/s after each batch
+        """
+        self.conn = conn
+        self.table = table
+        self.columns = list(columns)
+        self.conflict_columns = list(conflict_columns)
+        if update_columns is None:
+            update_columns = [c for c in self.columns if c not in self.conflict_columns]
+        self.update_columns = list(update_columns)
+        self.extra_updates = extra_updates or {}
+        self.batch_size = batch_size
+        self.verbose = verbose
+
+        self.staging_table = f"_stage_{table.replace('.', '_')}"
+        self.rows_loaded = 0
+        self.elapsed = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows_loaded / self.elapsed if self.elapsed > 0 else 0.0
+
+    def _merge_query(self) -> str:
+        column_list = ', '.join(self.columns)
+        conflict = ', '.join(self.conflict_columns)
+
+        assignments = [f"{c} = EXCLUDED.{c}" for c in self.update_columns]
+        assignments += [f"{c} = {expr}" for c, expr in self.extra_updates.items()]
+
+        if assignments:
+            action = "DO UPDATE SET " + ', '.join(assignments)
+        else:
+            action = "DO NOTHING"
+
+        return (
+            f"INSERT INTO {self.table} ({column_list}) "
+            f"SELECT {column_list} FROM {self.staging_table} "
+            f"ON CONFLICT ({conflict}) {action}"
+        )
+
+    def _ensure_staging(self, cur):
+        # Same column types as the target, none of its constraints or defaults.
+        # Created per transaction: a rollback would drop it anyway.
+        cur.execute(
+            f"CREATE TEMP TABLE IF NOT EXISTS {self.staging_table} ON COMMIT DROP AS "
+            f"SELECT {', '.join(self.columns)} FROM {self.table} WITH NO DATA"
+        )
+
+    def _load_batch(self, cur, batch: List[Sequence]) -> int:
+        buffer = io.StringIO(''.join(format_copy_row(row) for row in batch))
+
+        self._ensure_staging(cur)
+        cur.copy_expert(
+            f"COPY {self.staging_table} ({', '.join(self.columns)}) FROM STDIN",
+            buffer
+        )
+        cur.execute(self._merge_query())
+        merged = cur.rowcount
+        cur.execute(f"TRUNCATE {self.staging_table}")
+        return merged
+
+    def load(self, rows: Iterable[Sequence]) -> int:
+        """Upsert rows (an iterable, consumed in batches); returns rows inserted or updated"""
+        merged_total = 0
+        batch = []
+
+        with self.conn.cursor() as cur:
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= self.batch_size:
+                    merged_total += self._timed_batch(cur, batch)
+                    batch = []
+
+            if batch:
+                merged_total += self._timed_batch(cur, batch)
+
+        return merged_total
+
+    def _timed_batch(self, cur, batch: List[Sequence]) -> int:
+        started = time.time()
+        merged = self._load_batch(cur, batch)
+        self.elapsed += time.time() - started
+        self.rows_loaded += len(batch)
+
+        if self.verbose:
+            print(f"  {self.table}: {self.rows_loaded:,} rows loaded "
+                  f"({self.rows_per_second:,.0f} rows/s)")
+        return merged
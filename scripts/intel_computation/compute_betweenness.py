@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+Sampled betweenness centrality for author_intelligence
+
+Builds the author interaction graph for a 7/30/90-day window from
+tweets_deduplicated (replies, retweets and mentions, treated as undirected,
+unweighted edges), runs Brandes' algorithm from k randomly sampled pivot
+sources and writes the normalised estimate into
+author_intelligence.betweenness_centrality for every author the strategic
+intelligence stage produced for that date and period.
+
+The graph is held as CSR arrays (indptr/indices) and each BFS is level
+synchronous: a whole frontier is expanded with a handful of NumPy
+operations, and a batch of pivots is searched at once on a flattened
+(pivot, node) state. Authors in the top percentile of betweenness are then
+treated as network bridges for monitoring_priority_score.
+
+Run after osint.compute_author_intelligence for the same date and period.
+"""
+
+import psycopg2
+from datetime import datetime, timedelta
+import sys
+import time
+import argparse
+from typing import Dict, List, Tuple
+import os
+
+import numpy as np
+from dotenv import load_dotenv
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.bulk_loader import BulkLoader
+
+# Load environment variables
+load_dotenv('../../.env')
+
+DATABASE_CONFIG = {
+    "host": os.getenv("POSTGRES_HOST", "localhost"),
+    "port": int(os.getenv("POSTGRES_PORT", 5432)),
+    "database": os.getenv("POSTGRES_DATABASE", "neuron"),
+    "user": os.getenv("POSTGRES_USER", "tabreaz"),
+    "password": os.getenv("POSTGRES_PASSWORD", "admin"),
+    "schema": os.getenv("POSTGRES_SCHEMA", "osint")
+}
+
+PERIOD_DAYS = {'7_days': 7, '30_days': 30, '90_days': 90}
+
+# Same value the SQL stage gives network bridges in monitoring_priority_score
+BRIDGE_PRIORITY = 0.7
+
+# Distinct author -> author interactions in the window; self-interactions are dropped
+EDGE_QUERY = """
+WITH window_tweets AS (
+    SELECT t.author_id, t.in_reply_to_user_id, t.retweeted_tweet_id, t.user_mentions
+    FROM tweets_deduplicated t
+    WHERE t.created_at >= %(start)s
+      AND t.created_at < %(end)s
+      AND t.author_id IS NOT NULL
+)
+SELECT DISTINCT e.source, e.target
+FROM (
+    SELECT w.author_id, w.in_reply_to_user_id
+    FROM window_tweets w
+    WHERE w.in_reply_to_user_id IS NOT NULL
+
+    UNION ALL
+
+    SELECT w.author_id, rt.author_id
+    FROM window_tweets w
+    JOIN tweets_deduplicated rt ON rt.tweet_id = w.retweeted_tweet_id
+    WHERE w.retweeted_tweet_id IS NOT NULL
+
+    UNION ALL
+
+    SELECT w.author_id, COALESCE(m->>'id_str', m->>'id')
+    FROM window_tweets w,
+         jsonb_array_elements(
+             CASE WHEN jsonb_typeof(w.user_mentions) = 'array'
+                  THEN w.user_mentions ELSE '[]'::jsonb END
+         ) m
+) e(source, target)
+WHERE e.target IS NOT NULL
+  AND e.target <> ''
+  AND e.source <> e.target
+"""
+
+
+def build_csr(sources: np.ndarray, targets: np.ndarray, n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Undirected CSR adjacency (indptr, indices) without duplicate edges"""
+    low = np.minimum(sources, targets).astype(np.int64)
+    high = np.maximum(sources, targets).astype(np.int64)
+    pairs = np.unique(low * n + high)
+    low, high = pairs // n, pairs % n
+
+    heads = np.concatenate([low, high])
+    tails = np.concatenate([high, low])
+    order = np.argsort(heads, kind='stable')
+
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(heads, minlength=n), out=indptr[1:])
+    return indptr, tails[order]
+
+
+def _expand(indptr: np.ndarray, indices: np.ndarray, nodes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Every edge leaving `nodes`: (position of the owning node in `nodes`, neighbour)"""
+    starts = indptr[nodes]
+    counts = indptr[nodes + 1] - starts
+    owner = np.repeat(np.arange(len(nodes)), counts)
+    offsets = np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts)
+    return owner, indices[np.repeat(starts, counts) + offsets]
+
+
+def _dag_edges(indptr: np.ndarray, indices: np.ndarray, n: int,
+               frontier: np.ndarray, dist: np.ndarray, depth: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Shortest-path DAG edges from `frontier` (flat pivot*n + node states) to depth + 1"""
+    owner, neighbours = _expand(indptr, indices, frontier % n)
+    src = frontier[owner]
+    dst = (src // n) * n + neighbours
+    on_path = dist[dst] == depth + 1
+    return src[on_path], dst[on_path]
+
+
+def brandes_dependencies(indptr: np.ndarray, indices: np.ndarray, pivots: np.ndarray) -> np.ndarray:
+    """Sum over `pivots` of Brandes' dependency delta_s(v) for every node v"""
+    n = len(indptr) - 1
+    size = len(pivots) * n
+    dist = np.full(size, -1, dtype=np.int32)
+    sigma = np.zeros(size)
+    claim = np.zeros(size, dtype=np.int64)
+
+    frontier = np.arange(len(pivots), dtype=np.int64) * n + pivots
+    dist[frontier] = 0
+    sigma[frontier] = 1.0
+    levels = [frontier]
+
+    # Forward: BFS levels and shortest-path counts
+    depth = 0
+    while True:
+        owner, neighbours = _expand(indptr, indices, frontier % n)
+        src = frontier[owner]
+        dst = (src // n) * n + neighbours
+        reached = dst[dist[dst] < 0]
+        if reached.size == 0:
+            break
+        # Deduplicate without sorting: the last write to claim[] wins for each state
+        claim[reached] = np.arange(reached.size)
+        discovered = reached[claim[reached] == np.arange(reached.size)]
+        dist[discovered] = depth + 1
+
+        on_path = dist[dst] == depth + 1
+        np.add.at(sigma, dst[on_path], sigma[src[on_path]])
+
+        frontier = discovered
+        levels.append(frontier)
+        depth += 1
+
+    # Backward: accumulate dependencies from the deepest level up
+    delta = np.zeros(size)
+    for depth in range(len(levels) - 2, -1, -1):
+        src, dst = _dag_edges(indptr, indices, n, levels[depth], dist, depth)
+        np.add.at(delta, src, sigma[src] / sigma[dst] * (1.0 + delta[dst]))
+
+    delta[levels[0]] = 0.0
+    return delta.reshape(len(pivots), n).sum(axis=0)
+
+
+def approximate_betweenness(indptr: np.ndarray, indices: np.ndarray, pivots: int,
+                            batch_size: int = 32, seed: int = 0) -> np.ndarray:
+    """
+    Normalised betweenness estimated from `pivots` random sources (exact when
+    pivots >= number of nodes). Scaled like the exact undirected value:
+    pair dependencies divided by (n - 1)(n - 2).
+    """
+    n = len(indptr) - 1
+    if n < 3:
+        return np.zeros(n)
+
+    rng = np.random.default_rng(seed)
+    k = min(pivots, n)
+    sources = np.arange(n) if k == n else rng.choice(n, size=k, replace=False)
+
+    totals = np.zeros(n)
+    for start in range(0, k, batch_size):
+        totals += brandes_dependencies(indptr, indices, sources[start:start + batch_size])
+
+    return totals * (n / k) / ((n - 1) * (n - 2))
+
+
+class BetweennessComputer:
+    def __init__(self, pivots: int = 512, batch_size: int = 32, seed: int = 0,
+                 bridge_percentile: float = 99.0, verbose: bool = True):
+        self.pivots = pivots
+        self.batch_size = batch_size
+        self.seed = seed
+        self.bridge_percentile = bridge_percentile
+        self.verbose = verbose
+        self.conn = None
+        self.connect()
+        self.loader = BulkLoader(
+            self.conn, 'author_intelligence',
+            ['analysis_date', 'author_id', 'analysis_period', 'betweenness_centrality'],
+            conflict_columns=['analysis_date', 'author_id', 'analysis_period']
+        )
+
+    def connect(self):
+        """Establish database connection"""
+        try:
+            self.conn = psycopg2.connect(
+                host=DATABASE_CONFIG["host"],
+                port=DATABASE_CONFIG["port"],
+                database=DATABASE_CONFIG["database"],
+                user=DATABASE_CONFIG["user"],
+                password=DATABASE_CONFIG["password"]
+            )
+            with self.conn.cursor() as cur:
+                cur.execute(f"SET search_path TO {DATABASE_CONFIG['schema']}, public")
+            self.conn.commit()
+            if self.verbose:
+                print(f"Connected to database: {DATABASE_CONFIG['database']}")
+        except Exception as e:
+            print(f"Database connection failed: {e}")
+            raise
+
+    def load_graph(self, start_date: datetime, end_date: datetime) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """Interaction edges in [start_date, end_date) as (author ids, source index, target index)"""
+        node_index: Dict[str, int] = {}
+        sources: List[int] = []
+        targets: List[int] = []
+
+        with self.conn.cursor(name='betweenness_edges') as cur:
+            cur.itersize = 100000
+            cur.execute(EDGE_QUERY, {'start': start_date, 'end': end_date})
+            for source, target in cur:
+                sources.append(node_index.setdefault(source, len(node_index)))
+                targets.append(node_index.setdefault(target, len(node_index)))
+        self.conn.commit()
+
+        return (list(node_index),
+                np.asarray(sources, dtype=np.int64),
+                np.asarray(targets, dtype=np.int64))
+
+    def get_intelligence_authors(self, analysis_date: datetime, period: str) -> List[int]:
+        """Authors the intelligence stage wrote for this date and period"""
+        with self.conn.cursor() as cur:
+            cur.execute("""
+                SELECT author_id FROM author_intelligence
+                WHERE analysis_date = %s AND analysis_period = %s
+            """, (analysis_date.date(), period))
+            return [row[0] for row in cur.fetchall()]
+
+    def compute_period(self, analysis_date: datetime, period: str) -> Dict:
+        """Estimate betweenness for one window and store it; returns run statistics"""
+        started = time.time()
+        authors = self.get_intelligence_authors(analysis_date, period)
+        if not authors:
+            print(f"  {period}: no author_intelligence rows for {analysis_date.date()}, "
+                  f"run compute_author_intelligence first")
+            return {'period': period, 'authors': 0}
+
+        # Same inclusive window as compute_author_intelligence
+        window_end = analysis_date + timedelta(days=1)
+        window_start = window_end - timedelta(days=PERIOD_DAYS[period])
+        node_ids, sources, targets = self.load_graph(window_start, window_end)
+
+        indptr, indices = build_csr(sources, targets, len(node_ids))
+        scores = approximate_betweenness(indptr, indices, self.pivots, self.batch_size, self.seed)
+        graph_seconds = time.time() - started
+
+        position = {node_id: i for i, node_id in enumerate(node_ids)}
+        author_scores = {
+            author_id: float(scores[position[str(author_id)]]) if str(author_id) in position else 0.0
+            for author_id in authors
+        }
+
+        self.loader.load(
+            (analysis_date.date(), author_id, period, score)
+            for author_id, score in author_scores.items()
+        )
+        bridges = self.flag_bridges(analysis_date, period, list(author_scores.values()))
+        self.conn.commit()
+
+        stats = {
+            'period': period,
+            'authors': len(authors),
+            'nodes': len(node_ids),
+            'edges': len(indices) // 2,
+            'pivots': min(self.pivots, len(node_ids)),
+            'bridges': bridges,
+            'max_centrality': max(author_scores.values()),
+            'graph_seconds': graph_seconds,
+            'total_seconds': time.time() - started
+        }
+        if self.verbose:
+            print(f"  {period}: {stats['nodes']:,} nodes, {stats['edges']:,} edges, "
+                  f"{stats['pivots']} pivots, {stats['authors']:,} authors scored, "
+                  f"{bridges} bridges ({stats['graph_seconds']:.1f}s graph, "
+                  f"{stats['total_seconds']:.1f}s total)")
+        return stats
+
+    def flag_bridges(self, analysis_date: datetime, period: str, scores: List[float]) -> int:
+        """Raise monitoring priority for authors in the top betweenness percentile"""
+        positive = np.asarray([s for s in scores if s > 0])
+        if positive.size == 0:
+            return 0
+        threshold = float(np.percentile(positive, self.bridge_percentile))
+
+        with self.conn.cursor() as cur:
+            cur.execute("""
+                UPDATE author_intelligence
+                SET monitoring_priority_score = GREATEST(monitoring_priority_score, %s)
+                WHERE analysis_date = %s
+                  AND analysis_period = %s
+                  AND betweenness_centrality >= %s
+                  AND betweenness_centrality > 0
+            """, (BRIDGE_PRIORITY, analysis_date.date(), period, threshold))
+            return cur.rowcount
+
+    def close(self):
+        if self.conn:
+            self.conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compute sampled betweenness centrality for author_intelligence')
+    parser.add_argument('--date', type=str,
+                       help='Analysis date (YYYY-MM-DD, default: yesterday)')
+    parser.add_argument('--period', choices=list(PERIOD_DAYS), nargs='+', default=list(PERIOD_DAYS),
+                       help='Analysis periods to compute (default: all)')
+    parser.add_argument('--pivots', type=int, default=512,
+                       help='Sampled BFS sources; more pivots, lower variance (default: 512)')
+    parser.add_argument('--batch-size', type=int, default=32,
+                       help='Pivots searched together; bounds memory (default: 32)')
+    parser.add_argument('--seed', type=int, default=0,
+                       help='Random seed for pivot sampling (default: 0)')
+    parser.add_argument('--bridge-percentile', type=float, default=99.0,
+                       help='Authors at or above this betweenness percentile count as bridges (default: 99)')
+
+    args = parser.parse_args()
+
+    if args.date:
+        analysis_date = datetime.strptime(args.date, '%Y-%m-%d')
+    else:
+        analysis_date = datetime.combine(datetime.now().date() - timedelta(days=1), datetime.min.time())
+
+    computer = BetweennessComputer(
+        pivots=args.pivots,
+        batch_size=args.batch_size,
+        seed=args.seed,
+        bridge_percentile=args.bridge_percentile
+    )
+
+    try:
+        print(f"Computing betweenness centrality for {analysis_date.date()}")
+        for period in args.period:
+            computer.compute_period(analysis_date, period)
+
+        if computer.loader.rows_loaded:
+            print(f"Wrote {computer.loader.rows_loaded:,} rows "
+                  f"({computer.loader.rows_per_second:,.0f} rows/s)")
+
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    finally:
+        computer.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+Louvain community detection over the weighted interaction graph
+
+Builds user -> user edges from the replies, retweets and mentions posted in
+a 7/30/90-day window (tweets_deduplicated, as compute_betweenness.py does),
+weights each edge by its number of interactions inside the window, treats
+the edges as undirected and clusters the accounts by modularity. Weights
+are not user_network.total_weight, which counts interactions over an
+edge's whole lifetime.
+Assignments go to author_communities as (author_id, community_id, window,
+modularity), replacing the previous run for the same date and window.
+
+Louvain runs entirely on edge arrays: each local-moving sweep scores every
+node against every neighbouring community with one group-by over the edge
+list and moves a random share of the nodes that gain, keeping the sweep
+only if modularity improves. Communities are then collapsed into nodes
+(another group-by) and the next level starts, until nothing merges.
+"""
+
+import psycopg2
+from datetime import datetime, timedelta
+import sys
+import time
+import argparse
+from typing import Dict, List, Optional, Tuple
+import os
+
+import numpy as np
+from dotenv import load_dotenv
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.bulk_loader import BulkLoader
+
+# Load environment variables
+load_dotenv('../../.env')
+
+DATABASE_CONFIG = {
+    "host": os.getenv("POSTGRES_HOST", "localhost"),
+    "port": int(os.getenv("POSTGRES_PORT", 5432)),
+    "database": os.getenv("POSTGRES_DATABASE", "neuron"),
+    "user": os.getenv("POSTGRES_USER", "tabreaz"),
+    "password": os.getenv("POSTGRES_PASSWORD", "admin"),
+    "schema": os.getenv("POSTGRES_SCHEMA", "osint")
+}
+
+PERIOD_DAYS = {'7_days': 7, '30_days': 30, '90_days': 90}
+
+COMMUNITY_COLUMNS = [
+    'analysis_date', 'analysis_window', 'author_id', 'community_id',
+    'community_size', 'weighted_degree', 'modularity'
+]
+SCHEMA_SQL_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'sql', 'create_author_communities.sql'
+)
+
+RELATIONSHIP_TYPES = ['reply', 'retweet', 'mention']
+
+# Interactions inside the window, counted per (source, target)
+EDGE_QUERY = """
+WITH window_tweets AS (
+    SELECT t.author_id, t.in_reply_to_user_id, t.retweeted_tweet_id, t.user_mentions
+    FROM tweets_deduplicated t
+    WHERE t.created_at >= %(start)s
+      AND t.created_at < %(end)s
+      AND t.author_id IS NOT NULL
+)
+SELECT e.source, e.target, COUNT(*)::float AS weight
+FROM (
+    SELECT w.author_id, w.in_reply_to_user_id, 'reply'
+    FROM window_tweets w
+    WHERE w.in_reply_to_user_id IS NOT NULL
+
+    UNION ALL
+
+    SELECT w.author_id, rt.author_id, 'retweet'
+    FROM window_tweets w
+    JOIN tweets_deduplicated rt ON rt.tweet_id = w.retweeted_tweet_id
+    WHERE w.retweeted_tweet_id IS NOT NULL
+
+    UNION ALL
+
+    SELECT w.author_id, COALESCE(m->>'id_str', m->>'id'), 'mention'
+    FROM window_tweets w,
+         jsonb_array_elements(
+             CASE WHEN jsonb_typeof(w.user_mentions) = 'array'
+                  THEN w.user_mentions ELSE '[]'::jsonb END
+         ) m
+) e(source, target, relationship_type)
+WHERE e.target IS NOT NULL
+  AND e.target <> ''
+  AND e.source <> e.target
+  AND (%(relationship_types)s::text[] IS NULL OR e.relationship_type = ANY(%(relationship_types)s::text[]))
+GROUP BY e.source, e.target
+"""
+
+
+def symmetric_edges(sources: np.ndarray, targets: np.ndarray, weights: np.ndarray,
+                    n: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Undirected edge list holding each edge in both directions, with weights
+    of parallel / reciprocal edges summed
+    """
+    low = np.minimum(sources, targets).astype(np.int64)
+    high = np.maximum(sources, targets).astype(np.int64)
+    keys, inverse = np.unique(low * n + high, return_inverse=True)
+    merged = np.bincount(inverse, weights=weights)
+    low, high = keys // n, keys % n
+    return (np.concatenate([low, high]),
+            np.concatenate([high, low]),
+            np.concatenate([merged, merged]))
+
+
+def modularity(u: np.ndarray, v: np.ndarray, w: np.ndarray, labels: np.ndarray,
+               resolution: float = 1.0) -> float:
+    """Modularity of `labels` on a symmetric edge list (self-loops on the diagonal)"""
+    two_m = w.sum()
+    if two_m == 0:
+        return 0.0
+    internal = w[labels[u] == labels[v]].sum()
+    totals = np.bincount(labels[u], weights=w)
+    return float(internal / two_m - resolution * np.sum((totals / two_m) ** 2))
+
+
+def local_moving(u: np.ndarray, v: np.ndarray, w: np.ndarray, n: int,
+                 resolution: float, rng: np.random.Generator,
+                 max_sweeps: int = 100, move_fraction: float = 0.5,
+                 tol: float = 1e-7) -> Tuple[np.ndarray, float]:
+    """
+    Louvain phase one, all nodes at once. Returns (labels, modularity).
+
+    Every node picks its best neighbouring community from the same snapshot,
+    so simultaneous moves can undo each other: singleton pairs only merge
+    towards the smaller label, a random share of the improving nodes moves
+    per sweep, and a sweep that lowers modularity is rejected and retried
+    with a smaller share.
+    """
+    labels = np.arange(n)
+    degree = np.bincount(u, weights=w, minlength=n)
+    two_m = w.sum()
+    off_diagonal = u != v
+    ou, ov, ow = u[off_diagonal], v[off_diagonal], w[off_diagonal]
+    q = modularity(u, v, w, labels, resolution)
+    if ou.size == 0:
+        # Only self-loops left (e.g. every component already merged): nothing can move
+        return labels, q
+
+    for _ in range(max_sweeps):
+        totals = np.bincount(labels, weights=degree, minlength=n)
+
+        # Weight from each node to each neighbouring community
+        keys, inverse = np.unique(ou * n + labels[ov], return_inverse=True)
+        to_comm = np.bincount(inverse, weights=ow)
+        node, comm = keys // n, keys % n
+
+        own = comm == labels[node]
+        to_own = np.zeros(n)
+        to_own[node[own]] = to_comm[own]
+
+        # Modularity gain (times m) of leaving the current community for `comm`
+        current = labels[node]
+        gain = (to_comm - to_own[node]
+                - resolution * degree[node] * (totals[comm] - totals[current] + degree[node]) / two_m)
+        gain[own] = 0.0
+
+        # np.unique sorted rows by node, so each node's candidates are contiguous
+        starts = np.flatnonzero(np.r_[True, node[1:] != node[:-1]])
+        best_gain = np.maximum.reduceat(gain, starts)
+        group = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, len(node)]))
+        rows = np.flatnonzero((gain == best_gain[group]) & (gain > tol))
+        movers = rows[np.r_[True, node[rows][1:] != node[rows][:-1]]] if rows.size else rows
+
+        # Two singletons joining each other would just swap labels: only the
+        # one with the larger label moves
+        sizes = np.bincount(labels, minlength=n)
+        swap = ((sizes[current[movers]] == 1) & (sizes[comm[movers]] == 1)
+                & (comm[movers] > current[movers]))
+        movers = movers[~swap]
+        if movers.size == 0:
+            break
+
+        if move_fraction < 1.0:
+            movers = movers[rng.random(movers.size) < move_fraction]
+            if movers.size == 0:
+                continue
+        candidate = labels.copy()
+        candidate[node[movers]] = comm[movers]
+        candidate_q = modularity(u, v, w, candidate, resolution)
+
+        if candidate_q > q + tol:
+            labels, q = candidate, candidate_q
+        else:
+            move_fraction /= 2
+            if move_fraction < 0.01:
+                break
+
+    return labels, q
+
+
+def aggregate(u: np.ndarray, v: np.ndarray, w: np.ndarray,
+              labels: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, int, np.ndarray]:
+    """Collapse communities into nodes: (u, v, w, node count, node -> new node)"""
+    _, remap = np.unique(labels, return_inverse=True)
+    c = int(remap.max()) + 1
+    keys, inverse = np.unique(remap[u] * c + remap[v], return_inverse=True)
+    return keys // c, keys % c, np.bincount(inverse, weights=w), c, remap
+
+
+def louvain(u: np.ndarray, v: np.ndarray, w: np.ndarray, n: int, resolution: float = 1.0,
+            seed: int = 0, max_levels: int = 20) -> Tuple[np.ndarray, float]:
+    """Community per node, numbered by decreasing size, and the partition's modularity"""
+    rng = np.random.default_rng(seed)
+    membership = np.arange(n)
+    level_u, level_v, level_w, level_n = u, v, w, n
+
+    for _ in range(max_levels):
+        labels, _ = local_moving(level_u, level_v, level_w, level_n, resolution, rng)
+        level_u, level_v, level_w, merged_n, remap = aggregate(level_u, level_v, level_w, labels)
+        membership = remap[membership]
+        if merged_n == level_n:
+            break
+        level_n = merged_n
+
+    sizes = np.bincount(membership)
+    rank = np.empty(len(sizes), dtype=np.int64)
+    rank[np.argsort(-sizes, kind='stable')] = np.arange(len(sizes))
+    membership = rank[membership]
+    return membership, modularity(u, v, w, membership, resolution)
+
+
+class CommunityComputer:
+    def __init__(self, resolution: float = 1.0, seed: int = 0,
+                 relationship_types: Optional[List[str]] = None, verbose: bool = True):
+        self.resolution = resolution
+        self.seed = seed
+        self.relationship_types = relationship_types
+        self.verbose = verbose
+        self.conn = None
+        self.connect()
+        self.loader = BulkLoader(
+            self.conn, 'author_communities', COMMUNITY_COLUMNS,
+            conflict_columns=['analysis_date', 'analysis_window', 'author_id']
+        )
+
+    def connect(self):
+        """Establish database connection"""
+        try:
+            self.conn = psycopg2.connect(
+                host=DATABASE_CONFIG["host"],
+                port=DATABASE_CONFIG["port"],
+                database=DATABASE_CONFIG["database"],
+                user=DATABASE_CONFIG["user"],
+                password=DATABASE_CONFIG["password"]
+            )
+            with self.conn.cursor() as cur:
+                cur.execute(f"SET search_path TO {DATABASE_CONFIG['schema']}, public")
+            self.conn.commit()
+            if self.verbose:
+                print(f"Connected to database: {DATABASE_CONFIG['database']}")
+        except Exception as e:
+            print(f"Database connection failed: {e}")
+            raise
+
+    def ensure_schema(self):
+        """Create author_communities if it does not exist"""
+        with open(SCHEMA_SQL_FILE) as f:
+            ddl = f.read()
+        with self.conn.cursor() as cur:
+            cur.execute(ddl)
+        self.conn.commit()
+
+    def load_graph(self, start_date: datetime, end_date: datetime) -> Tuple[List[str], np.ndarray, np.ndarray, np.ndarray]:
+        """User -> user edges of [start_date, end_date), weighted by interactions in that range"""
+        node_index: Dict[str, int] = {}
+        sources: List[int] = []
+        targets: List[int] = []
+        weights: List[float] = []
+
+        with self.conn.cursor(name='community_edges') as cur:
+            cur.itersize = 100000
+            cur.execute(EDGE_QUERY, {
+                'start': start_date,
+                'end': end_date,
+                'relationship_types': self.relationship_types
+            })
+            for source, target, weight in cur:
+                sources.append(node_index.setdefault(source, len(node_index)))
+                targets.append(node_index.setdefault(target, len(node_index)))
+                weights.append(weight or 0.0)
+        self.conn.commit()
+
+        return (list(node_index),
+                np.asarray(sources, dtype=np.int64),
+                np.asarray(targets, dtype=np.int64),
+                np.asarray(weights, dtype=np.float64))
+
+    def compute_window(self, analysis_date: datetime, window: str) -> Dict:
+        """Cluster one window and replace its stored assignments; returns run statistics"""
+        started = time.time()
+        window_end = analysis_date + timedelta(days=1)
+        window_start = window_end - timedelta(days=PERIOD_DAYS[window])
+
+        node_ids, sources, targets, weights = self.load_graph(window_start, window_end)
+        if not node_ids:
+            print(f"  {window}: no interactions in the window")
+            return {'window': window, 'authors': 0}
+
+        u, v, w = symmetric_edges(sources, targets, weights, len(node_ids))
+        membership, q = louvain(u, v, w, len(node_ids), self.resolution, self.seed)
+        cluster_seconds = time.time() - started
+
+        sizes = np.bincount(membership)
+        weighted_degree = np.bincount(u, weights=w, minlength=len(node_ids))
+
+        with self.conn.cursor() as cur:
+            cur.execute("""
+                DELETE FROM author_communities
+                WHERE analysis_date = %s AND analysis_window = %s
+            """, (analysis_date.date(), window))
+        self.loader.load(
+            (analysis_date.date(), window, node_id, int(membership[i]),
+             int(sizes[membership[i]]), float(weighted_degree[i]), q)
+            for i, node_id in enumerate(node_ids)
+        )
+        self.conn.commit()
+
+        stats = {
+            'window': window,
+            'authors': len(node_ids),
+            'edges': len(u) // 2,
+            'communities': len(sizes),
+            'non_singleton': int((sizes > 1).sum()),
+            'largest': int(sizes.max()),
+            'modularity': q,
+            'cluster_seconds': cluster_seconds,
+            'total_seconds': time.time() - started
+        }
+        if self.verbose:
+            print(f"  {window}: {stats['authors']:,} authors, {stats['edges']:,} edges -> "
+                  f"{stats['communities']:,} communities ({stats['non_singleton']:,} with 2+ members, "
+                  f"largest {stats['largest']:,}), modularity {q:.4f} "
+                  f"({cluster_seconds:.1f}s clustering, {stats['total_seconds']:.1f}s total)")
+        return stats
+
+    def close(self):
+        if self.conn:
+            self.conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Detect author communities in the interaction graph (Louvain)')
+    parser.add_argument('--date', type=str,
+                       help='Analysis date (YYYY-MM-DD, default: yesterday)')
+    parser.add_argument('--window', choices=list(PERIOD_DAYS), nargs='+', default=list(PERIOD_DAYS),
+                       help='Windows to cluster (default: all)')
+    parser.add_argument('--relationship-type', choices=RELATIONSHIP_TYPES, nargs='+',
+                       help='Only count these interactions (default: all)')
+    parser.add_argument('--resolution', type=float, default=1.0,
+                       help='Modularity resolution; above 1 gives smaller communities (default: 1.0)')
+    parser.add_argument('--seed', type=int, default=0,
+                       help='Random seed for the local-moving sweeps (default: 0)')
+
+    args = parser.parse_args()
+
+    if args.date:
+        analysis_date = datetime.strptime(args.date, '%Y-%m-%d')
+    else:
+        analysis_date = datetime.combine(datetime.now().date() - timedelta(days=1), datetime.min.time())
+
+    computer = CommunityComputer(
+        resolution=args.resolution,
+        seed=args.seed,
+        relationship_types=args.relationship_type
+    )
+
+    try:
+        computer.ensure_schema()
+
+        print(f"Detecting communities for {analysis_date.date()}")
+        for window in args.window:
+            computer.compute_window(analysis_date, window)
+
+        if computer.loader.rows_loaded:
+            print(f"Wrote {computer.loader.rows_loaded:,} rows "
+                  f"({computer.loader.rows_per_second:,.0f} rows/s)")
+
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    finally:
+        computer.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,601 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate (copy-paste) text clusters from tweets_deduplicated
+
+New tweets are read in fetched_at order past the job's watermark and
+processed in batches:
+
+1. Text is normalised (lowercase, no URLs/mentions/punctuation) and cut
+   into overlapping 8-byte UTF-8 shingles, each packed into a uint64.
+2. MinHash signatures (NUM_PERM multiply-shift hashes) are computed for the
+   whole batch at once: one hash + minimum.reduceat over all shingles per
+   permutation.
+3. Signatures are split into BANDS bands; every (band, bucket) keeps the
+   first tweet that landed in it as representative (text_lsh_buckets). A
+   tweet is only compared with the representatives of its buckets, so the
+   work per tweet is constant rather than a pairwise scan.
+4. Candidate pairs whose signatures agree on at least --threshold of the
+   positions are linked, linked tweets are merged into clusters (joining
+   or merging existing clusters), and clusters with posts from at least
+   --min-authors distinct authors are written to text_clusters.
+
+Retweets are skipped (they are exact copies by construction), as are texts
+too short to tell a campaign from a common phrase. Changing NUM_PERM or
+BANDS invalidates stored signatures: run with --rebuild afterwards.
+"""
+
+import psycopg2
+from datetime import datetime, timedelta
+import re
+import sys
+import time
+import argparse
+from typing import Dict, List, Optional, Tuple
+import os
+
+import numpy as np
+from dotenv import load_dotenv
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.bulk_loader import BulkLoader
+
+# Load environment variables
+load_dotenv('../../.env')
+
+DATABASE_CONFIG = {
+    "host": os.getenv("POSTGRES_HOST", "localhost"),
+    "port": int(os.getenv("POSTGRES_PORT", 5432)),
+    "database": os.getenv("POSTGRES_DATABASE", "neuron"),
+    "user": os.getenv("POSTGRES_USER", "tabreaz"),
+    "password": os.getenv("POSTGRES_PASSWORD", "admin"),
+    "schema": os.getenv("POSTGRES_SCHEMA", "osint")
+}
+
+JOB_NAME = 'text_clusters'
+
+# 64 hashes in 16 bands of 4 rows: pairs above ~0.5 Jaccard become candidates;
+# a pair at 0.7 is missed ~1% of the time, at 0.8 ~0.02%
+NUM_PERM = 64
+BANDS = 16
+ROWS_PER_BAND = NUM_PERM // BANDS
+SHINGLE_BYTES = 8
+HASH_SEED = 1
+
+SCHEMA_SQL_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'sql', 'create_text_clusters.sql'
+)
+
+URL_PATTERN = re.compile(r'https?://\S+')
+MENTION_PATTERN = re.compile(r'(^rt\s+)?@\w+:?')
+NON_WORD_PATTERN = re.compile(r'[\W_]+')
+
+_rng = np.random.default_rng(HASH_SEED)
+# Multiply-shift hashing: ((a * x + b) mod 2^64) >> 32 with odd a
+HASH_A = _rng.integers(1, 2 ** 63, size=NUM_PERM, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+HASH_B = _rng.integers(0, 2 ** 63, size=NUM_PERM, dtype=np.uint64)
+BAND_MIX = _rng.integers(1, 2 ** 63, size=ROWS_PER_BAND, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+
+NEW_TWEETS_QUERY = """
+SELECT tweet_id, author_id, created_at, text
+FROM tweets_deduplicated
+WHERE fetched_at > %(since)s
+  AND fetched_at <= %(until)s
+  AND retweeted_tweet_id IS NULL
+  AND text IS NOT NULL
+ORDER BY fetched_at
+"""
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, drop URLs and @mentions, collapse punctuation and whitespace"""
+    text = URL_PATTERN.sub(' ', text.lower())
+    text = MENTION_PATTERN.sub(' ', text)
+    return NON_WORD_PATTERN.sub(' ', text).strip()
+
+
+def shingle_batch(texts: List[bytes]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    All SHINGLE_BYTES-byte windows of every text as packed uint64 values.
+    Returns (shingles, doc_starts): shingles of doc i are
+    shingles[doc_starts[i]:doc_starts[i + 1]]. Every text must be at least
+    SHINGLE_BYTES long.
+    """
+    lengths = np.fromiter((len(t) for t in texts), dtype=np.int64, count=len(texts))
+    buffer = np.frombuffer(b''.join(texts), dtype=np.uint8).astype(np.uint64)
+    text_starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+
+    # Window start positions that stay inside their own text
+    counts = lengths - SHINGLE_BYTES + 1
+    positions = (np.repeat(text_starts - np.concatenate([[0], np.cumsum(counts)[:-1]]), counts)
+                 + np.arange(int(counts.sum())))
+
+    shingles = np.zeros(len(positions), dtype=np.uint64)
+    for offset in range(SHINGLE_BYTES):
+        shingles = (shingles << np.uint64(8)) | buffer[positions + offset]
+
+    doc_starts = np.concatenate([[0], np.cumsum(counts)])
+    return shingles, doc_starts
+
+
+def minhash_batch(shingles: np.ndarray, doc_starts: np.ndarray) -> np.ndarray:
+    """(docs, NUM_PERM) uint32 MinHash signatures"""
+    signatures = np.empty((len(doc_starts) - 1, NUM_PERM), dtype=np.uint32)
+    starts = doc_starts[:-1]
+    with np.errstate(over='ignore'):
+        for i in range(NUM_PERM):
+            hashed = ((HASH_A[i] * shingles + HASH_B[i]) >> np.uint64(32)).astype(np.uint32)
+            signatures[:, i] = np.minimum.reduceat(hashed, starts)
+    return signatures
+
+
+def band_buckets(signatures: np.ndarray) -> np.ndarray:
+    """(docs, BANDS) int64 bucket key per band"""
+    rows = signatures.reshape(len(signatures), BANDS, ROWS_PER_BAND).astype(np.uint64)
+    with np.errstate(over='ignore'):
+        keys = (rows * BAND_MIX).sum(axis=2, dtype=np.uint64)
+    return keys.view(np.int64)
+
+
+def signature_similarity(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Estimated Jaccard similarity of row-aligned signature pairs"""
+    return (a == b).mean(axis=1)
+
+
+def connected_components(n: int, left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """Component label (smallest member index) per node, by min-label propagation"""
+    labels = np.arange(n)
+    if len(left) == 0:
+        return labels
+    while True:
+        previous = labels.copy()
+        np.minimum.at(labels, left, labels[right])
+        np.minimum.at(labels, right, labels[left])
+        labels = labels[labels]
+        if np.array_equal(labels, previous):
+            return labels
+
+
+def _signature_literal(signature: np.ndarray) -> str:
+    # bytea hex input; BulkLoader escapes the backslash for COPY
+    return '\\x' + signature.astype('<u4').tobytes().hex()
+
+
+class TextClusterComputer:
+    def __init__(self, threshold: float = 0.7, min_chars: int = 40, min_authors: int = 2,
+                 batch_size: int = 20000, verbose: bool = True):
+        self.threshold = threshold
+        # Shingling needs at least SHINGLE_BYTES bytes
+        self.min_chars = max(min_chars, SHINGLE_BYTES)
+        self.min_authors = min_authors
+        self.batch_size = batch_size
+        self.verbose = verbose
+        self.conn = None
+        self.connect()
+        self.minhash_loader = BulkLoader(
+            self.conn, 'text_minhash',
+            ['tweet_id', 'author_id', 'created_at', 'signature', 'cluster_id'],
+            conflict_columns=['tweet_id'],
+            update_columns=['author_id', 'created_at', 'signature'],
+            # A re-processed tweet keeps the cluster later tweets attached it to
+            extra_updates={'cluster_id': 'COALESCE(EXCLUDED.cluster_id, text_minhash.cluster_id)'}
+        )
+        self.bucket_loader = BulkLoader(
+            self.conn, 'text_lsh_buckets',
+            ['band', 'bucket', 'tweet_id', 'created_at'],
+            conflict_columns=['band', 'bucket'],
+            update_columns=[]
+        )
+        self.stats = {'tweets': 0, 'skipped_short': 0, 'linked': 0, 'clusters_touched': 0}
+
+    def connect(self):
+        """Establish database connection"""
+        try:
+            self.conn = psycopg2.connect(
+                host=DATABASE_CONFIG["host"],
+                port=DATABASE_CONFIG["port"],
+                database=DATABASE_CONFIG["database"],
+                user=DATABASE_CONFIG["user"],
+                password=DATABASE_CONFIG["password"]
+            )
+            with self.conn.cursor() as cur:
+                cur.execute(f"SET search_path TO {DATABASE_CONFIG['schema']}, public")
+            self.conn.commit()
+            if self.verbose:
+                print(f"Connected to database: {DATABASE_CONFIG['database']}")
+        except Exception as e:
+            print(f"Database connection failed: {e}")
+            raise
+
+    def ensure_schema(self):
+        """Create the clustering tables and the shared watermark table"""
+        ddl = """
+        CREATE TABLE IF NOT EXISTS compute_watermarks (
+            job_name VARCHAR(100) PRIMARY KEY,
+            last_tweet_topic_at TIMESTAMP,
+            last_collected_at TIMESTAMPTZ,
+            updated_at TIMESTAMPTZ DEFAULT NOW()
+        );
+        ALTER TABLE compute_watermarks
+        ADD COLUMN IF NOT EXISTS last_fetched_at TIMESTAMPTZ;
+
+        CREATE INDEX IF NOT EXISTS idx_tweets_dedup_fetched_at ON tweets_deduplicated (fetched_at);
+        """
+
+        with open(SCHEMA_SQL_FILE) as f:
+            clusters_ddl = f.read()
+
+        with self.conn.cursor() as cur:
+            cur.execute(ddl)
+            cur.execute(clusters_ddl)
+        self.conn.commit()
+
+    def reset(self):
+        """Drop all clustering state so the next run starts from scratch"""
+        with self.conn.cursor() as cur:
+            cur.execute("TRUNCATE text_minhash, text_lsh_buckets, text_clusters")
+            cur.execute("DELETE FROM compute_watermarks WHERE job_name = %s", (JOB_NAME,))
+        self.conn.commit()
+
+    def get_watermark(self) -> Optional[datetime]:
+        """fetched_at processed up to, None before the first run"""
+        with self.conn.cursor() as cur:
+            cur.execute("SELECT last_fetched_at FROM compute_watermarks WHERE job_name = %s", (JOB_NAME,))
+            result = cur.fetchone()
+            return result[0] if result else None
+
+    def get_source_high_water(self) -> Optional[datetime]:
+        """Newest fetched_at right now; rows after it wait for the next run"""
+        with self.conn.cursor() as cur:
+            cur.execute("SELECT MAX(fetched_at) FROM tweets_deduplicated")
+            return cur.fetchone()[0]
+
+    def set_watermark(self, fetched_at: Optional[datetime]):
+        """Record the fetched_at covered by this run"""
+        query = """
+        INSERT INTO compute_watermarks (job_name, last_fetched_at, updated_at)
+        VALUES (%s, %s, NOW())
+        ON CONFLICT (job_name) DO UPDATE SET
+            last_fetched_at = EXCLUDED.last_fetched_at,
+            updated_at = NOW()
+        """
+
+        with self.conn.cursor() as cur:
+            cur.execute(query, (JOB_NAME, fetched_at))
+        self.conn.commit()
+
+    def prune_buckets(self, match_days: int):
+        """Forget bucket representatives older than match_days; old texts stop attracting new tweets"""
+        with self.conn.cursor() as cur:
+            cur.execute("""
+                DELETE FROM text_lsh_buckets
+                WHERE created_at < NOW() - make_interval(days => %s)
+            """, (match_days,))
+            pruned = cur.rowcount
+        self.conn.commit()
+        if self.verbose and pruned:
+            print(f"Pruned {pruned:,} bucket representatives older than {match_days} days")
+
+    def process_new_tweets(self, since: datetime, until: datetime):
+        """Cluster every tweet fetched in (since, until]"""
+        # A separate connection streams the source while batches are written on self.conn
+        reader = psycopg2.connect(
+            host=DATABASE_CONFIG["host"],
+            port=DATABASE_CONFIG["port"],
+            database=DATABASE_CONFIG["database"],
+            user=DATABASE_CONFIG["user"],
+            password=DATABASE_CONFIG["password"]
+        )
+        try:
+            with reader.cursor() as cur:
+                cur.execute(f"SET search_path TO {DATABASE_CONFIG['schema']}, public")
+            with reader.cursor(name='text_cluster_source') as cur:
+                cur.itersize = self.batch_size
+                cur.execute(NEW_TWEETS_QUERY, {'since': since, 'until': until})
+                while True:
+                    rows = cur.fetchmany(self.batch_size)
+                    if not rows:
+                        break
+                    self.process_batch(rows)
+        finally:
+            reader.close()
+
+    def process_batch(self, rows: List[Tuple]):
+        """Sign, bucket, link and cluster one batch of (tweet_id, author_id, created_at, text)"""
+        started = time.time()
+        texts, kept = [], []
+        for row in rows:
+            normalized = normalize_text(row[3])
+            if len(normalized) < self.min_chars:
+                continue
+            texts.append(normalized.encode('utf-8'))
+            kept.append(row)
+        self.stats['skipped_short'] += len(rows) - len(kept)
+        if not kept:
+            return
+
+        tweet_ids = [row[0] for row in kept]
+        signatures = minhash_batch(*shingle_batch(texts))
+        buckets = band_buckets(signatures)
+        n = len(kept)
+
+        # Representatives already stored for this batch's buckets
+        band_ids = np.tile(np.arange(BANDS, dtype=np.int16), n)
+        flat_buckets = buckets.reshape(-1)
+        stored = self._stored_representatives(band_ids, flat_buckets)
+
+        # Old tweets referenced as representatives become extra nodes after the batch
+        old_ids = sorted({tweet_id for tweet_id in stored.values()} - set(tweet_ids))
+        old_rows = self._load_minhash(old_ids)
+        old_ids = [tweet_id for tweet_id in old_ids if tweet_id in old_rows]
+        node_index = {tweet_id: i for i, tweet_id in enumerate(tweet_ids)}
+        node_index.update({tweet_id: n + i for i, tweet_id in enumerate(old_ids)})
+
+        # Each (band, bucket) links its members to one representative:
+        # the stored one, else its first member in this batch
+        doc = np.repeat(np.arange(n), BANDS)
+        order = np.lexsort((doc, flat_buckets, band_ids))
+        key_band, key_bucket, key_doc = band_ids[order], flat_buckets[order], doc[order]
+        first = np.r_[True, (key_band[1:] != key_band[:-1]) | (key_bucket[1:] != key_bucket[:-1])]
+        group_first_doc = key_doc[np.maximum.accumulate(np.where(first, np.arange(len(order)), 0))]
+
+        group_starts = np.flatnonzero(first)
+        stored_rep = np.full(len(group_starts), -1, dtype=np.int64)
+        new_bucket_rows = []
+        for g, i in enumerate(group_starts):
+            band, bucket = int(key_band[i]), int(key_bucket[i])
+            stored_id = stored.get((band, bucket))
+            if stored_id is not None and stored_id in node_index:
+                stored_rep[g] = node_index[stored_id]
+            else:
+                new_bucket_rows.append((band, bucket, tweet_ids[key_doc[i]], kept[key_doc[i]][2]))
+
+        group_rep = stored_rep[np.cumsum(first) - 1]
+        representative = np.where(group_rep >= 0, group_rep, group_first_doc)
+
+        left, right = key_doc, representative
+        pairs = np.unique(np.stack([left, right], axis=1)[left != right], axis=0)
+
+        # Verify candidates on their signatures
+        all_signatures = signatures
+        if old_ids:
+            all_signatures = np.vstack([signatures] + [old_rows[t]['signature'][None, :] for t in old_ids])
+        if len(pairs):
+            similar = signature_similarity(all_signatures[pairs[:, 0]], all_signatures[pairs[:, 1]]) >= self.threshold
+            pairs = pairs[similar]
+        self.stats['linked'] += len(pairs)
+
+        labels = connected_components(n + len(old_ids), pairs[:, 0], pairs[:, 1])
+        cluster_of_node, touched = self._assign_clusters(labels, n, old_ids, old_rows)
+
+        self.minhash_loader.load(
+            (row[0], row[1], row[2], _signature_literal(signatures[i]), cluster_of_node.get(i))
+            for i, row in enumerate(kept)
+        )
+        self.bucket_loader.load(new_bucket_rows)
+        self.refresh_clusters(sorted(touched))
+        self.conn.commit()
+
+        self.stats['tweets'] += n
+        if self.verbose:
+            print(f"  batch of {len(rows):,}: {n:,} signed, {len(pairs):,} near-duplicate links "
+                  f"({time.time() - started:.1f}s)")
+
+    def _stored_representatives(self, bands: np.ndarray, buckets: np.ndarray) -> Dict[Tuple[int, int], str]:
+        keys = np.unique(np.stack([bands.astype(np.int64), buckets], axis=1), axis=0)
+        with self.conn.cursor() as cur:
+            cur.execute("""
+                SELECT b.band, b.bucket, b.tweet_id
+                FROM text_lsh_buckets b
+                JOIN unnest(%s::smallint[], %s::bigint[]) AS k(band, bucket)
+                    ON b.band = k.band AND b.bucket = k.bucket
+            """, (keys[:, 0].tolist(), keys[:, 1].tolist()))
+            return {(band, bucket): tweet_id for band, bucket, tweet_id in cur.fetchall()}
+
+    def _load_minhash(self, tweet_ids: List[str]) -> Dict[str, Dict]:
+        if not tweet_ids:
+            return {}
+        with self.conn.cursor() as cur:
+            cur.execute("""
+                SELECT tweet_id, signature, cluster_id
+                FROM text_minhash
+                WHERE tweet_id = ANY(%s)
+            """, (tweet_ids,))
+            return {
+                tweet_id: {
+                    'signature': np.frombuffer(bytes(signature), dtype='<u4').astype(np.uint32),
+                    'cluster_id': cluster_id
+                }
+                for tweet_id, signature, cluster_id in cur.fetchall()
+            }
+
+    def _assign_clusters(self, labels: np.ndarray, n: int, old_ids: List[str],
+                         old_rows: Dict[str, Dict]) -> Tuple[Dict[int, int], set]:
+        """
+        Cluster id per batch node that has near-duplicates, reusing the
+        cluster of linked old tweets (and merging clusters the batch joins
+        together into the smallest id). Old tweets are updated in place.
+        Returns (cluster id per batch node, touched cluster ids).
+        """
+        components: Dict[int, List[int]] = {}
+        for node, label in enumerate(labels):
+            components.setdefault(int(label), []).append(node)
+
+        cluster_of_node: Dict[int, int] = {}
+        old_updates: Dict[str, int] = {}
+        losers, winners = [], []
+        touched = set()
+
+        for members in components.values():
+            if len(members) < 2:
+                continue
+            existing = sorted({
+                old_rows[old_ids[m - n]]['cluster_id'] for m in members
+                if m >= n and old_rows[old_ids[m - n]]['cluster_id'] is not None
+            })
+            cluster_id = existing[0] if existing else self._next_cluster_id()
+            losers.extend(existing[1:])
+            winners.extend([cluster_id] * (len(existing) - 1))
+            touched.add(cluster_id)
+
+            for m in members:
+                if m < n:
+                    cluster_of_node[m] = cluster_id
+                elif old_rows[old_ids[m - n]]['cluster_id'] != cluster_id:
+                    old_updates[old_ids[m - n]] = cluster_id
+
+        with self.conn.cursor() as cur:
+            if losers:
+                cur.execute("""
+                    UPDATE text_minhash m
+                    SET cluster_id = k.winner
+                    FROM unnest(%s::bigint[], %s::bigint[]) AS k(loser, winner)
+                    WHERE m.cluster_id = k.loser
+                """, (losers, winners))
+                cur.execute("DELETE FROM text_clusters WHERE cluster_id = ANY(%s)", (losers,))
+            if old_updates:
+                cur.execute("""
+                    UPDATE text_minhash m
+                    SET cluster_id = k.cluster_id
+                    FROM unnest(%s::text[], %s::bigint[]) AS k(tweet_id, cluster_id)
+                    WHERE m.tweet_id = k.tweet_id
+                """, (list(old_updates), list(old_updates.values())))
+
+        self.stats['clusters_touched'] += len(touched)
+        return cluster_of_node, touched
+
+    def _next_cluster_id(self) -> int:
+        with self.conn.cursor() as cur:
+            cur.execute("SELECT nextval('text_clusters_id_seq')")
+            return cur.fetchone()[0]
+
+    def refresh_clusters(self, cluster_ids: List[int]):
+        """Recompute text_clusters rows; clusters below min_authors are not listed (caller commits)"""
+        if not cluster_ids:
+            return
+        with self.conn.cursor() as cur:
+            cur.execute("""
+                WITH stats AS (
+                    SELECT
+                        m.cluster_id,
+                        (ARRAY_AGG(m.tweet_id ORDER BY m.created_at, m.tweet_id))[1] AS representative_tweet_id,
+                        COUNT(*) AS tweet_count,
+                        COUNT(DISTINCT m.author_id) AS author_count,
+                        MIN(m.created_at) AS first_seen,
+                        MAX(m.created_at) AS last_seen
+                    FROM text_minhash m
+                    WHERE m.cluster_id = ANY(%(ids)s)
+                    GROUP BY m.cluster_id
+                )
+                INSERT INTO text_clusters (
+                    cluster_id, representative_tweet_id, sample_text, tweet_count,
+                    author_count, first_seen, last_seen, updated_at
+                )
+                SELECT s.cluster_id, s.representative_tweet_id, t.text, s.tweet_count,
+                       s.author_count, s.first_seen, s.last_seen, NOW()
+                FROM stats s
+                LEFT JOIN tweets_deduplicated t ON t.tweet_id = s.representative_tweet_id
+                WHERE s.author_count >= %(min_authors)s
+                ON CONFLICT (cluster_id) DO UPDATE SET
+                    representative_tweet_id = EXCLUDED.representative_tweet_id,
+                    sample_text = EXCLUDED.sample_text,
+                    tweet_count = EXCLUDED.tweet_count,
+                    author_count = EXCLUDED.author_count,
+                    first_seen = EXCLUDED.first_seen,
+                    last_seen = EXCLUDED.last_seen,
+                    updated_at = NOW()
+            """, {'ids': cluster_ids, 'min_authors': self.min_authors})
+
+            cur.execute("""
+                DELETE FROM text_clusters
+                WHERE cluster_id = ANY(%s) AND author_count < %s
+            """, (cluster_ids, self.min_authors))
+
+    def get_summary(self) -> Dict:
+        with self.conn.cursor() as cur:
+            cur.execute("""
+                SELECT
+                    (SELECT COUNT(*) FROM text_minhash),
+                    COUNT(*),
+                    COALESCE(SUM(tweet_count), 0),
+                    COALESCE(MAX(author_count), 0)
+                FROM text_clusters
+            """)
+            signed, clusters, clustered_tweets, max_authors = cur.fetchone()
+        return {
+            'signed_tweets': signed,
+            'clusters': clusters,
+            'clustered_tweets': clustered_tweets,
+            'max_authors': max_authors
+        }
+
+    def close(self):
+        if self.conn:
+            self.conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cluster near-duplicate tweet texts (MinHash + LSH)')
+    parser.add_argument('--days', type=int, default=7,
+                       help='On the first run (no watermark), process tweets fetched in the last N days (default: 7)')
+    parser.add_argument('--threshold', type=float, default=0.7,
+                       help='Minimum estimated Jaccard similarity of shingle sets; one edited word in '
+                            'a 20-word text is ~0.75 (default: 0.7)')
+    parser.add_argument('--min-chars', type=int, default=40,
+                       help='Skip tweets with fewer normalised characters (default: 40)')
+    parser.add_argument('--min-authors', type=int, default=2,
+                       help='Distinct authors a cluster needs to be listed in text_clusters (default: 2)')
+    parser.add_argument('--batch-size', type=int, default=20000,
+                       help='Tweets signed per batch (default: 20000)')
+    parser.add_argument('--match-days', type=int, default=30,
+                       help='New tweets are matched against texts from the last N days (default: 30)')
+    parser.add_argument('--rebuild', action='store_true',
+                       help='Drop all signatures, buckets and clusters, then start over')
+
+    args = parser.parse_args()
+
+    computer = TextClusterComputer(
+        threshold=args.threshold,
+        min_chars=args.min_chars,
+        min_authors=args.min_authors,
+        batch_size=args.batch_size
+    )
+
+    try:
+        computer.ensure_schema()
+        if args.rebuild:
+            computer.reset()
+
+        # Capture the high-water mark before reading so rows landing mid-run are picked up next time
+        high_water = computer.get_source_high_water()
+        watermark = computer.get_watermark()
+        if high_water is None:
+            print("tweets_deduplicated is empty")
+            return
+
+        if watermark is None:
+            watermark = high_water - timedelta(days=args.days)
+            print(f"No watermark found, processing tweets fetched since {watermark}")
+        else:
+            print(f"Incremental run since {watermark}")
+
+        computer.prune_buckets(args.match_days)
+        computer.process_new_tweets(watermark, high_water)
+        computer.set_watermark(high_water)
+
+        summary = computer.get_summary()
+        stats = computer.stats
+        print("\n=== Text Cluster Summary ===")
+        print(f"Tweets signed this run: {stats['tweets']:,} ({stats['skipped_short']:,} too short)")
+        print(f"Near-duplicate links: {stats['linked']:,}")
+        print(f"Clusters touched: {stats['clusters_touched']:,}")
+        print(f"Clusters with {args.min_authors}+ authors: {summary['clusters']:,} "
+              f"covering {summary['clustered_tweets']:,} tweets (largest: {summary['max_authors']} authors)")
+
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    finally:
+        computer.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,527 @@
+#!/usr/bin/env python3
+"""
+Metrics orchestrator for the core, daily and intelligence stages
+
+Every stage is one task per date: a SQL function (core_metrics,
+author_sketches, author_daily, author_intelligence) or a compute script
+(betweenness, communities). A date's tasks run in order on one connection,
+and dates do not depend on each other, so date ranges are fanned out to
+--workers processes and a backfill takes about as long as its slowest day
+instead of the sum of all days.
+
+Task state is kept in metric_jobs: completed tasks are skipped when a range
+is run again (resume after a failure), and each attempt records its wall
+time, which the end-of-run report aggregates per stage. A task holds a
+session advisory lock while it runs, so a second run that reaches the same
+(stage, date, params) refuses it instead of computing it twice.
+
+Work that spans dates runs once after the date tasks:
+- growth_metrics: 7-day rolling averages read earlier days of intel_metrics,
+  so after a parallel core_metrics pass they are recomputed over the range
+- text_clusters: incremental on its own watermark
+"""
+
+import psycopg2
+from psycopg2.extras import Json
+from datetime import date, datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import json
+import os
+import subprocess
+import sys
+import time
+import argparse
+import uuid
+from typing import Dict, List, Optional
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv('../../.env')
+
+DATABASE_CONFIG = {
+    "host": os.getenv("POSTGRES_HOST", "localhost"),
+    "port": int(os.getenv("POSTGRES_PORT", 5432)),
+    "database": os.getenv("POSTGRES_DATABASE", "neuron"),
+    "user": os.getenv("POSTGRES_USER", "tabreaz"),
+    "password": os.getenv("POSTGRES_PASSWORD", "admin"),
+    "schema": os.getenv("POSTGRES_SCHEMA", "osint")
+}
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+SCHEMA_SQL_FILE = os.path.join(SCRIPT_DIR, 'sql', 'create_metric_jobs.sql')
+
+PERIODS = ['7_days', '30_days', '90_days']
+
+# Stages backed by a SQL function, called with the task's arguments
+SQL_STAGES = {
+    'core_metrics': "CALL osint.compute_timeseries_metrics(%(date)s, 1)",
+    'author_sketches': "SELECT * FROM osint.compute_author_sketches(%(date)s, 1)",
+    'author_daily': "SELECT * FROM osint.compute_author_daily_simple(%(date)s)",
+    'author_intelligence': "SELECT * FROM osint.compute_author_intelligence(%(date)s, %(period)s, %(threshold)s)",
+    'growth_metrics': "SELECT osint.compute_growth_metrics(%(start)s, %(date)s) AS metrics_computed",
+}
+
+# Stages backed by a compute script in this directory
+SCRIPT_STAGES = {
+    'betweenness': ['compute_betweenness.py', '--date', '{date}', '--period', '{period}'],
+    'communities': ['compute_communities.py', '--date', '{date}', '--window', '{period}'],
+    'text_clusters': ['compute_text_clusters.py'],
+}
+
+# Lines of script output kept in metric_jobs.result / error
+OUTPUT_TAIL_LINES = 20
+
+
+def date_range(start: date, end: date) -> List[date]:
+    """Dates from start to end, both included"""
+    return [start + timedelta(days=i) for i in range((end - start).days + 1)]
+
+
+def make_task(stage: str, target_date: date, params: str = '', depends_on: Optional[str] = None,
+              always: bool = False, lock: Optional[str] = None, **args) -> Dict:
+    """
+    One unit of work. `params` tells apart tasks of the same stage and date
+    (e.g. intelligence periods), `depends_on` names a task key of the same
+    chain that must have completed, `always` ignores a previous completion
+    (incremental jobs) and `lock` overrides the per-date advisory lock key.
+    """
+    return {
+        'stage': stage,
+        'date': target_date,
+        'params': params,
+        'depends_on': depends_on,
+        'always': always,
+        'lock': lock or f"{stage}:{target_date}:{params}",
+        'args': dict(args, date=target_date)
+    }
+
+
+def task_key(task: Dict) -> str:
+    return f"{task['stage']}:{task['params']}" if task['params'] else task['stage']
+
+
+def plan_date(target_date: date, stages: List[str], periods: List[str], threshold: int,
+              with_intelligence: bool = True) -> List[Dict]:
+    """Tasks of one date, in execution order"""
+    tasks = []
+    if 'core' in stages:
+        tasks.append(make_task('core_metrics', target_date))
+        tasks.append(make_task('author_sketches', target_date))
+    if 'daily' in stages:
+        tasks.append(make_task('author_daily', target_date))
+    if 'intelligence' in stages and with_intelligence:
+        for period in periods:
+            intelligence = make_task('author_intelligence', target_date, f"{period}/{threshold}",
+                                     period=period, threshold=threshold)
+            tasks.append(intelligence)
+            # Graph metrics update the intelligence rows of the same date and period
+            for stage in ('betweenness', 'communities'):
+                tasks.append(make_task(stage, target_date, period, depends_on=task_key(intelligence),
+                                       period=period))
+    return tasks
+
+
+def plan_range(dates: List[date], stages: List[str], workers: int) -> List[Dict]:
+    """Tasks that run once after all dates"""
+    tasks = []
+    if 'core' in stages and len(dates) > 1 and workers > 1:
+        tasks.append(make_task('growth_metrics', dates[-1], f"from {dates[0]}", always=True,
+                               start=dates[0]))
+    if 'daily' in stages:
+        # Incremental (watermark on fetched_at), so it does not depend on the dates
+        tasks.append(make_task('text_clusters', dates[-1], always=True, lock='text_clusters'))
+    return tasks
+
+
+def _run_chain(tasks: List[Dict], run_id: str, force: bool) -> List[Dict]:
+    """Worker entry point: run one date's tasks on its own connection"""
+    runner = MetricJobRunner(run_id, force=force, verbose=False)
+    try:
+        return runner.run_chain(tasks)
+    finally:
+        runner.close()
+
+
+class MetricJobRunner:
+    def __init__(self, run_id: str, force: bool = False, verbose: bool = True):
+        self.run_id = run_id
+        self.force = force
+        self.verbose = verbose
+        self.conn = None
+        self.connect()
+
+    def connect(self):
+        """Establish database connection"""
+        try:
+            self.conn = psycopg2.connect(
+                host=DATABASE_CONFIG["host"],
+                port=DATABASE_CONFIG["port"],
+                database=DATABASE_CONFIG["database"],
+                user=DATABASE_CONFIG["user"],
+                password=DATABASE_CONFIG["password"]
+            )
+            with self.conn.cursor() as cur:
+                cur.execute(f"SET search_path TO {DATABASE_CONFIG['schema']}, public")
+            self.conn.commit()
+            if self.verbose:
+                print(f"Connected to database: {DATABASE_CONFIG['database']}")
+        except Exception as e:
+            print(f"Database connection failed: {e}")
+            raise
+
+    def ensure_schema(self):
+        """Create metric_jobs if it does not exist"""
+        with open(SCHEMA_SQL_FILE) as f:
+            ddl = f.read()
+        with self.conn.cursor() as cur:
+            cur.execute(ddl)
+        self.conn.commit()
+
+    def run_chain(self, tasks: List[Dict]) -> List[Dict]:
+        """Run tasks in order, skipping those whose dependency did not complete"""
+        statuses: Dict[str, str] = {}
+        outcomes = []
+        for task in tasks:
+            dependency = task['depends_on']
+            if dependency and statuses.get(dependency) not in ('completed', 'skipped'):
+                outcome = self._outcome(task, 'blocked', error=f"{dependency} did not complete")
+            else:
+                outcome = self.run_task(task)
+            statuses[task_key(task)] = outcome['status']
+            outcomes.append(outcome)
+        return outcomes
+
+    def run_task(self, task: Dict) -> Dict:
+        """
+        Run one task under its advisory lock and record the attempt.
+        Returns an outcome with status completed, skipped (completed by an
+        earlier run), locked (running elsewhere) or failed.
+        """
+        lock_key = task['lock']
+        with self.conn.cursor() as cur:
+            cur.execute("SELECT pg_try_advisory_lock(hashtext('metric_jobs'), hashtext(%s))", (lock_key,))
+            acquired = cur.fetchone()[0]
+        self.conn.commit()
+        if not acquired:
+            return self._outcome(task, 'locked', error='already running in another process')
+
+        try:
+            if not (self.force or task['always']) and self._is_completed(task):
+                return self._outcome(task, 'skipped')
+
+            self._mark_running(task)
+            started = time.perf_counter()
+            try:
+                result = self._execute(task)
+            except Exception as e:
+                self.conn.rollback()
+                duration_ms = int((time.perf_counter() - started) * 1000)
+                self._mark_finished(task, 'failed', duration_ms, error=str(e).strip())
+                self.conn.commit()
+                return self._outcome(task, 'failed', duration_ms, str(e).strip())
+
+            duration_ms = int((time.perf_counter() - started) * 1000)
+            # SQL stages commit their work together with the completion record
+            self._mark_finished(task, 'completed', duration_ms, result=result)
+            self.conn.commit()
+            return self._outcome(task, 'completed', duration_ms)
+        finally:
+            with self.conn.cursor() as cur:
+                cur.execute("SELECT pg_advisory_unlock(hashtext('metric_jobs'), hashtext(%s))", (lock_key,))
+            self.conn.commit()
+
+    def _execute(self, task: Dict):
+        """Run the task's SQL function or script; returns what is stored as its result"""
+        stage = task['stage']
+        if stage in SQL_STAGES:
+            with self.conn.cursor() as cur:
+                cur.execute(SQL_STAGES[stage], task['args'])
+                if cur.description is None:
+                    return None
+                columns = [column[0] for column in cur.description]
+                return [dict(zip(columns, row)) for row in cur.fetchall()]
+
+        args = {key: str(value) for key, value in task['args'].items()}
+        command = [sys.executable] + [part.format(**args) for part in SCRIPT_STAGES[stage]]
+        # Scripts load ../../.env relative to their own directory
+        completed = subprocess.run(command, cwd=SCRIPT_DIR, capture_output=True, text=True)
+        output = (completed.stdout + completed.stderr).strip().splitlines()[-OUTPUT_TAIL_LINES:]
+        if completed.returncode != 0:
+            raise RuntimeError('\n'.join(output) or f"exit code {completed.returncode}")
+        return {'output': output}
+
+    def _is_completed(self, task: Dict) -> bool:
+        with self.conn.cursor() as cur:
+            cur.execute("""
+                SELECT 1 FROM metric_jobs
+                WHERE stage = %s AND target_date = %s AND params = %s AND status = 'completed'
+            """, (task['stage'], task['date'], task['params']))
+            return cur.fetchone() is not None
+
+    def _mark_running(self, task: Dict):
+        with self.conn.cursor() as cur:
+            cur.execute("""
+                INSERT INTO metric_jobs (stage, target_date, params, status, attempts, run_id, started_at)
+                VALUES (%s, %s, %s, 'running', 1, %s, NOW())
+                ON CONFLICT (stage, target_date, params) DO UPDATE SET
+                    status = 'running',
+                    attempts = metric_jobs.attempts + 1,
+                    run_id = EXCLUDED.run_id,
+                    started_at = EXCLUDED.started_at,
+                    finished_at = NULL,
+                    duration_ms = NULL,
+                    result = NULL,
+                    error = NULL
+            """, (task['stage'], task['date'], task['params'], self.run_id))
+        self.conn.commit()
+
+    def _mark_finished(self, task: Dict, status: str, duration_ms: int, result=None,
+                       error: Optional[str] = None):
+        with self.conn.cursor() as cur:
+            cur.execute("""
+                UPDATE metric_jobs
+                SET status = %s, finished_at = NOW(), duration_ms = %s, result = %s, error = %s
+                WHERE stage = %s AND target_date = %s AND params = %s
+            """, (
+                status, duration_ms,
+                Json(result, dumps=lambda value: json.dumps(value, default=str)) if result is not None else None,
+                error, task['stage'], task['date'], task['params']
+            ))
+
+    @staticmethod
+    def _outcome(task: Dict, status: str, duration_ms: int = 0, error: Optional[str] = None) -> Dict:
+        return {
+            'stage': task['stage'],
+            'date': task['date'],
+            'params': task['params'],
+            'status': status,
+            'duration_ms': duration_ms,
+            'error': error
+        }
+
+    def get_stage_timings(self, days: int) -> List[Dict]:
+        """Duration statistics per stage over completed tasks of the last `days` days"""
+        with self.conn.cursor() as cur:
+            cur.execute("""
+                SELECT stage,
+                       COUNT(*) AS tasks,
+                       AVG(duration_ms) / 1000.0 AS avg_s,
+                       PERCENTILE_CONT(0.95) WITHIN GROUP (ORDER BY duration_ms) / 1000.0 AS p95_s,
+                       MAX(duration_ms) / 1000.0 AS max_s,
+                       SUM(duration_ms) / 1000.0 AS total_s
+                FROM metric_jobs
+                WHERE status = 'completed'
+                  AND finished_at >= NOW() - make_interval(days => %s)
+                GROUP BY stage
+                ORDER BY SUM(duration_ms) DESC
+            """, (days,))
+            columns = [column[0] for column in cur.description]
+            return [dict(zip(columns, row)) for row in cur.fetchall()]
+
+    def check_tables(self):
+        """Print the metrics performance comparison and table coverage"""
+        with self.conn.cursor() as cur:
+            cur.execute("SELECT * FROM osint.compare_metrics_performance()")
+            print("\n=== Metrics Performance ===")
+            for row in cur.fetchall():
+                print("  " + " | ".join(str(value) for value in row))
+
+            cur.execute("""
+                SELECT 'Daily Metrics', COUNT(*), COUNT(DISTINCT author_id), MIN(date), MAX(date)
+                FROM osint.author_daily_metrics
+                UNION ALL
+                SELECT 'Intelligence', COUNT(*), COUNT(DISTINCT author_id), MIN(analysis_date), MAX(analysis_date)
+                FROM osint.author_intelligence
+            """)
+            print("\n=== Table Status ===")
+            for system, total, authors, earliest, latest in cur.fetchall():
+                print(f"  {system}: {total:,} rows, {authors:,} authors, {earliest} to {latest}")
+        self.conn.rollback()
+
+    def close(self):
+        if self.conn:
+            self.conn.close()
+
+
+def print_report(outcomes: List[Dict], wall_seconds: float):
+    """Per-stage counts and durations of this run"""
+    stages: Dict[str, Dict] = {}
+    for outcome in outcomes:
+        stats = stages.setdefault(outcome['stage'], {
+            'completed': 0, 'skipped': 0, 'failed': 0, 'total_ms': 0, 'max_ms': 0, 'slowest': None
+        })
+        if outcome['status'] == 'completed':
+            stats['completed'] += 1
+            stats['total_ms'] += outcome['duration_ms']
+            if outcome['duration_ms'] >= stats['max_ms']:
+                stats['max_ms'] = outcome['duration_ms']
+                stats['slowest'] = outcome['date']
+        elif outcome['status'] == 'skipped':
+            stats['skipped'] += 1
+        else:
+            stats['failed'] += 1
+
+    print("\n=== Stage Timings ===")
+    print(f"{'stage':<20} {'done':>5} {'skip':>5} {'fail':>5} {'total s':>9} {'avg s':>8} {'max s':>8}  slowest")
+    task_ms = 0
+    for stage, stats in stages.items():
+        task_ms += stats['total_ms']
+        avg = stats['total_ms'] / stats['completed'] / 1000 if stats['completed'] else 0
+        print(f"{stage:<20} {stats['completed']:>5} {stats['skipped']:>5} {stats['failed']:>5} "
+              f"{stats['total_ms'] / 1000:>9.1f} {avg:>8.1f} {stats['max_ms'] / 1000:>8.1f}  "
+              f"{stats['slowest'] or ''}")
+    print(f"Wall time: {wall_seconds:.1f}s for {task_ms / 1000:.1f}s of task time")
+
+    for outcome in outcomes:
+        if outcome['status'] in ('failed', 'locked', 'blocked'):
+            label = f"{outcome['stage']} {outcome['date']}" + (f" ({outcome['params']})" if outcome['params'] else '')
+            print(f"{outcome['status'].upper()}: {label}: {outcome['error']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run core, daily and intelligence metrics per date')
+    parser.add_argument('--date', type=str,
+                       help='Target date (YYYY-MM-DD, default: yesterday)')
+    parser.add_argument('--batch', nargs=2, metavar=('START', 'END'),
+                       help='Process every date from START to END (YYYY-MM-DD, both included)')
+    parser.add_argument('--periodic-from', type=str, metavar='DATE',
+                       help='Intelligence only, every 7th day from DATE to yesterday')
+
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--daily-only', action='store_true',
+                      help='Run only daily author metrics (and text clusters)')
+    mode.add_argument('--intelligence-only', action='store_true',
+                      help='Run only strategic intelligence and graph metrics')
+    mode.add_argument('--core-only', action='store_true',
+                      help='Run only core project/theme metrics')
+    mode.add_argument('--full', action='store_true',
+                      help='Run core, daily and intelligence (default: core and daily)')
+
+    parser.add_argument('--intelligence-period', choices=PERIODS, nargs='+', default=['7_days'],
+                       help='Intelligence periods (default: 7_days)')
+    parser.add_argument('--min-threshold', type=int, default=1,
+                       help='Minimum tweets for intelligence (default: 1)')
+    parser.add_argument('--intelligence-every', type=int, default=1,
+                       help='Run intelligence on every Nth date of a range, starting with the Nth (default: 1)')
+
+    parser.add_argument('--workers', type=int, default=4,
+                       help='Dates computed in parallel, one connection each (default: 4)')
+    parser.add_argument('--force', action='store_true',
+                       help='Recompute tasks that already completed')
+    parser.add_argument('--dry-run', action='store_true',
+                       help='Show the planned tasks without running them')
+    parser.add_argument('--quiet', action='store_true',
+                       help='Only print the report and errors')
+    parser.add_argument('--check-tables', action='store_true',
+                       help='Show table coverage and exit')
+    parser.add_argument('--timings', type=int, metavar='DAYS',
+                       help='Show duration statistics per stage over the last DAYS days and exit')
+
+    args = parser.parse_args()
+
+    yesterday = datetime.now().date() - timedelta(days=1)
+    if args.periodic_from:
+        stages = ['intelligence']
+        start = datetime.strptime(args.periodic_from, '%Y-%m-%d').date()
+        end = yesterday
+        args.intelligence_every = 7
+    else:
+        if args.daily_only:
+            stages = ['daily']
+        elif args.intelligence_only:
+            stages = ['intelligence']
+        elif args.core_only:
+            stages = ['core']
+        elif args.full:
+            stages = ['core', 'daily', 'intelligence']
+        else:
+            stages = ['core', 'daily']
+
+        if args.batch:
+            start, end = (datetime.strptime(value, '%Y-%m-%d').date() for value in args.batch)
+        else:
+            start = end = datetime.strptime(args.date, '%Y-%m-%d').date() if args.date else yesterday
+
+    if end < start:
+        print(f"Error: end date {end} is before start date {start}")
+        sys.exit(1)
+    if args.intelligence_every < 1:
+        print("Error: --intelligence-every must be at least 1")
+        sys.exit(1)
+
+    dates = date_range(start, end)
+    every = args.intelligence_every
+    chains = [
+        plan_date(day, stages, args.intelligence_period, args.min_threshold,
+                  with_intelligence=(i % every == every - 1))
+        for i, day in enumerate(dates)
+    ]
+    chains = [chain for chain in chains if chain]
+    workers = max(1, min(args.workers, len(chains)))
+    range_tasks = plan_range(dates, stages, workers)
+
+    if args.dry_run:
+        print(f"Plan: {len(dates)} dates ({start} to {end}), stages: {', '.join(stages)}, "
+              f"{workers} workers")
+        for chain in chains:
+            print(f"  {chain[0]['date']}: " + ", ".join(task_key(task) for task in chain))
+        for task in range_tasks:
+            print(f"  then: {task_key(task)}")
+        return
+
+    run_id = uuid.uuid4().hex[:12]
+    runner = MetricJobRunner(run_id, force=args.force, verbose=not args.quiet)
+
+    try:
+        if args.check_tables:
+            runner.check_tables()
+            return
+        if args.timings:
+            print(f"\n=== Stage Timings (last {args.timings} days) ===")
+            for row in runner.get_stage_timings(args.timings):
+                print(f"{row['stage']:<20} {row['tasks']:>6} tasks  avg {row['avg_s']:.1f}s  "
+                      f"p95 {row['p95_s']:.1f}s  max {row['max_s']:.1f}s  total {row['total_s']:.0f}s")
+            return
+
+        runner.ensure_schema()
+
+        if not args.quiet:
+            print(f"Run {run_id}: {len(dates)} dates ({start} to {end}), stages: {', '.join(stages)}, "
+                  f"{workers} workers")
+
+        wall_start = time.perf_counter()
+        outcomes: List[Dict] = []
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {
+                    pool.submit(_run_chain, chain, run_id, args.force): chain[0]['date']
+                    for chain in chains
+                }
+                for future in as_completed(futures):
+                    chain_outcomes = future.result()
+                    outcomes.extend(chain_outcomes)
+                    if not args.quiet:
+                        done = sum(1 for outcome in chain_outcomes if outcome['status'] == 'completed')
+                        seconds = sum(outcome['duration_ms'] for outcome in chain_outcomes) / 1000
+                        print(f"  {futures[future]}: {done}/{len(chain_outcomes)} tasks ran ({seconds:.1f}s)")
+        else:
+            for chain in chains:
+                outcomes.extend(runner.run_chain(chain))
+
+        outcomes.extend(runner.run_chain(range_tasks))
+
+        # Stable sort: stages keep their execution order within a date
+        outcomes.sort(key=lambda outcome: outcome['date'])
+        print_report(outcomes, time.perf_counter() - wall_start)
+
+        if any(outcome['status'] in ('failed', 'locked', 'blocked') for outcome in outcomes):
+            sys.exit(1)
+
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    finally:
+        runner.close()
+
+if __name__ == "__main__":
+    main()
@@ -264,12 +264,6 @@ BEGIN
                 (COALESCE(ca.coordinated_timing_tweets, 0)::FLOAT / GREATEST(abd.total_tweets, 1) * 0.3)
             ) as coordination_risk_score,
 
-            -- Betweenness Centrality (approximated by network bridge behavior)
-            LEAST(1.0,
-                (abd.unique_reply_targets + abd.unique_retweet_sources)::FLOAT /
-                GREATEST(abd.total_tweets, 1) / 2.0
-            ) as betweenness_centrality,
-
             -- Network Reach
             GREATEST(abd.unique_reply_targets, abd.unique_retweet_sources) as network_reach,
 
@@ -307,7 +301,6 @@ BEGIN
             authority_score,
             influence_score,
             coordination_risk_score,
-            betweenness_centrality,
             network_reach,
             cross_reference_rate,
             semantic_diversity_score,
@@ -315,11 +308,11 @@ BEGIN
             amplification_factor,
 
             -- Monitoring Priority Score
+            -- (network bridges are raised to 0.7 by compute_betweenness.py)
             CASE
                 WHEN coordination_risk_score > 0.7 THEN 1.0  -- High coordination risk
                 WHEN influence_score > 0.8 THEN 0.9          -- High influence
                 WHEN amplification_factor > 20 THEN 0.8      -- Strong amplification
-                WHEN betweenness_centrality > 0.6 THEN 0.7   -- Network bridge
                 ELSE LEAST(1.0, influence_score + (coordination_risk_score * 0.5))
             END as monitoring_priority_score
 
@@ -333,7 +326,7 @@ BEGIN
         influence_score,
         authority_score,
         coordination_risk_score,
-        betweenness_centrality,
+        0,  -- betweenness_centrality: written by compute_betweenness.py
         network_reach,
         cross_reference_rate,
         semantic_diversity_score,
@@ -347,7 +340,6 @@ BEGIN
         influence_score = EXCLUDED.influence_score,
         authority_score = EXCLUDED.authority_score,
         coordination_risk_score = EXCLUDED.coordination_risk_score,
-        betweenness_centrality = EXCLUDED.betweenness_centrality,
         network_reach = EXCLUDED.network_reach,
         cross_reference_rate = EXCLUDED.cross_reference_rate,
         semantic_diversity_score = EXCLUDED.semantic_diversity_score,
@@ -458,10 +450,12 @@ END;
 $$;
 
 -- Get network bridge accounts (high betweenness centrality)
+-- betweenness_centrality is the normalised sampled estimate from
+-- compute_betweenness.py; values are small, so rank rather than threshold
 CREATE OR REPLACE FUNCTION osint.get_network_bridges(
     p_analysis_date DATE DEFAULT CURRENT_DATE - 1,
     p_analysis_period TEXT DEFAULT '7_days',
-    p_min_centrality FLOAT DEFAULT 0.4,
+    p_min_centrality FLOAT DEFAULT 0,
     p_limit INTEGER DEFAULT 20
 )
 RETURNS TABLE(
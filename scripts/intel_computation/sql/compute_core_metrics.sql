@@ -2,6 +2,78 @@
 -- FIXED VERSION - Complete implementation with all entity types
 -- Computes volume, engagement, virality, and growth metrics
 
+-- 7-day rolling averages of tweet_count / total_engagement for [p_start_date, p_end_date].
+-- Reads the 7 days before p_start_date from intel_metrics, so when days are computed
+-- out of order (parallel backfills) it is re-run over the whole range afterwards.
+CREATE OR REPLACE FUNCTION osint.compute_growth_metrics(
+    p_start_date DATE,
+    p_end_date DATE
+)
+RETURNS BIGINT
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_rows BIGINT;
+BEGIN
+    -- First aggregate the metrics per entity/time
+    WITH metric_data AS (
+        SELECT
+            time,
+            entity_type,
+            entity_id,
+            MAX(CASE WHEN metric_name = 'tweet_count'
+                THEN COALESCE(value_float, value_int) END) as tweet_count,
+            MAX(CASE WHEN metric_name = 'total_engagement'
+                THEN COALESCE(value_float, value_int) END) as total_engagement
+        FROM osint.intel_metrics
+        WHERE metric_name IN ('tweet_count', 'total_engagement')
+          AND DATE(time) BETWEEN p_start_date - 7 AND p_end_date
+        GROUP BY time, entity_type, entity_id
+    ),
+    rolling_metrics AS (
+        SELECT
+            time,
+            entity_type,
+            entity_id,
+            AVG(tweet_count) OVER (
+                PARTITION BY entity_type, entity_id
+                ORDER BY time
+                ROWS BETWEEN 6 PRECEDING AND CURRENT ROW
+            ) as tweets_7d_avg,
+            AVG(total_engagement) OVER (
+                PARTITION BY entity_type, entity_id
+                ORDER BY time
+                ROWS BETWEEN 6 PRECEDING AND CURRENT ROW
+            ) as engagement_7d_avg
+        FROM metric_data
+    )
+    INSERT INTO osint.intel_metrics (time, metric_name, entity_type, entity_id, value_float, unit)
+    SELECT
+        time,
+        metric_name,
+        entity_type,
+        entity_id,
+        value,
+        unit
+    FROM rolling_metrics
+    CROSS JOIN LATERAL (
+        VALUES
+            ('tweets_7d_avg', tweets_7d_avg, 'count'),
+            ('engagement_7d_avg', engagement_7d_avg, 'score')
+    ) AS unpivoted(metric_name, value, unit)
+    WHERE DATE(time) BETWEEN p_start_date AND p_end_date
+      AND value IS NOT NULL
+    ON CONFLICT (time, metric_name, entity_type, entity_id)
+    DO UPDATE SET
+        value_float = EXCLUDED.value_float,
+        unit = EXCLUDED.unit,
+        computed_at = NOW();
+
+    GET DIAGNOSTICS v_rows = ROW_COUNT;
+    RETURN v_rows;
+END;
+$$;
+
 CREATE OR REPLACE FUNCTION osint.compute_core_metrics(
     p_target_date DATE DEFAULT CURRENT_DATE - 1,
     p_days_back INTEGER DEFAULT 1
@@ -357,61 +429,7 @@ BEGIN
     -- ================================================================
     RAISE NOTICE 'Computing GROWTH metrics...';
 
-    -- First aggregate the metrics per entity/time
-    WITH metric_data AS (
-        SELECT
-            time,
-            entity_type,
-            entity_id,
-            MAX(CASE WHEN metric_name = 'tweet_count'
-                THEN COALESCE(value_float, value_int) END) as tweet_count,
-            MAX(CASE WHEN metric_name = 'total_engagement'
-                THEN COALESCE(value_float, value_int) END) as total_engagement
-        FROM osint.intel_metrics
-        WHERE metric_name IN ('tweet_count', 'total_engagement')
-          AND DATE(time) BETWEEN v_date_start - 7 AND v_date_end
-        GROUP BY time, entity_type, entity_id
-    ),
-    rolling_metrics AS (
-        SELECT
-            time,
-            entity_type,
-            entity_id,
-            AVG(tweet_count) OVER (
-                PARTITION BY entity_type, entity_id
-                ORDER BY time
-                ROWS BETWEEN 6 PRECEDING AND CURRENT ROW
-            ) as tweets_7d_avg,
-            AVG(total_engagement) OVER (
-                PARTITION BY entity_type, entity_id
-                ORDER BY time
-                ROWS BETWEEN 6 PRECEDING AND CURRENT ROW
-            ) as engagement_7d_avg
-        FROM metric_data
-    )
-    INSERT INTO osint.intel_metrics (time, metric_name, entity_type, entity_id, value_float, unit)
-    SELECT
-        time,
-        metric_name,
-        entity_type,
-        entity_id,
-        value,
-        unit
-    FROM rolling_metrics
-    CROSS JOIN LATERAL (
-        VALUES
-            ('tweets_7d_avg', tweets_7d_avg, 'count'),
-            ('engagement_7d_avg', engagement_7d_avg, 'score')
-    ) AS unpivoted(metric_name, value, unit)
-    WHERE DATE(time) BETWEEN v_date_start AND v_date_end
-      AND value IS NOT NULL
-    ON CONFLICT (time, metric_name, entity_type, entity_id)
-    DO UPDATE SET
-        value_float = EXCLUDED.value_float,
-        unit = EXCLUDED.unit,
-        computed_at = NOW();
-
-    GET DIAGNOSTICS v_metrics_count = ROW_COUNT;
+    v_metrics_count := osint.compute_growth_metrics(v_date_start, v_date_end);
     RAISE NOTICE '  - Growth metrics: % rows', v_metrics_count;
 
     -- Calculate computation time
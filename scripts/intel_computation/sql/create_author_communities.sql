@@ -0,0 +1,30 @@
+-- Author community assignments
+-- Written by compute_communities.py: Louvain modularity clustering of the
+-- reply/retweet/mention graph of the window (tweets_deduplicated), each edge
+-- weighted by its number of interactions inside the window
+
+CREATE TABLE IF NOT EXISTS osint.author_communities (
+    analysis_date DATE NOT NULL,
+    analysis_window TEXT NOT NULL, -- '7_days', '30_days', '90_days'
+    author_id TEXT NOT NULL,
+
+    -- 0 = largest community of the run, 1 = next largest, ...
+    community_id INTEGER NOT NULL,
+    community_size INTEGER NOT NULL,
+
+    -- Interactions in the window on the author's edges (both directions)
+    weighted_degree FLOAT DEFAULT 0,
+
+    -- Modularity of the whole partition (same for every row of a run)
+    modularity FLOAT NOT NULL,
+
+    computed_at TIMESTAMPTZ DEFAULT NOW(),
+
+    PRIMARY KEY (analysis_date, analysis_window, author_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_author_communities_community
+ON osint.author_communities (analysis_date, analysis_window, community_id, weighted_degree DESC);
+
+CREATE INDEX IF NOT EXISTS idx_author_communities_author
+ON osint.author_communities (author_id, analysis_date DESC);
@@ -0,0 +1,145 @@
+-- Unique Author Sketches for Project/Theme Metrics
+-- intel_metrics stores unique_authors as a per-day integer, which cannot be
+-- added up across days (an author active on Monday and Tuesday counts twice).
+-- This table keeps a HyperLogLog sketch per (day, entity) alongside it, so the
+-- distinct author count for any window is a merge of day sketches instead of a
+-- COUNT(DISTINCT) rescan of tweets.
+
+-- postgres-hll: https://github.com/citusdata/postgresql-hll
+CREATE EXTENSION IF NOT EXISTS hll SCHEMA public;
+
+-- ================================================================
+-- SKETCH TABLE (same time/entity dimensions as intel_metrics)
+-- ================================================================
+CREATE TABLE IF NOT EXISTS osint.intel_author_sketches (
+    time TIMESTAMPTZ NOT NULL,
+    entity_type VARCHAR(20) NOT NULL CHECK (entity_type IN ('project', 'theme')),
+    entity_id INTEGER NOT NULL,
+    authors hll NOT NULL DEFAULT hll_empty(),
+    computed_at TIMESTAMPTZ DEFAULT NOW(),
+
+    PRIMARY KEY (entity_type, entity_id, time)
+);
+
+COMMENT ON TABLE osint.intel_author_sketches IS
+'Per-day HyperLogLog sketch of author_ids per project/theme. Merge with hll_union_agg for any date range.';
+
+-- ================================================================
+-- COMPUTE: one sketch per day per project and theme
+-- ================================================================
+CREATE OR REPLACE FUNCTION osint.compute_author_sketches(
+    p_target_date DATE DEFAULT CURRENT_DATE - 1,
+    p_days_back INTEGER DEFAULT 1
+)
+RETURNS TABLE(
+    sketches_computed BIGINT,
+    computation_time_ms BIGINT
+)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_start_time TIMESTAMP := clock_timestamp();
+    v_count BIGINT := 0;
+    v_rows BIGINT;
+    v_date_start DATE := p_target_date - p_days_back + 1;
+    v_date_end DATE := p_target_date;
+BEGIN
+    RAISE NOTICE 'Computing author sketches from % to %', v_date_start, v_date_end;
+
+    -- Project sketches
+    INSERT INTO osint.intel_author_sketches (time, entity_type, entity_id, authors)
+    SELECT
+        DATE(t.created_at)::timestamptz,
+        'project',
+        tc.project_id,
+        hll_add_agg(hll_hash_text(t.author_id))
+    FROM osint.tweets_deduplicated t
+    JOIN osint.tweet_collections tc ON t.tweet_id = tc.tweet_id
+    WHERE DATE(t.created_at) BETWEEN v_date_start AND v_date_end
+    GROUP BY DATE(t.created_at), tc.project_id
+    ON CONFLICT (entity_type, entity_id, time) DO UPDATE SET
+        authors = EXCLUDED.authors,
+        computed_at = NOW();
+
+    GET DIAGNOSTICS v_rows = ROW_COUNT;
+    v_count := v_count + v_rows;
+
+    -- Theme sketches
+    INSERT INTO osint.intel_author_sketches (time, entity_type, entity_id, authors)
+    SELECT
+        DATE(t.created_at)::timestamptz,
+        'theme',
+        th.id,
+        hll_add_agg(hll_hash_text(t.author_id))
+    FROM osint.tweets_deduplicated t
+    JOIN osint.tweet_collections tc ON t.tweet_id = tc.tweet_id
+    JOIN osint.themes th ON tc.theme_code = th.code
+    WHERE DATE(t.created_at) BETWEEN v_date_start AND v_date_end
+    GROUP BY DATE(t.created_at), th.id
+    ON CONFLICT (entity_type, entity_id, time) DO UPDATE SET
+        authors = EXCLUDED.authors,
+        computed_at = NOW();
+
+    GET DIAGNOSTICS v_rows = ROW_COUNT;
+    v_count := v_count + v_rows;
+
+    RAISE NOTICE '  - Author sketches: % rows', v_count;
+
+    RETURN QUERY SELECT
+        v_count,
+        (EXTRACT(EPOCH FROM (clock_timestamp() - v_start_time)) * 1000)::BIGINT;
+END;
+$$;
+
+-- ================================================================
+-- MERGE ON READ: distinct authors for any window
+-- ================================================================
+CREATE OR REPLACE FUNCTION osint.get_unique_authors(
+    p_entity_type VARCHAR,
+    p_entity_id INTEGER,
+    p_start_time TIMESTAMPTZ DEFAULT NOW() - INTERVAL '30 days',
+    p_end_time TIMESTAMPTZ DEFAULT NOW()
+)
+RETURNS BIGINT
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT COALESCE(ROUND(hll_cardinality(hll_union_agg(s.authors)))::BIGINT, 0)
+    FROM osint.intel_author_sketches s
+    WHERE s.entity_type = p_entity_type
+    AND s.entity_id = p_entity_id
+    AND s.time >= p_start_time
+    AND s.time <= p_end_time;
+$$;
+
+-- Rolling distinct authors per day (trailing window), e.g. 7-day reach
+CREATE OR REPLACE FUNCTION osint.get_unique_authors_rolling(
+    p_entity_type VARCHAR,
+    p_entity_id INTEGER,
+    p_window_days INTEGER DEFAULT 7,
+    p_start_time TIMESTAMPTZ DEFAULT NOW() - INTERVAL '30 days',
+    p_end_time TIMESTAMPTZ DEFAULT NOW()
+)
+RETURNS TABLE(
+    metric_time TIMESTAMPTZ,
+    unique_authors BIGINT
+)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT
+        d.time,
+        COALESCE(ROUND(hll_cardinality(hll_union_agg(w.authors)))::BIGINT, 0)
+    FROM osint.intel_author_sketches d
+    JOIN osint.intel_author_sketches w
+        ON w.entity_type = d.entity_type
+        AND w.entity_id = d.entity_id
+        AND w.time > d.time - make_interval(days => p_window_days)
+        AND w.time <= d.time
+    WHERE d.entity_type = p_entity_type
+    AND d.entity_id = p_entity_id
+    AND d.time >= p_start_time
+    AND d.time <= p_end_time
+    GROUP BY d.time
+    ORDER BY d.time;
+$$;
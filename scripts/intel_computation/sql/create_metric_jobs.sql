@@ -0,0 +1,24 @@
+-- Task state for run_metrics.py
+-- One row per (stage, target_date, params): the last attempt of that task
+
+CREATE TABLE IF NOT EXISTS osint.metric_jobs (
+    stage TEXT NOT NULL,                -- author_daily, author_intelligence, betweenness, ...
+    target_date DATE NOT NULL,
+    params TEXT NOT NULL DEFAULT '',    -- e.g. '7_days/1' for period/threshold
+    status TEXT NOT NULL,               -- running, completed, failed
+    attempts INTEGER NOT NULL DEFAULT 0,
+    run_id TEXT,                        -- orchestrator run that made the last attempt
+    started_at TIMESTAMPTZ,
+    finished_at TIMESTAMPTZ,
+    duration_ms BIGINT,
+    result JSONB,                       -- rows returned by the SQL function / script output tail
+    error TEXT,
+    PRIMARY KEY (stage, target_date, params)
+);
+
+CREATE INDEX IF NOT EXISTS idx_metric_jobs_finished
+ON osint.metric_jobs (finished_at DESC);
+
+CREATE INDEX IF NOT EXISTS idx_metric_jobs_status
+ON osint.metric_jobs (status)
+WHERE status <> 'completed';
@@ -0,0 +1,47 @@
+-- Near-duplicate text detection state and output
+-- Written by compute_text_clusters.py (MinHash + LSH over tweets_deduplicated.text)
+
+-- One MinHash signature per processed tweet; cluster_id once it has a near-duplicate
+CREATE TABLE IF NOT EXISTS osint.text_minhash (
+    tweet_id TEXT PRIMARY KEY,
+    author_id TEXT,
+    created_at TIMESTAMPTZ,
+    signature BYTEA NOT NULL,          -- NUM_PERM little-endian uint32 values
+    cluster_id BIGINT
+);
+
+CREATE INDEX IF NOT EXISTS idx_text_minhash_cluster
+ON osint.text_minhash (cluster_id)
+WHERE cluster_id IS NOT NULL;
+
+-- LSH band buckets: the first tweet that landed in each bucket represents it
+CREATE TABLE IF NOT EXISTS osint.text_lsh_buckets (
+    band SMALLINT NOT NULL,
+    bucket BIGINT NOT NULL,
+    tweet_id TEXT NOT NULL,
+    created_at TIMESTAMPTZ,
+    PRIMARY KEY (band, bucket)
+);
+
+CREATE INDEX IF NOT EXISTS idx_text_lsh_buckets_created
+ON osint.text_lsh_buckets (created_at);
+
+CREATE SEQUENCE IF NOT EXISTS osint.text_clusters_id_seq;
+
+-- Clusters of near-identical texts posted by at least two distinct authors
+CREATE TABLE IF NOT EXISTS osint.text_clusters (
+    cluster_id BIGINT PRIMARY KEY,
+    representative_tweet_id TEXT NOT NULL,  -- earliest tweet of the cluster
+    sample_text TEXT,
+    tweet_count INTEGER NOT NULL,
+    author_count INTEGER NOT NULL,
+    first_seen TIMESTAMPTZ,
+    last_seen TIMESTAMPTZ,
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_text_clusters_last_seen
+ON osint.text_clusters (last_seen DESC);
+
+CREATE INDEX IF NOT EXISTS idx_text_clusters_authors
+ON osint.text_clusters (author_count DESC);
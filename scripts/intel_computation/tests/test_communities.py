@@ -0,0 +1,32 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+pytest.importorskip("psycopg2")
+pytest.importorskip("dotenv")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from compute_communities import louvain, symmetric_edges
+
+
+def _communities(sources, targets, n):
+    u, v, w = symmetric_edges(np.asarray(sources), np.asarray(targets),
+                              np.ones(len(sources)), n)
+    return louvain(u, v, w, n)
+
+
+def test_single_edge():
+    membership, q = _communities([0], [1], 2)
+    assert membership.tolist() == [0, 0]
+    assert q == pytest.approx(0.0)
+
+
+def test_disjoint_components():
+    # Two triangles: the first level merges each one, the second has no edges between communities
+    membership, q = _communities([0, 1, 2, 3, 4, 5], [1, 2, 0, 4, 5, 3], 6)
+    assert len(set(membership[:3])) == 1
+    assert len(set(membership[3:])) == 1
+    assert membership[0] != membership[3]
+    assert q == pytest.approx(0.5)
@@ -23,7 +23,7 @@ source ../.venv/bin/activate
 
 # Install required packages if needed
 echo -e "${YELLOW}Checking dependencies...${NC}"
-pip install -q psycopg2-binary openai python-dotenv
+pip install -q psycopg2-binary openai python-dotenv numpy
 
 # Navigate to scripts directory
 cd "$(dirname "$0")/topic_refinement" || exit
@@ -34,6 +34,8 @@ if [ $# -eq 0 ]; then
     echo "  $0 process [--mode {full|quick|test}] [--limit N] [--dry-run]"
     echo "  $0 view [--category CATEGORY] [--priority {high|medium|low|ignore}]"
     echo "  $0 stats"
+    echo "  $0 submit-batch [--mode {full|quick|test}] [--limit N]"
+    echo "  $0 collect-batch [--wait]"
     echo ""
     echo -e "${YELLOW}Examples:${NC}"
     echo "  $0 process --mode test --limit 5        # Test with 5 topics"
@@ -41,6 +43,8 @@ if [ $# -eq 0 ]; then
     echo "  $0 process --mode full                  # Full processing of all topics"
     echo "  $0 view --priority high                 # View high priority topics"
     echo "  $0 stats                                # Show processing statistics"
+    echo "  $0 submit-batch --mode full             # Queue all unprocessed topics at batch pricing"
+    echo "  $0 collect-batch --wait                 # Poll and ingest finished batch jobs"
     exit 1
 fi
 
@@ -2,18 +2,24 @@
 """
 Compute topic evolution metrics from tweet_topics data
 Populates the topic_evolution table with hourly/daily aggregations
+and an hourly unique-author HyperLogLog sketch (postgres-hll)
 """
 
 import psycopg2
-from psycopg2.extras import RealDictCursor, execute_values
+from psycopg2.extras import RealDictCursor
 from datetime import datetime, timedelta
 import json
 import sys
 import argparse
-from typing import Dict, List, Optional
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
 import os
 from dotenv import load_dotenv
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.bulk_loader import BulkLoader
+from keywords import KeywordExtractor, load_stopwords
+
 # Load environment variables
 load_dotenv('../../.env')
 
@@ -26,10 +32,147 @@ DATABASE_CONFIG = {
     "schema": os.getenv("POSTGRES_SCHEMA", "osint")
 }
 
+JOB_NAME = 'topic_evolution'
+
+# growth_rate is filled in afterwards by update_growth_rates
+EVOLUTION_COLUMNS = [
+    'topic_id', 'date', 'hour', 'tweet_count', 'unique_authors', 'authors',
+    'new_authors', 'avg_probability', 'top_keywords',
+    'total_engagement', 'viral_tweets'
+]
+FIRST_SEEN_SQL_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'sql', 'create_topic_author_first_seen.sql'
+)
+
+# Rows feeding the metrics: one per (topic assignment, tweet), restricted by {scope}
+SCOPE_BY_RANGE = """
+    SELECT tt.topic_id, tt.tweet_id, tt.probability,
+           t.author_id, t.created_at, t.text, t.total_engagement
+    FROM tweet_topics tt
+    JOIN tweets_deduplicated t ON tt.tweet_id = t.tweet_id
+    WHERE tt.topic_id != -1
+    AND t.created_at >= %s
+    AND t.created_at < %s
+"""
+
+SCOPE_BY_BUCKETS = """
+    SELECT tt.topic_id, tt.tweet_id, tt.probability,
+           t.author_id, t.created_at, t.text, t.total_engagement
+    FROM unnest(%s::integer[], %s::timestamptz[]) AS b(topic_id, hour_bucket)
+    JOIN tweets_deduplicated t
+        ON t.created_at >= b.hour_bucket
+        AND t.created_at < b.hour_bucket + interval '1 hour'
+    JOIN tweet_topics tt ON tt.tweet_id = t.tweet_id AND tt.topic_id = b.topic_id
+"""
+
+EVOLUTION_QUERY = """
+WITH scope AS ({scope}),
+hourly_stats AS (
+    SELECT
+        topic_id,
+        DATE_TRUNC('hour', created_at) as hour_bucket,
+        EXTRACT(HOUR FROM created_at)::integer as hour,
+        COUNT(DISTINCT tweet_id) as tweet_count,
+        COUNT(DISTINCT author_id) as unique_authors,
+        hll_add_agg(hll_hash_text(author_id)) as authors,
+        AVG(probability) as avg_probability,
+        SUM(total_engagement) as total_engagement,
+        COUNT(DISTINCT CASE WHEN total_engagement > 1000 THEN tweet_id END) as viral_tweets
+    FROM scope
+    GROUP BY topic_id, DATE_TRUNC('hour', created_at), EXTRACT(HOUR FROM created_at)
+),
+new_authors AS (
+    -- Authors who posted about this topic for the first time in this hour
+    SELECT
+        hs.topic_id,
+        hs.hour_bucket,
+        COUNT(*) as new_author_count
+    FROM hourly_stats hs
+    JOIN topic_author_first_seen fs
+        ON fs.topic_id = hs.topic_id
+        AND fs.first_seen >= hs.hour_bucket
+        AND fs.first_seen < hs.hour_bucket + interval '1 hour'
+    GROUP BY hs.topic_id, hs.hour_bucket
+)
+SELECT
+    hs.topic_id,
+    hs.hour_bucket as date,
+    hs.hour,
+    hs.tweet_count,
+    hs.unique_authors,
+    hs.authors::text as authors,
+    COALESCE(na.new_author_count, 0) as new_authors,
+    hs.avg_probability,
+    hs.total_engagement,
+    hs.viral_tweets
+FROM hourly_stats hs
+LEFT JOIN new_authors na ON hs.topic_id = na.topic_id AND hs.hour_bucket = na.hour_bucket
+"""
+
+# Text for top_keywords, streamed to Python through a server-side cursor
+KEYWORD_QUERY = """
+SELECT s.topic_id, DATE_TRUNC('hour', s.created_at) as hour_bucket, s.text
+FROM ({scope}) s
+"""
+# TF-IDF baseline: every tweet of the scoped topics over the trailing window of the
+# scoped days, independent of which buckets the scope itself covers
+KEYWORD_BASELINE_QUERY = """
+WITH spans AS (
+    SELECT topic_id,
+           DATE_TRUNC('day', MIN(created_at)) - make_interval(days => %s) as window_start,
+           DATE_TRUNC('day', MAX(created_at)) + interval '1 day' as window_end
+    FROM ({scope}) s
+    GROUP BY topic_id
+)
+SELECT tt.topic_id, DATE_TRUNC('day', t.created_at) as day, t.text
+FROM spans sp
+JOIN tweets_deduplicated t
+    ON t.created_at >= sp.window_start
+    AND t.created_at < sp.window_end
+JOIN tweet_topics tt ON tt.tweet_id = t.tweet_id AND tt.topic_id = sp.topic_id
+"""
+KEYWORD_CHUNK_SIZE = 5000
+# --verify recomputes top_keywords in chunks of this many days (not the day
+# partitions the workers used, so scope-dependent keywords show up as mismatches)
+VERIFY_KEYWORD_DAYS = 7
+
+
+def day_partitions(start_date: datetime, end_date: datetime) -> List[Tuple[datetime, datetime]]:
+    """
+    Split [start_date, end_date) into day-long ranges starting at midnight,
+    so no hour bucket is shared between two partitions
+    """
+    partitions = []
+    current = start_date.replace(hour=0, minute=0, second=0, microsecond=0)
+    while current < end_date:
+        partition_end = min(current + timedelta(days=1), end_date)
+        partitions.append((current, partition_end))
+        current = partition_end
+    return partitions
+
+
+def _compute_partition(partition: Tuple[datetime, datetime],
+                       keyword_extractor: KeywordExtractor) -> Tuple[datetime, int]:
+    """Worker entry point: compute one day partition on its own connection"""
+    computer = TopicEvolutionComputer(verbose=False, keyword_extractor=keyword_extractor)
+    try:
+        # first_seen was refreshed for the whole range before the workers started
+        buckets = computer._compute_and_store(SCOPE_BY_RANGE, partition, record_first_seen=False)
+        return partition[0], len(buckets)
+    finally:
+        computer.close()
+
+
 class TopicEvolutionComputer:
-    def __init__(self):
+    def __init__(self, verbose: bool = True, keyword_extractor: Optional[KeywordExtractor] = None):
+        self.verbose = verbose
+        self.keyword_extractor = keyword_extractor or KeywordExtractor()
         self.conn = None
         self.connect()
+        self.loader = BulkLoader(
+            self.conn, 'topic_evolution', EVOLUTION_COLUMNS,
+            conflict_columns=['topic_id', 'date', 'hour']
+        )
 
     def connect(self):
         """Establish database connection"""
@@ -42,13 +185,125 @@ class TopicEvolutionComputer:
                 password=DATABASE_CONFIG["password"]
             )
             with self.conn.cursor() as cur:
-                cur.execute(f"SET search_path TO {DATABASE_CONFIG['schema']}")
+                cur.execute(f"SET search_path TO {DATABASE_CONFIG['schema']}, public")
             self.conn.commit()
-            print(f"Connected to database: {DATABASE_CONFIG['database']}")
+            if self.verbose:
+                print(f"Connected to database: {DATABASE_CONFIG['database']}")
         except Exception as e:
             print(f"Database connection failed: {e}")
             raise
 
+    def ensure_schema(self):
+        """Make sure topic_evolution and the watermark table have the expected structure"""
+        ddl = """
+        ALTER TABLE topic_evolution
+        ADD COLUMN IF NOT EXISTS id SERIAL PRIMARY KEY;
+
+        -- Unique-author sketch per hour (postgres-hll), merged for wider windows
+        CREATE EXTENSION IF NOT EXISTS hll SCHEMA public;
+        ALTER TABLE topic_evolution
+        ADD COLUMN IF NOT EXISTS authors hll;
+
+        -- Add unique constraint if not exists
+        DO $$
+        BEGIN
+            IF NOT EXISTS (
+                SELECT 1 FROM pg_constraint
+                WHERE conname = 'topic_evolution_unique'
+            ) THEN
+                ALTER TABLE topic_evolution
+                ADD CONSTRAINT topic_evolution_unique
+                UNIQUE (topic_id, date, hour);
+            END IF;
+        END $$;
+
+        -- Incremental processing state (shared with compute_theme_topics.py)
+        CREATE TABLE IF NOT EXISTS compute_watermarks (
+            job_name VARCHAR(100) PRIMARY KEY,
+            last_tweet_topic_at TIMESTAMP,
+            last_collected_at TIMESTAMPTZ,
+            updated_at TIMESTAMPTZ DEFAULT NOW()
+        );
+        ALTER TABLE compute_watermarks
+        ADD COLUMN IF NOT EXISTS last_fetched_at TIMESTAMPTZ;
+
+        -- Source indexes used to find buckets touched since the watermark
+        CREATE INDEX IF NOT EXISTS idx_tweet_topics_created_at ON tweet_topics (created_at);
+        CREATE INDEX IF NOT EXISTS idx_tweets_dedup_fetched_at ON tweets_deduplicated (fetched_at);
+        """
+
+        with open(FIRST_SEEN_SQL_FILE) as f:
+            first_seen_ddl = f.read()
+
+        with self.conn.cursor() as cur:
+            cur.execute(ddl)
+            cur.execute(first_seen_ddl)
+        self.conn.commit()
+
+    def seed_first_seen(self, force: bool = False):
+        """Fill topic_author_first_seen from full history if it is empty (or if forced)"""
+        with self.conn.cursor() as cur:
+            cur.execute("SELECT EXISTS (SELECT 1 FROM topic_author_first_seen)")
+            if cur.fetchone()[0] and not force:
+                return
+
+            print("Seeding topic_author_first_seen from full history...")
+            cur.execute("TRUNCATE topic_author_first_seen")
+            cur.execute("""
+            INSERT INTO topic_author_first_seen (topic_id, author_id, first_seen, first_tweet_id)
+            SELECT DISTINCT ON (tt.topic_id, t.author_id)
+                tt.topic_id, t.author_id, t.created_at, t.tweet_id
+            FROM tweet_topics tt
+            JOIN tweets_deduplicated t ON tt.tweet_id = t.tweet_id
+            WHERE tt.topic_id != -1
+            AND t.author_id IS NOT NULL
+            AND t.created_at IS NOT NULL
+            ORDER BY tt.topic_id, t.author_id, t.created_at
+            """)
+            print(f"  Seeded {cur.rowcount} topic-author pairs")
+        self.conn.commit()
+
+    def _upsert_first_seen(self, cur, scope: str, params: tuple) -> List[Tuple[int, datetime]]:
+        """
+        Record first appearances within the scoped rows, keeping the earliest seen so far.
+        Returns the (topic_id, hour) buckets that held a first_seen which moved to an
+        earlier hour: they still count those authors in new_authors until recomputed.
+        """
+        query = f"""
+        WITH candidates AS (
+            SELECT DISTINCT ON (s.topic_id, s.author_id)
+                s.topic_id, s.author_id, s.created_at, s.tweet_id
+            FROM ({scope}) s
+            WHERE s.author_id IS NOT NULL
+            AND s.created_at IS NOT NULL
+            ORDER BY s.topic_id, s.author_id, s.created_at
+        ),
+        previous AS (
+            -- Sees the table as it was before the upsert below
+            SELECT fs.topic_id, fs.author_id, fs.first_seen
+            FROM topic_author_first_seen fs
+            JOIN candidates c ON c.topic_id = fs.topic_id AND c.author_id = fs.author_id
+            WHERE c.created_at < fs.first_seen
+        ),
+        upserted AS (
+            INSERT INTO topic_author_first_seen (topic_id, author_id, first_seen, first_tweet_id)
+            SELECT topic_id, author_id, created_at, tweet_id
+            FROM candidates
+            ON CONFLICT (topic_id, author_id) DO UPDATE SET
+                first_seen = EXCLUDED.first_seen,
+                first_tweet_id = EXCLUDED.first_tweet_id,
+                updated_at = NOW()
+            WHERE EXCLUDED.first_seen < topic_author_first_seen.first_seen
+            RETURNING topic_id, author_id, first_seen
+        )
+        SELECT DISTINCT p.topic_id, DATE_TRUNC('hour', p.first_seen)
+        FROM upserted u
+        JOIN previous p ON p.topic_id = u.topic_id AND p.author_id = u.author_id
+        WHERE DATE_TRUNC('hour', p.first_seen) <> DATE_TRUNC('hour', u.first_seen)
+        """
+        cur.execute(query, params)
+        return [(row[0], row[1]) for row in cur.fetchall()]
+
     def get_date_range(self) -> tuple:
         """Get min and max dates from tweet data"""
         query = """
@@ -67,181 +322,321 @@ class TopicEvolutionComputer:
             result = cur.fetchone()
             return result[0], result[1]
 
-    def get_last_processed_date(self) -> Optional[datetime]:
-        """Get the last processed date from topic_evolution"""
+    def get_watermark(self) -> Optional[Tuple[Optional[datetime], Optional[datetime]]]:
+        """Last processed (tweet_topics.created_at, tweets_deduplicated.fetched_at), None before the first run"""
         query = """
-        SELECT MAX(date)
-        FROM topic_evolution
+        SELECT last_tweet_topic_at, last_fetched_at
+        FROM compute_watermarks
+        WHERE job_name = %s
         """
 
         with self.conn.cursor() as cur:
-            cur.execute(query)
+            cur.execute(query, (JOB_NAME,))
             result = cur.fetchone()
-            return result[0] if result[0] else None
+            return (result[0], result[1]) if result else None
+
+    def get_source_high_water(self) -> Tuple[Optional[datetime], Optional[datetime]]:
+        """Newest source timestamps right now; rows after these wait for the next run"""
+        query = """
+        SELECT
+            (SELECT MAX(created_at) FROM tweet_topics),
+            (SELECT MAX(fetched_at) FROM tweets_deduplicated)
+        """
+
+        with self.conn.cursor() as cur:
+            cur.execute(query)
+            return cur.fetchone()
+
+    def set_watermark(self, tweet_topic_at: Optional[datetime], fetched_at: Optional[datetime]):
+        """Record the source timestamps covered by this run"""
+        query = """
+        INSERT INTO compute_watermarks (job_name, last_tweet_topic_at, last_fetched_at, updated_at)
+        VALUES (%s, %s, %s, NOW())
+        ON CONFLICT (job_name) DO UPDATE SET
+            last_tweet_topic_at = EXCLUDED.last_tweet_topic_at,
+            last_fetched_at = EXCLUDED.last_fetched_at,
+            updated_at = NOW()
+        """
+
+        with self.conn.cursor() as cur:
+            cur.execute(query, (JOB_NAME, tweet_topic_at, fetched_at))
+        self.conn.commit()
+
+    def find_dirty_buckets(self, since: Tuple[Optional[datetime], Optional[datetime]],
+                           until: Tuple[Optional[datetime], Optional[datetime]]) -> List[Tuple[int, datetime]]:
+        """(topic_id, hour) buckets with topic assignments or (re)fetched tweets since the watermark"""
+        query = """
+        SELECT tt.topic_id, DATE_TRUNC('hour', t.created_at) AS hour_bucket
+        FROM tweet_topics tt
+        JOIN tweets_deduplicated t ON t.tweet_id = tt.tweet_id
+        WHERE tt.topic_id != -1
+        AND tt.created_at > %s AND tt.created_at <= %s
+        UNION
+        SELECT tt.topic_id, DATE_TRUNC('hour', t.created_at) AS hour_bucket
+        FROM tweets_deduplicated t
+        JOIN tweet_topics tt ON tt.tweet_id = t.tweet_id
+        WHERE tt.topic_id != -1
+        AND t.fetched_at > %s AND t.fetched_at <= %s
+        """
+
+        epoch = datetime(1970, 1, 1)
+        with self.conn.cursor() as cur:
+            cur.execute(query, (
+                since[0] or epoch, until[0] or epoch,
+                since[1] or epoch, until[1] or epoch
+            ))
+            return sorted(
+                ((row[0], row[1]) for row in cur.fetchall() if row[1] is not None),
+                key=lambda b: (b[1], b[0])
+            )
 
-    def compute_hourly_evolution(self, start_date: datetime, end_date: datetime, batch_size: int = 24):
+    def refresh_first_seen(self, start_date: datetime, end_date: datetime) -> List[Tuple[int, datetime]]:
+        """Upsert first appearances for a whole date range in one pass; returns the stale buckets"""
+        with self.conn.cursor() as cur:
+            stale = self._upsert_first_seen(cur, SCOPE_BY_RANGE, (start_date, end_date))
+        self.conn.commit()
+        return stale
+
+    def _compute_and_store(self, scope: str, params: tuple,
+                           record_first_seen: bool = True) -> List[Tuple[int, datetime]]:
+        """Aggregate the scoped rows into hourly records, upsert them and return the buckets written"""
+        query = EVOLUTION_QUERY.format(scope=scope)
+
+        stale = []
+        if record_first_seen:
+            # new_authors reads first_seen, so bring it up to date for this scope first
+            with self.conn.cursor() as cur:
+                stale = self._upsert_first_seen(cur, scope, params)
+
+        with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(query, params)
+            results = cur.fetchall()
+
+        if results:
+            keywords = self._extract_keywords(scope, params)
+            self.loader.load(
+                (
+                    r['topic_id'],
+                    r['date'],
+                    r['hour'],
+                    r['tweet_count'],
+                    r['unique_authors'],
+                    r['authors'],
+                    r['new_authors'],
+                    r['avg_probability'],
+                    json.dumps(keywords.get((r['topic_id'], r['date']), {})),
+                    r['total_engagement'],
+                    r['viral_tweets']
+                )
+                for r in results
+            )
+
+        buckets = [(r['topic_id'], r['date']) for r in results]
+        self.update_growth_rates(buckets)
+        self.conn.commit()
+
+        # Buckets outside the scope that lost an author's first appearance to it
+        stale = sorted(set(stale) - set(buckets), key=lambda b: (b[1], b[0]))
+        if stale:
+            buckets += self._compute_and_store(
+                SCOPE_BY_BUCKETS, ([b[0] for b in stale], [b[1] for b in stale]),
+                record_first_seen=False
+            )
+        return buckets
+
+    def _extract_keywords(self, scope: str, params: tuple) -> Dict[Tuple[int, datetime], Dict]:
+        """Top keywords per (topic_id, hour), tokenized in Python from streamed tweet text"""
+        with self.conn.cursor(name='evolution_keywords') as cur:
+            cur.itersize = KEYWORD_CHUNK_SIZE
+            cur.execute(KEYWORD_QUERY.format(scope=scope), params)
+            if not self.keyword_extractor.needs_baseline:
+                return self.keyword_extractor.extract(cur)
+
+            with self.conn.cursor(name='evolution_keyword_baseline') as baseline:
+                baseline.itersize = KEYWORD_CHUNK_SIZE
+                baseline.execute(
+                    KEYWORD_BASELINE_QUERY.format(scope=scope),
+                    (self.keyword_extractor.baseline_days - 1,) + tuple(params)
+                )
+                return self.keyword_extractor.extract(cur, baseline)
+
+    def update_growth_rates(self, buckets: List[Tuple[int, datetime]]):
+        """
+        Recompute growth_rate for the given buckets and the hour after each,
+        since a changed count also changes the next hour's growth
+        """
+        if not buckets:
+            return
+
+        targets = set(buckets)
+        targets.update((topic_id, hour + timedelta(hours=1)) for topic_id, hour in buckets)
+        topic_ids, hours = zip(*targets)
+
+        query = """
+        UPDATE topic_evolution te
+        SET growth_rate = CASE
+            WHEN prev.tweet_count > 0
+            THEN (te.tweet_count - prev.tweet_count)::float / prev.tweet_count
+            ELSE 0
+        END
+        FROM unnest(%s::integer[], %s::timestamptz[]) AS target(topic_id, hour_bucket)
+        LEFT JOIN topic_evolution prev
+            ON prev.topic_id = target.topic_id
+            AND prev.date = target.hour_bucket - interval '1 hour'
+        WHERE te.topic_id = target.topic_id
+        AND te.date = target.hour_bucket
+        """
+
+        with self.conn.cursor() as cur:
+            cur.execute(query, (list(topic_ids), list(hours)))
+
+    def compute_hourly_evolution(self, start_date: datetime, end_date: datetime):
         """Compute topic evolution metrics hourly"""
 
         print(f"Computing evolution from {start_date} to {end_date}")
 
         # Process in daily batches
-        current_date = start_date
+        for current_date, batch_end in day_partitions(start_date, end_date):
+            print(f"Processing {current_date.date()}...")
 
-        while current_date < end_date:
-            batch_end = min(current_date + timedelta(days=1), end_date)
+            buckets = self._compute_and_store(SCOPE_BY_RANGE, (current_date, batch_end))
+            if buckets:
+                print(f"  Inserted {len(buckets)} hourly records")
 
-            print(f"Processing {current_date.date()}...")
+    def compute_hourly_evolution_parallel(self, start_date: datetime, end_date: datetime, workers: int):
+        """
+        Compute day partitions on a pool of worker processes, one connection each.
+        Days are independent except for growth_rate at midnight, which refers to the
+        previous partition and is recomputed once every worker has finished.
+        """
+        partitions = day_partitions(start_date, end_date)
+        if not partitions:
+            return
+
+        print(f"Computing evolution from {start_date} to {end_date}: "
+              f"{len(partitions)} days on {workers} workers")
+
+        # Workers only read first_seen; writing it concurrently would make a day's
+        # new_authors depend on whether earlier days had been processed yet
+        stale = self.refresh_first_seen(partitions[0][0], partitions[-1][1])
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(_compute_partition, partition, self.keyword_extractor)
+                for partition in partitions
+            ]
+            for future in as_completed(futures):
+                day, inserted = future.result()
+                print(f"  {day.date()}: {inserted} hourly records")
+
+        self.fix_partition_growth_rates([start for start, _ in partitions])
+
+        # Buckets after the range whose first appearances moved into it
+        stale = [b for b in stale if not partitions[0][0] <= b[1] < partitions[-1][1]]
+        if stale:
+            self.compute_buckets(sorted(stale, key=lambda b: (b[1], b[0])))
+
+    def fix_partition_growth_rates(self, boundaries: List[datetime]):
+        """Recompute growth_rate for the first hour of each partition against the previous day"""
+        query = """
+        UPDATE topic_evolution te
+        SET growth_rate = CASE
+            WHEN prev.tweet_count > 0
+            THEN (te.tweet_count - prev.tweet_count)::float / prev.tweet_count
+            ELSE 0
+        END
+        FROM topic_evolution cur
+        LEFT JOIN topic_evolution prev
+            ON prev.topic_id = cur.topic_id
+            AND prev.date = cur.date - interval '1 hour'
+        WHERE te.id = cur.id
+        AND cur.date = ANY(%s::timestamptz[])
+        """
 
-            # Compute metrics for this batch
-            query = """
-            WITH hourly_stats AS (
-                SELECT
-                    tt.topic_id,
-                    DATE_TRUNC('hour', t.created_at) as hour_bucket,
-                    EXTRACT(HOUR FROM t.created_at)::integer as hour,
-                    COUNT(DISTINCT tt.tweet_id) as tweet_count,
-                    COUNT(DISTINCT t.author_id) as unique_authors,
-                    AVG(tt.probability) as avg_probability,
-                    SUM(t.total_engagement) as total_engagement,
-                    COUNT(DISTINCT CASE WHEN t.total_engagement > 1000 THEN t.tweet_id END) as viral_tweets
-                FROM tweet_topics tt
-                JOIN tweets_deduplicated t ON tt.tweet_id = t.tweet_id
-                WHERE tt.topic_id != -1
-                AND t.created_at >= %s
-                AND t.created_at < %s
-                GROUP BY tt.topic_id, DATE_TRUNC('hour', t.created_at), EXTRACT(HOUR FROM t.created_at)
-            ),
-            new_authors AS (
-                -- Count authors who posted about this topic for the first time
-                SELECT
-                    tt.topic_id,
-                    DATE_TRUNC('hour', t.created_at) as hour_bucket,
-                    COUNT(DISTINCT t.author_id) as new_author_count
-                FROM tweet_topics tt
-                JOIN tweets_deduplicated t ON tt.tweet_id = t.tweet_id
-                WHERE tt.topic_id != -1
-                AND t.created_at >= %s
-                AND t.created_at < %s
-                AND NOT EXISTS (
-                    SELECT 1
-                    FROM tweet_topics tt2
-                    JOIN tweets_deduplicated t2 ON tt2.tweet_id = t2.tweet_id
-                    WHERE tt2.topic_id = tt.topic_id
-                    AND t2.author_id = t.author_id
-                    AND t2.created_at < DATE_TRUNC('hour', t.created_at)
-                )
-                GROUP BY tt.topic_id, DATE_TRUNC('hour', t.created_at)
-            ),
-            keywords AS (
-                -- Extract top keywords for this hour
-                SELECT
-                    tt.topic_id,
-                    DATE_TRUNC('hour', t.created_at) as hour_bucket,
-                    ARRAY_AGG(DISTINCT word ORDER BY word) FILTER (WHERE word IS NOT NULL) as top_words
-                FROM tweet_topics tt
-                JOIN tweets_deduplicated t ON tt.tweet_id = t.tweet_id
-                CROSS JOIN LATERAL (
-                    SELECT unnest(string_to_array(
-                        regexp_replace(
-                            lower(t.text),
-                            '[^a-z0-9#@\\s]', '', 'g'
-                        ), ' '
-                    )) as word
-                ) words
-                WHERE tt.topic_id != -1
-                AND t.created_at >= %s
-                AND t.created_at < %s
-                AND length(word) > 3
-                AND word NOT IN ('http', 'https', 'that', 'this', 'with', 'from', 'have', 'will', 'been', 'they', 'their', 'what', 'when', 'where')
-                GROUP BY tt.topic_id, DATE_TRUNC('hour', t.created_at)
-            ),
-            previous_hour AS (
-                -- Get previous hour's tweet count for growth calculation
-                SELECT
-                    topic_id,
-                    date + interval '1 hour' as next_hour,
-                    tweet_count as prev_count
-                FROM topic_evolution
-                WHERE date >= %s - interval '1 hour'
-                AND date < %s
-            )
-            SELECT
-                hs.topic_id,
-                hs.hour_bucket as date,
-                hs.hour,
-                hs.tweet_count,
-                hs.unique_authors,
-                COALESCE(na.new_author_count, 0) as new_authors,
-                hs.avg_probability,
-                CASE
-                    WHEN array_length(k.top_words, 1) > 0
-                    THEN jsonb_build_object('keywords', k.top_words[:10])
-                    ELSE '{}'::jsonb
-                END as top_keywords,
-                hs.total_engagement,
-                hs.viral_tweets,
+        with self.conn.cursor() as cur:
+            cur.execute(query, (boundaries,))
+            print(f"Growth rate fix-up: {cur.rowcount} midnight records")
+        self.conn.commit()
+
+    def verify_range(self, start_date: datetime, end_date: datetime) -> Dict[str, int]:
+        """
+        Compare stored rows for a range with what a single serial pass produces:
+        recomputes every hour in one query (no writes) and checks growth_rate
+        against the stored previous hour
+        """
+        start_date = start_date.replace(hour=0, minute=0, second=0, microsecond=0)
+        expected_query = EVOLUTION_QUERY.format(scope=SCOPE_BY_RANGE)
+
+        query = f"""
+        WITH expected AS ({expected_query}),
+        stored AS (
+            SELECT te.*,
                 CASE
-                    WHEN ph.prev_count > 0
-                    THEN (hs.tweet_count - ph.prev_count)::float / ph.prev_count
+                    WHEN prev.tweet_count > 0
+                    THEN (te.tweet_count - prev.tweet_count)::float / prev.tweet_count
                     ELSE 0
-                END as growth_rate
-            FROM hourly_stats hs
-            LEFT JOIN new_authors na ON hs.topic_id = na.topic_id AND hs.hour_bucket = na.hour_bucket
-            LEFT JOIN keywords k ON hs.topic_id = k.topic_id AND hs.hour_bucket = k.hour_bucket
-            LEFT JOIN previous_hour ph ON hs.topic_id = ph.topic_id AND hs.hour_bucket = ph.next_hour
-            """
-
-            with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
-                cur.execute(query, (
-                    current_date, batch_end,
-                    current_date, batch_end,
-                    current_date, batch_end,
-                    current_date, batch_end
-                ))
-
-                results = cur.fetchall()
-
-                if results:
-                    # Insert into topic_evolution
-                    insert_query = """
-                    INSERT INTO topic_evolution (
-                        topic_id, date, hour, tweet_count, unique_authors,
-                        new_authors, avg_probability, top_keywords,
-                        total_engagement, viral_tweets, growth_rate
-                    ) VALUES %s
-                    ON CONFLICT (topic_id, date, hour) DO UPDATE SET
-                        tweet_count = EXCLUDED.tweet_count,
-                        unique_authors = EXCLUDED.unique_authors,
-                        new_authors = EXCLUDED.new_authors,
-                        avg_probability = EXCLUDED.avg_probability,
-                        top_keywords = EXCLUDED.top_keywords,
-                        total_engagement = EXCLUDED.total_engagement,
-                        viral_tweets = EXCLUDED.viral_tweets,
-                        growth_rate = EXCLUDED.growth_rate
-                    """
-
-                    values = [
-                        (
-                            r['topic_id'],
-                            r['date'],
-                            r['hour'],
-                            r['tweet_count'],
-                            r['unique_authors'],
-                            r['new_authors'],
-                            r['avg_probability'],
-                            json.dumps(r['top_keywords']),
-                            r['total_engagement'],
-                            r['viral_tweets'],
-                            r['growth_rate']
-                        )
-                        for r in results
-                    ]
-
-                    execute_values(cur, insert_query, values)
-                    self.conn.commit()
-                    print(f"  Inserted {len(results)} hourly records")
-
-            current_date = batch_end
+                END as expected_growth
+            FROM topic_evolution te
+            LEFT JOIN topic_evolution prev
+                ON prev.topic_id = te.topic_id
+                AND prev.date = te.date - interval '1 hour'
+            WHERE te.date >= %s AND te.date < %s
+        )
+        SELECT
+            COUNT(*) FILTER (WHERE s.topic_id IS NULL) as missing,
+            COUNT(*) FILTER (WHERE e.topic_id IS NULL) as unexpected,
+            COUNT(*) FILTER (WHERE e.topic_id IS NOT NULL AND s.topic_id IS NOT NULL AND (
+                e.tweet_count != s.tweet_count
+                OR e.unique_authors != s.unique_authors
+                OR e.new_authors != s.new_authors
+                OR e.total_engagement IS DISTINCT FROM s.total_engagement
+                OR e.viral_tweets != s.viral_tweets
+            )) as mismatched,
+            COUNT(*) FILTER (WHERE s.topic_id IS NOT NULL
+                AND abs(COALESCE(s.growth_rate, 0) - s.expected_growth) > 1e-9) as bad_growth
+        FROM expected e
+        FULL JOIN stored s ON s.topic_id = e.topic_id AND s.date = e.date
+        """
+
+        with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(query, (start_date, end_date, start_date, end_date))
+            check = dict(cur.fetchone())
+
+        check['keyword_mismatched'] = self.verify_keywords(start_date, end_date)
+        return check
+
+    def verify_keywords(self, start_date: datetime, end_date: datetime) -> int:
+        """Count stored top_keywords that differ from a recomputation in VERIFY_KEYWORD_DAYS chunks"""
+        mismatched = 0
+        chunk_start = start_date
+        while chunk_start < end_date:
+            chunk_end = min(chunk_start + timedelta(days=VERIFY_KEYWORD_DAYS), end_date)
+            expected = self._extract_keywords(SCOPE_BY_RANGE, (chunk_start, chunk_end))
+
+            with self.conn.cursor() as cur:
+                cur.execute("""
+                    SELECT topic_id, date, top_keywords
+                    FROM topic_evolution
+                    WHERE date >= %s AND date < %s
+                """, (chunk_start, chunk_end))
+                for topic_id, hour_bucket, stored in cur.fetchall():
+                    if (stored or {}) != expected.get((topic_id, hour_bucket), {}):
+                        mismatched += 1
+
+            chunk_start = chunk_end
+        return mismatched
+
+    def compute_buckets(self, buckets: List[Tuple[int, datetime]], batch_size: int = 500):
+        """Recompute only the given (topic_id, hour) buckets"""
+
+        print(f"Recomputing {len(buckets)} topic-hour buckets")
+
+        for i in range(0, len(buckets), batch_size):
+            batch = buckets[i:i + batch_size]
+            topic_ids = [b[0] for b in batch]
+            hours = [b[1] for b in batch]
+            written = self._compute_and_store(SCOPE_BY_BUCKETS, (topic_ids, hours))
+            print(f"  {batch[0][1]} .. {batch[-1][1]}: {len(written)} hourly records")
 
     def create_indexes(self):
         """Create necessary indexes for performance"""
@@ -287,61 +682,84 @@ def main():
     parser.add_argument('--days', type=int, default=30,
                        help='Number of days to process (default: 30)')
     parser.add_argument('--incremental', action='store_true',
-                       help='Only process new data since last run')
+                       help='Only recompute topic-hours touched since the last incremental run')
     parser.add_argument('--from-date', type=str,
                        help='Start date (YYYY-MM-DD)')
     parser.add_argument('--to-date', type=str,
                        help='End date (YYYY-MM-DD)')
+    parser.add_argument('--rebuild-first-seen', action='store_true',
+                       help='Rebuild topic_author_first_seen from full history before computing')
+    parser.add_argument('--workers', type=int, default=1,
+                       help='Compute day partitions in parallel on N processes (default: 1)')
+    parser.add_argument('--keyword-method', choices=['frequency', 'tfidf'], default='frequency',
+                       help='Rank top_keywords by raw frequency or TF-IDF against the topic (default: frequency)')
+    parser.add_argument('--tfidf-baseline-days', type=int, default=7,
+                       help='TF-IDF baseline: the topic\'s tweets over this many days up to the hour\'s day (default: 7)')
+    parser.add_argument('--top-k', type=int, default=10,
+                       help='Keywords kept per topic-hour (default: 10)')
+    parser.add_argument('--stopwords-file', type=str,
+                       help='Extra stopwords, one per line')
+    parser.add_argument('--verify', action='store_true',
+                       help='After a date-range run, check stored rows against a serial recomputation')
 
     args = parser.parse_args()
 
-    computer = TopicEvolutionComputer()
+    keyword_extractor = KeywordExtractor(
+        method=args.keyword_method,
+        top_k=args.top_k,
+        stopwords=load_stopwords(args.stopwords_file),
+        baseline_days=args.tfidf_baseline_days
+    )
+    computer = TopicEvolutionComputer(keyword_extractor=keyword_extractor)
 
     try:
         # First ensure we have the proper structure
-        create_table = """
-        ALTER TABLE topic_evolution
-        ADD COLUMN IF NOT EXISTS id SERIAL PRIMARY KEY;
+        computer.ensure_schema()
+        computer.seed_first_seen(force=args.rebuild_first_seen)
+
+        if args.incremental:
+            # Capture the high-water mark before reading so rows landing mid-run are picked up next time
+            high_water = computer.get_source_high_water()
+            watermark = computer.get_watermark()
+
+            if watermark:
+                buckets = computer.find_dirty_buckets(watermark, high_water)
+                print(f"Incremental run since {watermark[0]} / {watermark[1]}: {len(buckets)} buckets touched")
+                computer.compute_buckets(buckets)
+            else:
+                print(f"No watermark found, processing last {args.days} days")
+                _, end_date = computer.get_date_range()
+                if end_date:
+                    computer.compute_hourly_evolution(end_date - timedelta(days=args.days), end_date)
 
-        -- Add unique constraint if not exists
-        DO $$
-        BEGIN
-            IF NOT EXISTS (
-                SELECT 1 FROM pg_constraint
-                WHERE conname = 'topic_evolution_unique'
-            ) THEN
-                ALTER TABLE topic_evolution
-                ADD CONSTRAINT topic_evolution_unique
-                UNIQUE (topic_id, date, hour);
-            END IF;
-        END $$;
-        """
+            computer.set_watermark(*high_water)
+        else:
+            # Determine date range
+            if args.from_date and args.to_date:
+                start_date = datetime.strptime(args.from_date, '%Y-%m-%d')
+                end_date = datetime.strptime(args.to_date, '%Y-%m-%d')
+            else:
+                min_date, max_date = computer.get_date_range()
+                end_date = max_date
+                start_date = max(min_date, end_date - timedelta(days=args.days))
 
-        with computer.conn.cursor() as cur:
-            cur.execute(create_table)
-        computer.conn.commit()
-
-        # Determine date range
-        if args.from_date and args.to_date:
-            start_date = datetime.strptime(args.from_date, '%Y-%m-%d')
-            end_date = datetime.strptime(args.to_date, '%Y-%m-%d')
-        elif args.incremental:
-            last_processed = computer.get_last_processed_date()
-            if last_processed:
-                start_date = last_processed
-                print(f"Continuing from {start_date}")
+            # Compute evolution
+            if args.workers > 1:
+                computer.compute_hourly_evolution_parallel(start_date, end_date, args.workers)
             else:
-                print("No previous data found, processing last 30 days")
-                end_date = datetime.now()
-                start_date = end_date - timedelta(days=30)
-            _, end_date = computer.get_date_range()
-        else:
-            min_date, max_date = computer.get_date_range()
-            end_date = max_date
-            start_date = max(min_date, end_date - timedelta(days=args.days))
+                computer.compute_hourly_evolution(start_date, end_date)
+
+            if args.verify:
+                check = computer.verify_range(start_date, end_date)
+                print(f"Verification: {check['missing']} missing, {check['unexpected']} unexpected, "
+                      f"{check['mismatched']} mismatched, {check['bad_growth']} bad growth_rate, "
+                      f"{check['keyword_mismatched']} mismatched top_keywords")
+                if any(check.values()):
+                    sys.exit(1)
 
-        # Compute evolution
-        computer.compute_hourly_evolution(start_date, end_date)
+        if computer.loader.rows_loaded:
+            print(f"Wrote {computer.loader.rows_loaded:,} rows "
+                  f"({computer.loader.rows_per_second:,.0f} rows/s)")
 
         # Create indexes
         computer.create_indexes()
@@ -363,4 +781,4 @@ def main():
         computer.close()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Maintain the theme_topic_daily aggregate
+Per-day tweet counts and unique-author sketches for each (theme, topic),
+recomputed only for days touched by new tweet_topics / tweet_collections rows
+"""
+
+import psycopg2
+from psycopg2.extras import RealDictCursor
+from datetime import datetime, timedelta, date
+import sys
+import argparse
+from typing import List, Optional, Tuple
+import os
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv('../../.env')
+
+DATABASE_CONFIG = {
+    "host": os.getenv("POSTGRES_HOST", "localhost"),
+    "port": int(os.getenv("POSTGRES_PORT", 5432)),
+    "database": os.getenv("POSTGRES_DATABASE", "neuron"),
+    "user": os.getenv("POSTGRES_USER", "tabreaz"),
+    "password": os.getenv("POSTGRES_PASSWORD", "admin"),
+    "schema": os.getenv("POSTGRES_SCHEMA", "osint")
+}
+
+JOB_NAME = 'theme_topic_daily'
+SQL_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sql', 'create_theme_topic_daily.sql')
+
+
+class ThemeTopicAggregator:
+    def __init__(self):
+        self.conn = None
+        self.connect()
+
+    def connect(self):
+        """Establish database connection"""
+        try:
+            self.conn = psycopg2.connect(
+                host=DATABASE_CONFIG["host"],
+                port=DATABASE_CONFIG["port"],
+                database=DATABASE_CONFIG["database"],
+                user=DATABASE_CONFIG["user"],
+                password=DATABASE_CONFIG["password"]
+            )
+            with self.conn.cursor() as cur:
+                cur.execute(f"SET search_path TO {DATABASE_CONFIG['schema']}, public")
+            self.conn.commit()
+            print(f"Connected to database: {DATABASE_CONFIG['database']}")
+        except Exception as e:
+            print(f"Database connection failed: {e}")
+            raise
+
+    def ensure_schema(self):
+        """Create aggregate and watermark tables if missing"""
+        with open(SQL_FILE) as f:
+            ddl = f.read()
+
+        with self.conn.cursor() as cur:
+            cur.execute(ddl)
+        self.conn.commit()
+
+    def get_watermark(self) -> Tuple[Optional[datetime], Optional[datetime]]:
+        """Last processed (tweet_topics.created_at, tweet_collections.last_collected_at)"""
+        query = """
+        SELECT last_tweet_topic_at, last_collected_at
+        FROM compute_watermarks
+        WHERE job_name = %s
+        """
+
+        with self.conn.cursor() as cur:
+            cur.execute(query, (JOB_NAME,))
+            result = cur.fetchone()
+            return (result[0], result[1]) if result else (None, None)
+
+    def get_source_high_water(self) -> Tuple[Optional[datetime], Optional[datetime]]:
+        """Newest source timestamps right now; rows after these wait for the next run"""
+        query = """
+        SELECT
+            (SELECT MAX(created_at) FROM tweet_topics),
+            (SELECT MAX(last_collected_at) FROM tweet_collections)
+        """
+
+        with self.conn.cursor() as cur:
+            cur.execute(query)
+            return cur.fetchone()
+
+    def set_watermark(self, tweet_topic_at: Optional[datetime], collected_at: Optional[datetime]):
+        """Record the source timestamps covered by this run"""
+        query = """
+        INSERT INTO compute_watermarks (job_name, last_tweet_topic_at, last_collected_at, updated_at)
+        VALUES (%s, %s, %s, NOW())
+        ON CONFLICT (job_name) DO UPDATE SET
+            last_tweet_topic_at = EXCLUDED.last_tweet_topic_at,
+            last_collected_at = EXCLUDED.last_collected_at,
+            updated_at = NOW()
+        """
+
+        with self.conn.cursor() as cur:
+            cur.execute(query, (JOB_NAME, tweet_topic_at, collected_at))
+        self.conn.commit()
+
+    def find_dirty_days(self, since: Tuple[Optional[datetime], Optional[datetime]],
+                        until: Tuple[Optional[datetime], Optional[datetime]]) -> List[date]:
+        """Days (UTC, by tweet created_at) with topic assignments or collections added since the watermark"""
+        query = """
+        SELECT DISTINCT (t.created_at AT TIME ZONE 'UTC')::date AS day
+        FROM tweet_topics tt
+        JOIN tweets_deduplicated t ON t.tweet_id = tt.tweet_id
+        WHERE tt.created_at > %s AND tt.created_at <= %s
+        UNION
+        SELECT DISTINCT (t.created_at AT TIME ZONE 'UTC')::date AS day
+        FROM tweet_collections tc
+        JOIN tweets_deduplicated t ON t.tweet_id = tc.tweet_id
+        WHERE tc.last_collected_at > %s AND tc.last_collected_at <= %s
+        ORDER BY day
+        """
+
+        epoch = datetime(1970, 1, 1)
+        with self.conn.cursor() as cur:
+            cur.execute(query, (
+                since[0] or epoch, until[0] or epoch,
+                since[1] or epoch, until[1] or epoch
+            ))
+            return [row[0] for row in cur.fetchall() if row[0] is not None]
+
+    def recompute_day(self, day: date) -> int:
+        """Replace all aggregate rows for one day"""
+        day_start = datetime.combine(day, datetime.min.time())
+        day_end = day_start + timedelta(days=1)
+
+        delete_query = "DELETE FROM theme_topic_daily WHERE date = %s"
+
+        insert_query = """
+        WITH day_tweets AS (
+            SELECT t.tweet_id, t.author_id
+            FROM tweets_deduplicated t
+            WHERE t.created_at >= %s AT TIME ZONE 'UTC'
+            AND t.created_at < %s AT TIME ZONE 'UTC'
+        ),
+        theme_tweets AS (
+            -- A tweet can be collected for the same theme by several projects
+            SELECT DISTINCT ON (tc.tweet_id, tc.theme_code)
+                tc.tweet_id, tc.theme_code, tc.theme_name
+            FROM tweet_collections tc
+            JOIN day_tweets d ON d.tweet_id = tc.tweet_id
+        )
+        INSERT INTO theme_topic_daily (
+            date, theme_code, theme_name, topic_id,
+            tweet_count, probability_sum, authors, computed_at
+        )
+        SELECT
+            %s::date,
+            th.theme_code,
+            MAX(th.theme_name),
+            tt.topic_id,
+            COUNT(*),
+            COALESCE(SUM(tt.probability), 0),
+            COALESCE(hll_add_agg(hll_hash_text(d.author_id)), hll_empty()),
+            NOW()
+        FROM day_tweets d
+        JOIN theme_tweets th ON th.tweet_id = d.tweet_id
+        JOIN tweet_topics tt ON tt.tweet_id = d.tweet_id
+        WHERE tt.topic_id != -1
+        GROUP BY th.theme_code, tt.topic_id
+        """
+
+        with self.conn.cursor() as cur:
+            cur.execute(delete_query, (day,))
+            cur.execute(insert_query, (day_start, day_end, day))
+            inserted = cur.rowcount
+        self.conn.commit()
+        return inserted
+
+    def recompute_days(self, days: List[date]):
+        """Recompute a list of days, one transaction per day"""
+        for day in days:
+            inserted = self.recompute_day(day)
+            print(f"  {day}: {inserted} theme-topic rows")
+
+    def get_summary(self):
+        """Get summary of the aggregate table"""
+        query = """
+        SELECT
+            COUNT(*) as total_rows,
+            COUNT(DISTINCT theme_code) as themes,
+            COUNT(DISTINCT topic_id) as topics,
+            MIN(date) as earliest_date,
+            MAX(date) as latest_date,
+            SUM(tweet_count) as total_tweets
+        FROM theme_topic_daily
+        """
+
+        with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(query)
+            return cur.fetchone()
+
+    def close(self):
+        if self.conn:
+            self.conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Maintain theme x topic daily aggregates')
+    parser.add_argument('--from-date', type=str,
+                       help='Rebuild from this date (YYYY-MM-DD) instead of running incrementally')
+    parser.add_argument('--to-date', type=str,
+                       help='Rebuild up to and including this date (YYYY-MM-DD, default: today)')
+
+    args = parser.parse_args()
+
+    aggregator = ThemeTopicAggregator()
+
+    try:
+        aggregator.ensure_schema()
+
+        # Capture the high-water mark before reading so rows landing mid-run are picked up next time
+        high_water = aggregator.get_source_high_water()
+
+        if args.from_date:
+            start = datetime.strptime(args.from_date, '%Y-%m-%d').date()
+            end = datetime.strptime(args.to_date, '%Y-%m-%d').date() if args.to_date else date.today()
+            days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+            print(f"Rebuilding {len(days)} days from {start} to {end}")
+            aggregator.recompute_days(days)
+        else:
+            watermark = aggregator.get_watermark()
+            days = aggregator.find_dirty_days(watermark, high_water)
+            print(f"Incremental run since {watermark[0]} / {watermark[1]}: {len(days)} days touched")
+            aggregator.recompute_days(days)
+            # Only an incremental run covers everything up to the high-water mark
+            aggregator.set_watermark(*high_water)
+
+        summary = aggregator.get_summary()
+        print("\n=== Theme Topic Daily Summary ===")
+        print(f"Rows: {summary['total_rows']}")
+        print(f"Themes: {summary['themes']}, Topics: {summary['topics']}")
+        print(f"Date range: {summary['earliest_date']} to {summary['latest_date']}")
+        print(f"Total tweets: {summary['total_tweets']}")
+
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    finally:
+        aggregator.close()
+
+
+if __name__ == "__main__":
+    main()
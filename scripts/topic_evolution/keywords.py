@@ -0,0 +1,137 @@
+"""
+Keyword extraction for topic_evolution.top_keywords
+
+Tweet text is streamed from a server-side cursor and tokenized in Python,
+term counts are kept per (topic_id, hour) bucket, and the top-k terms are
+picked by raw frequency or by TF-IDF against the topic's own baseline
+(terms common to every hour of a topic score low, bursts score high).
+
+The TF-IDF baseline of a bucket is every tweet of its topic in the
+`baseline_days` calendar days ending with the bucket's day. It is streamed
+separately from the rows being computed, so a bucket gets the same
+keywords from a day run, a worker partition or an incremental batch.
+"""
+
+import math
+import re
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+URL_RE = re.compile(r"https?://\S+|www\.\S+", re.IGNORECASE)
+TOKEN_RE = re.compile(r"[#@]?\w+", re.UNICODE)
+
+DEFAULT_STOPWORDS = {
+    # English
+    'http', 'https', 'that', 'this', 'with', 'from', 'have', 'will', 'been', 'they',
+    'their', 'what', 'when', 'where', 'which', 'there', 'about', 'would', 'could',
+    'should', 'into', 'than', 'then', 'them', 'were', 'your', 'more', 'just', 'also',
+    'only', 'over', 'some', 'very', 'after', 'before', 'because', 'being', 'other',
+    'these', 'those', 'while', 'here', 'said', 'says', 'like', 'does', 'done',
+    # Arabic
+    'على', 'إلى', 'الى', 'التي', 'الذي', 'الذين', 'هذا', 'هذه', 'ذلك', 'تلك',
+    'كان', 'كانت', 'بعد', 'قبل', 'عند', 'حتى', 'لكن', 'ولكن', 'فيها', 'منها',
+    'عليه', 'عليها', 'انه', 'أنه', 'إنه', 'لقد', 'كما', 'وهو', 'وهي', 'بين'
+}
+
+Bucket = Tuple[int, datetime]
+
+
+def load_stopwords(path: Optional[str] = None) -> Set[str]:
+    """Default stopwords, extended with one word per line from `path` if given"""
+    stopwords = set(DEFAULT_STOPWORDS)
+    if path:
+        with open(path, encoding='utf-8') as f:
+            stopwords.update(line.strip().lower() for line in f if line.strip())
+    return stopwords
+
+
+class KeywordExtractor:
+    def __init__(self, method: str = 'frequency', top_k: int = 10,
+                 min_length: int = 4, stopwords: Optional[Set[str]] = None,
+                 baseline_days: int = 7):
+        if method not in ('frequency', 'tfidf'):
+            raise ValueError(f"Unknown keyword method: {method}")
+        if baseline_days < 1:
+            raise ValueError(f"baseline_days must be at least 1: {baseline_days}")
+        self.method = method
+        self.top_k = top_k
+        self.baseline_days = baseline_days
+        self.min_length = min_length
+        self.stopwords = stopwords if stopwords is not None else set(DEFAULT_STOPWORDS)
+
+    def tokenize(self, text: str) -> List[str]:
+        """Lower-cased words, #hashtags and @mentions, without URLs, short words or stopwords"""
+        text = URL_RE.sub(' ', text.lower())
+        return [
+            token for token in TOKEN_RE.findall(text)
+            if len(token) >= self.min_length
+            and token not in self.stopwords
+            and not token.isdigit()
+        ]
+
+    @property
+    def needs_baseline(self) -> bool:
+        return self.method == 'tfidf'
+
+    def extract(self, rows: Iterable[Tuple[int, datetime, Optional[str]]],
+                baseline_rows: Optional[Iterable[Tuple[int, datetime, Optional[str]]]] = None
+                ) -> Dict[Bucket, Dict]:
+        """
+        Consume (topic_id, hour_bucket, text) rows and return
+        {(topic_id, hour_bucket): {'keywords': [...]}} ready for top_keywords.
+        TF-IDF also needs `baseline_rows`: (topic_id, day, text) for every tweet
+        of the scoped topics from `baseline_days` - 1 days before the first
+        scoped day through the last one.
+        """
+        if self.needs_baseline and baseline_rows is None:
+            raise ValueError("TF-IDF keywords need baseline rows")
+
+        bucket_counts: Dict[Bucket, Counter] = defaultdict(Counter)
+        for topic_id, hour_bucket, text in rows:
+            if not text:
+                continue
+            tokens = self.tokenize(text)
+            if tokens:
+                bucket_counts[(topic_id, hour_bucket)].update(tokens)
+
+        # Baseline per (topic, day): in how many tweets each term appears, and how many tweets
+        day_doc_freq: Dict[Tuple[int, date], Counter] = defaultdict(Counter)
+        day_docs: Counter = Counter()
+        if self.needs_baseline:
+            for topic_id, day, text in baseline_rows:
+                if not text:
+                    continue
+                tokens = self.tokenize(text)
+                if not tokens:
+                    continue
+                key = (topic_id, day.date() if isinstance(day, datetime) else day)
+                day_doc_freq[key].update(set(tokens))
+                day_docs[key] += 1
+
+        return {
+            bucket: {'keywords': self._top_terms(bucket, counts, day_doc_freq, day_docs)}
+            for bucket, counts in bucket_counts.items()
+        }
+
+    def _top_terms(self, bucket: Bucket, counts: Counter,
+                   day_doc_freq: Dict[Tuple[int, date], Counter], day_docs: Counter) -> List[str]:
+        if self.method == 'frequency':
+            # Ties broken alphabetically so reruns produce identical rows
+            ranked = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+        else:
+            topic_id, hour_bucket = bucket
+            last_day = hour_bucket.date()
+            window = [
+                (topic_id, last_day - timedelta(days=offset))
+                for offset in range(self.baseline_days)
+            ]
+            docs = sum(day_docs[key] for key in window)
+            doc_freq = [day_doc_freq[key] for key in window if key in day_doc_freq]
+            scored = []
+            for term, count in counts.items():
+                term_docs = sum(freq[term] for freq in doc_freq)
+                scored.append((term, count * (math.log((1 + docs) / (1 + term_docs)) + 1)))
+            ranked = sorted(scored, key=lambda item: (-item[1], item[0]))
+
+        return [term for term, _ in ranked[:self.top_k]]
@@ -0,0 +1,51 @@
+-- Theme x Topic Daily Aggregate
+-- Precomputed per-day counts behind /topic-analytics/topics-per-theme.
+-- Maintained incrementally by compute_theme_topics.py; date-range queries
+-- sum day rows and merge the unique-author HyperLogLog sketches.
+
+-- postgres-hll: https://github.com/citusdata/postgresql-hll
+CREATE EXTENSION IF NOT EXISTS hll SCHEMA public;
+
+-- ================================================================
+-- DAILY AGGREGATE TABLE
+-- ================================================================
+
+CREATE TABLE IF NOT EXISTS osint.theme_topic_daily (
+    date DATE NOT NULL,
+    theme_code VARCHAR(100) NOT NULL,
+    theme_name VARCHAR(255),
+    topic_id INTEGER NOT NULL,
+
+    -- Additive counts (sum across days)
+    tweet_count INTEGER NOT NULL DEFAULT 0,
+    probability_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+
+    -- Unique authors sketch (merge across days with hll_union_agg)
+    authors hll NOT NULL DEFAULT hll_empty(),
+
+    computed_at TIMESTAMPTZ DEFAULT NOW(),
+
+    PRIMARY KEY (date, theme_code, topic_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_theme_topic_daily_theme
+ON osint.theme_topic_daily (theme_code, date);
+
+-- ================================================================
+-- INCREMENTAL PROCESSING STATE
+-- One row per compute job: the newest source timestamps already processed
+-- ================================================================
+
+CREATE TABLE IF NOT EXISTS osint.compute_watermarks (
+    job_name VARCHAR(100) PRIMARY KEY,
+    last_tweet_topic_at TIMESTAMP,
+    last_collected_at TIMESTAMPTZ,
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- Source indexes used to find days touched since the watermark
+CREATE INDEX IF NOT EXISTS idx_tweet_topics_created_at
+ON osint.tweet_topics (created_at);
+
+CREATE INDEX IF NOT EXISTS idx_tweet_collections_last_collected
+ON osint.tweet_collections (last_collected_at);
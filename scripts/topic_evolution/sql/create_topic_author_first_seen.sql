@@ -0,0 +1,23 @@
+-- Topic Author First Seen
+-- When each author first posted about each topic. Maintained by
+-- compute_evolution.py (upserted for every batch it processes, seeded from
+-- full history on first use). Counting new authors for an hour becomes a
+-- range lookup here instead of a NOT EXISTS scan over all earlier tweets.
+
+CREATE TABLE IF NOT EXISTS osint.topic_author_first_seen (
+    topic_id INTEGER NOT NULL,
+    author_id VARCHAR(50) NOT NULL,
+    first_seen TIMESTAMPTZ NOT NULL,
+    first_tweet_id VARCHAR(50),
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+
+    PRIMARY KEY (topic_id, author_id)
+);
+
+-- new_authors per (topic, hour) and "authors new to topic X since ..." lookups
+CREATE INDEX IF NOT EXISTS idx_topic_author_first_seen_topic_time
+ON osint.topic_author_first_seen (topic_id, first_seen);
+
+-- All topics an author has entered, in order
+CREATE INDEX IF NOT EXISTS idx_topic_author_first_seen_author
+ON osint.topic_author_first_seen (author_id, first_seen);
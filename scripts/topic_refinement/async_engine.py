@@ -0,0 +1,241 @@
+"""
+Concurrent LLM refinement engine
+
+Keeps up to N chat completions in flight with AsyncOpenAI, paced by token
+buckets for requests/min and tokens/min, retrying 429/5xx/connection errors
+with jittered exponential backoff. MAX_COST_PER_RUN is enforced by reserving
+each request's worst-case cost before it is sent, so concurrent calls can
+never overshoot the budget together.
+
+Prompts, response parsing and the response cache are shared with the
+synchronous TopicAnalyzer.
+Set OPENAI_BASE_URL to run against a local OpenAI-compatible server.
+"""
+import asyncio
+import random
+import time
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+import openai
+from openai import AsyncOpenAI
+
+from config import (
+    OPENAI_API_KEY, OPENAI_BASE_URL, MAX_COST_PER_RUN,
+    MAX_CONCURRENT_REQUESTS, REQUESTS_PER_MINUTE, TOKENS_PER_MINUTE, MAX_RETRIES
+)
+from llm_analyzer import TopicAnalyzer, TruncatedResponse
+
+
+class BudgetExceeded(Exception):
+    """Raised when a request would take the run over MAX_COST_PER_RUN"""
+
+
+class TokenBucket:
+    """Refills `rate_per_minute` units per minute up to one minute's worth"""
+
+    def __init__(self, rate_per_minute: float):
+        self.capacity = float(rate_per_minute)
+        self.tokens = self.capacity
+        self.rate = rate_per_minute / 60.0
+        self.updated_at = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self, amount: float = 1.0):
+        """Wait until `amount` units are available and take them"""
+        # A single request larger than the bucket would wait forever; let it drain the bucket
+        amount = min(amount, self.capacity)
+        async with self.lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+
+class CostBudget:
+    """Run-wide spend limit shared by concurrent requests"""
+
+    def __init__(self, max_cost: float, spent: float = 0.0):
+        self.max_cost = max_cost
+        self.spent = spent
+        self.reserved = 0.0
+        self.lock = asyncio.Lock()
+
+    async def reserve(self, amount: float):
+        async with self.lock:
+            if self.spent + self.reserved + amount > self.max_cost:
+                raise BudgetExceeded(
+                    f"${self.spent + self.reserved:.2f} committed, "
+                    f"next request could cost ${amount:.4f} (limit ${self.max_cost})"
+                )
+            self.reserved += amount
+
+    async def settle(self, reserved: float, actual: float):
+        """Replace a reservation with the actual cost (0 if the request failed)"""
+        async with self.lock:
+            self.reserved -= reserved
+            self.spent += actual
+
+
+class AsyncRefinementEngine:
+    def __init__(self, analyzer: TopicAnalyzer,
+                 concurrency: int = MAX_CONCURRENT_REQUESTS,
+                 requests_per_minute: int = REQUESTS_PER_MINUTE,
+                 tokens_per_minute: int = TOKENS_PER_MINUTE,
+                 max_cost: float = MAX_COST_PER_RUN,
+                 max_retries: int = MAX_RETRIES,
+                 base_url: Optional[str] = OPENAI_BASE_URL):
+        self.analyzer = analyzer
+        # Retries are handled here so they go through the rate limiters
+        self.client = AsyncOpenAI(api_key=OPENAI_API_KEY, base_url=base_url, max_retries=0)
+        self.concurrency = concurrency
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+        self.budget = CostBudget(max_cost, spent=analyzer.total_cost)
+        self.max_retries = max_retries
+        self.retries = 0
+
+    @staticmethod
+    def _estimate_tokens(request: Dict) -> Tuple[int, int]:
+        """Rough (prompt, completion) token upper bound: ~4 characters per token"""
+        prompt_chars = sum(len(m['content']) for m in request['messages'])
+        return prompt_chars // 4 + 1, request.get('max_tokens', 1000)
+
+    @staticmethod
+    def _retry_delay(attempt: int, error: Exception) -> float:
+        """Server-provided Retry-After if any, else full-jitter exponential backoff"""
+        response = getattr(error, 'response', None)
+        if response is not None:
+            retry_after = response.headers.get('retry-after')
+            if retry_after:
+                try:
+                    return float(retry_after) + random.uniform(0, 1)
+                except ValueError:
+                    pass
+        return random.uniform(0, min(60.0, 2 ** attempt))
+
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        if isinstance(error, (openai.RateLimitError, openai.APIConnectionError)):
+            return True
+        return isinstance(error, openai.APIStatusError) and error.status_code >= 500
+
+    async def _complete(self, request: Dict):
+        """One chat completion under the rate limits and budget, with retries"""
+        prompt_tokens, completion_tokens = self._estimate_tokens(request)
+        worst_case = TopicAnalyzer.estimate_cost(prompt_tokens, completion_tokens)
+
+        for attempt in range(self.max_retries + 1):
+            await self.budget.reserve(worst_case)
+            actual = 0.0
+            try:
+                await self.request_bucket.acquire(1)
+                await self.token_bucket.acquire(prompt_tokens + completion_tokens)
+                response = await self.client.chat.completions.create(**request)
+                actual = TopicAnalyzer.estimate_cost(
+                    response.usage.prompt_tokens, response.usage.completion_tokens
+                )
+                return response
+            except Exception as e:
+                if attempt >= self.max_retries or not self._is_retryable(e):
+                    raise
+                self.retries += 1
+                delay = self._retry_delay(attempt, e)
+                print(f"    Retry {attempt + 1}/{self.max_retries} in {delay:.1f}s: {e.__class__.__name__}")
+                await asyncio.sleep(delay)
+            finally:
+                await self.budget.settle(worst_case, actual)
+
+    async def _analyze_single(self, topic: Dict, themes: List[Dict]) -> Dict:
+        try:
+            response = await self._complete(self.analyzer.single_request(topic, themes))
+            return self.analyzer.parse_single_response(response, topic)
+        except BudgetExceeded:
+            raise
+        except Exception as e:
+            print(f"Error analyzing topic {topic.get('topic_id')}: {e}")
+            return self.analyzer._get_fallback_response(topic)
+
+    async def _analyze_batch(self, batch: List[Dict], themes: List[Dict]) -> List[Dict]:
+        # SQLite cache reads (which also touch last_used_at) and writes stay off the event loop
+        hits, misses = await asyncio.to_thread(self.analyzer.lookup_cached, batch, themes)
+        if not misses:
+            return hits
+
+        refined_topics = await self._analyze_batch_uncached(misses, themes)
+        await asyncio.to_thread(self.analyzer.cache_results, refined_topics, misses, themes)
+        return hits + refined_topics
+
+    async def _analyze_batch_uncached(self, topics: List[Dict], themes: List[Dict]) -> List[Dict]:
+        """Async counterpart of TopicAnalyzer._analyze_batch_uncached"""
+        if len(topics) == 1:
+            return [await self._analyze_single(topics[0], themes)]
+
+        try:
+            response = await self._complete(self.analyzer.batch_request(topics, themes))
+            refined_topics = self.analyzer.parse_batch_response(response, topics)
+        except BudgetExceeded:
+            raise
+        except TruncatedResponse as e:
+            half = len(topics) // 2
+            print(f"  Unusable output ({e}), splitting into {half} + {len(topics) - half}")
+            first, second = await asyncio.gather(
+                self._analyze_batch_uncached(topics[:half], themes),
+                self._analyze_batch_uncached(topics[half:], themes)
+            )
+            return first + second
+        except Exception as e:
+            print(f"Error in batch analysis: {e}")
+            # Fall back to individual analysis, still concurrent
+            return list(await asyncio.gather(*(self._analyze_single(t, themes) for t in topics)))
+
+        missing = self.analyzer.missing_topics(refined_topics, topics)
+        if missing:
+            print(f"  {len(missing)} topic(s) missing from batch output, retrying them")
+            if len(missing) < len(topics):
+                refined_topics += await self._analyze_batch_uncached(missing, themes)
+            else:
+                refined_topics = list(await asyncio.gather(
+                    *(self._analyze_single(t, themes) for t in missing)
+                ))
+
+        return refined_topics
+
+    async def run(self, batches: List[List[Dict]],
+                  themes: List[Dict]) -> AsyncIterator[Tuple[List[Dict], List[Dict]]]:
+        """
+        Analyze batches with up to `concurrency` in flight, yielding
+        (batch, refined_topics) as each completes. Stops scheduling new
+        batches once the cost budget is exhausted.
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        budget_hit = asyncio.Event()
+
+        async def worker(batch):
+            async with semaphore:
+                if budget_hit.is_set():
+                    return batch, None
+                try:
+                    return batch, await self._analyze_batch(batch, themes)
+                except BudgetExceeded as e:
+                    if not budget_hit.is_set():
+                        print(f"Cost limit reached: {e}. Stopping.")
+                    budget_hit.set()
+                    return batch, None
+
+        tasks = [asyncio.create_task(worker(batch)) for batch in batches]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                batch, refined = await finished
+                if refined is not None:
+                    yield batch, refined
+        finally:
+            for task in tasks:
+                task.cancel()
+            await self.client.close()
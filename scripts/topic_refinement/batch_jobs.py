@@ -0,0 +1,195 @@
+"""
+OpenAI Batch API workflow for offline topic refinement
+
+submit: pack unprocessed topics into chat-completion requests, write them
+as JSONL, upload the file and create a batch job (half price, separate
+rate limits). Each job is recorded in topic_batch_jobs with the topic ids
+behind every custom_id, so topics in an open job are not submitted twice.
+
+collect: poll open jobs, download the output file of finished ones, parse
+each completion with the same code as interactive batches, store the
+analyses in the response cache under the keys recorded at submit, and hand
+the refined topics back for saving. A job is only marked collected after its
+results are saved, so an interrupted collect can simply be re-run. Topics
+whose request failed, was truncated or left them out stay unprocessed and
+are picked up by the next submit.
+"""
+import json
+import os
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from openai import OpenAI
+from openai.types.chat import ChatCompletion
+
+from config import (
+    OPENAI_API_KEY, OPENAI_BASE_URL, BATCH_API_DIR, BATCH_API_MAX_REQUESTS,
+    BATCH_API_COMPLETION_WINDOW, BATCH_API_PRICE_MULTIPLIER, BATCH_API_POLL_SECONDS
+)
+from database import TopicDatabase
+from llm_analyzer import TopicAnalyzer, TruncatedResponse
+
+CHAT_COMPLETIONS_ENDPOINT = "/v1/chat/completions"
+
+# Batch statuses after which the job will not change any more
+TERMINAL_STATUSES = {'completed', 'expired', 'cancelled', 'failed'}
+
+
+class BatchRefiner:
+    def __init__(self, db: TopicDatabase, analyzer: TopicAnalyzer,
+                 base_url: Optional[str] = OPENAI_BASE_URL):
+        self.db = db
+        self.analyzer = analyzer
+        self.analyzer.price_multiplier = BATCH_API_PRICE_MULTIPLIER
+        self.client = OpenAI(api_key=OPENAI_API_KEY, base_url=base_url)
+
+    def submit(self, topics: List[Dict], themes: List[Dict], mode: str,
+               batch_size: int) -> List[str]:
+        """Create batch jobs for `topics`; returns the new batch ids"""
+        pending = self.db.get_pending_batch_topic_ids()
+        topics = [t for t in topics if t['topic_id'] not in pending]
+        if pending:
+            print(f"Skipping topics already in open batch jobs ({len(pending)} pending)")
+        if not topics:
+            print("Nothing to submit")
+            return []
+
+        batches = self.analyzer.pack_batches(topics, themes, max_topics=batch_size)
+        os.makedirs(BATCH_API_DIR, exist_ok=True)
+
+        batch_ids = []
+        for start in range(0, len(batches), BATCH_API_MAX_REQUESTS):
+            chunk = batches[start:start + BATCH_API_MAX_REQUESTS]
+            batch_ids.append(self._submit_file(chunk, themes, mode))
+        return batch_ids
+
+    def _submit_file(self, batches: List[List[Dict]], themes: List[Dict], mode: str) -> str:
+        requests: Dict[str, List[int]] = {}
+        # Keyed on what was sent, so collected analyses are cached as the prompt saw the topic
+        cache_keys: Dict[str, str] = {}
+        path = os.path.join(BATCH_API_DIR, f"refine_{mode}_{time.strftime('%Y%m%d_%H%M%S')}.jsonl")
+
+        with open(path, 'w', encoding='utf-8') as f:
+            for i, batch in enumerate(batches):
+                custom_id = f"req-{i}"
+                requests[custom_id] = [t['topic_id'] for t in batch]
+                cache_keys.update((str(t['topic_id']), self.analyzer.cache_key(t, themes)) for t in batch)
+                f.write(json.dumps({
+                    'custom_id': custom_id,
+                    'method': 'POST',
+                    'url': CHAT_COMPLETIONS_ENDPOINT,
+                    'body': self.analyzer.batch_request(batch, themes)
+                }, default=str) + '\n')
+
+        with open(path, 'rb') as f:
+            input_file = self.client.files.create(file=f, purpose='batch')
+
+        job = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=CHAT_COMPLETIONS_ENDPOINT,
+            completion_window=BATCH_API_COMPLETION_WINDOW,
+            metadata={'job': 'topic_refinement', 'mode': mode}
+        )
+
+        self.db.create_batch_job(job.id, job.status, mode, self.analyzer.model,
+                                 input_file.id, requests, cache_keys)
+
+        topic_count = sum(len(ids) for ids in requests.values())
+        print(f"Submitted batch {job.id}: {len(requests)} requests, {topic_count} topics ({path})")
+        return job.id
+
+    def refresh(self) -> List[Dict]:
+        """Update the status of every open job; returns the refreshed job rows"""
+        jobs = self.db.get_open_batch_jobs()
+        for job in jobs:
+            remote = self.client.batches.retrieve(job['batch_id'])
+            job.update(
+                status=remote.status,
+                output_file_id=remote.output_file_id,
+                error_file_id=remote.error_file_id
+            )
+            self.db.update_batch_job(
+                job['batch_id'],
+                status=remote.status,
+                output_file_id=remote.output_file_id,
+                error_file_id=remote.error_file_id
+            )
+
+            counts = remote.request_counts
+            progress = f"{counts.completed}/{counts.total} done, {counts.failed} failed" if counts else ""
+            print(f"  {job['batch_id']}: {remote.status} {progress}")
+        return jobs
+
+    def collect(self, wait: bool = False,
+                poll_seconds: int = BATCH_API_POLL_SECONDS) -> Iterator[Tuple[Dict, List[Dict], int]]:
+        """
+        Yield (job, refined_topics, failed_topic_count) for every finished
+        job. The caller saves the topics, then calls mark_collected(job, ...).
+        With wait=True, keeps polling until no open jobs remain.
+        """
+        while True:
+            jobs = self.refresh()
+            open_jobs = 0
+
+            for job in jobs:
+                if job['status'] not in TERMINAL_STATUSES:
+                    open_jobs += 1
+                    continue
+
+                refined_topics, failed = self._read_results(job)
+                yield job, refined_topics, failed
+
+            if not wait or open_jobs == 0:
+                return
+            print(f"Waiting {poll_seconds}s for {open_jobs} open batch job(s)...")
+            time.sleep(poll_seconds)
+
+    def _read_results(self, job: Dict) -> Tuple[List[Dict], int]:
+        requests: Dict[str, List[int]] = job['requests']
+        cost_before = self.analyzer.total_cost
+        self.analyzer.model = job['model'] or self.analyzer.model
+        refined_topics = []
+        answered = set()
+
+        if job['output_file_id']:
+            content = self.client.files.content(job['output_file_id']).text
+            for line in content.splitlines():
+                if not line.strip():
+                    continue
+                item = json.loads(line)
+                topic_ids = requests.get(item.get('custom_id'), [])
+                response = item.get('response') or {}
+                if item.get('error') or response.get('status_code') != 200:
+                    continue
+
+                # parse_batch_response only needs topic ids to match results
+                batch = [{'topic_id': tid} for tid in topic_ids]
+                try:
+                    completion = ChatCompletion.model_validate(response['body'])
+                    parsed = self.analyzer.parse_batch_response(completion, batch)
+                except TruncatedResponse as e:
+                    print(f"  {job['batch_id']} {item['custom_id']}: {e}, topics left for the next submit")
+                    continue
+                except Exception as e:
+                    print(f"  {job['batch_id']} {item['custom_id']}: unparseable response: {e}")
+                    continue
+
+                # Jobs submitted before cache_keys was recorded have none
+                self.analyzer.cache_keyed_results(parsed, job.get('cache_keys') or {})
+
+                for refined in parsed:
+                    refined['processing_metadata']['batch_id'] = job['batch_id']
+                    answered.add(refined['topic_id'])
+                refined_topics.extend(parsed)
+
+        job['cost_usd'] = self.analyzer.total_cost - cost_before
+        failed = len(job['topic_ids']) - len(answered)
+        return refined_topics, failed
+
+    def mark_collected(self, job: Dict, refined_count: int, failed_count: int):
+        """Close a job once its results are saved; it will not be read again"""
+        self.db.update_batch_job(
+            job['batch_id'], collected=True,
+            refined_count=refined_count, failed_count=failed_count,
+            cost_usd=round(job.get('cost_usd') or 0, 4)
+        )
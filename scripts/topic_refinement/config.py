@@ -21,16 +21,45 @@ DATABASE_CONFIG = {
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 OPENAI_MODEL = "gpt-4o"  # Latest GPT-4 Optimized model
 OPENAI_MODEL_FALLBACK = "gpt-4o-mini"  # Cheaper fallback for large batches
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL")  # Point at any OpenAI-compatible server (e.g. a local fake)
 
 # Processing Configuration
 BATCH_SIZE = 10  # Number of topics to process in one LLM call
 MIN_TOPIC_SIZE = 100  # Minimum tweets in topic to consider for refinement
 CACHE_DIR = "/Users/tabreaz/code/osint_mcp_v2/data/refined_topics/cache"
 
+# LLM response cache (content-addressed, SQLite)
+RESPONSE_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(CACHE_DIR, "llm_responses.sqlite3"))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", 50000))
+RESPONSE_CACHE_TTL_DAYS = int(os.getenv("LLM_CACHE_TTL_DAYS", 90))  # 0 = never expire
+
+# Embedding match (copy an existing refinement to near-identical new topics)
+EMBEDDING_MODEL = os.getenv("TOPIC_EMBEDDING_MODEL", "text-embedding-3-small")
+EMBEDDING_BATCH_SIZE = 100  # Texts per embeddings request
+TOPIC_MATCH_THRESHOLD = float(os.getenv("TOPIC_MATCH_THRESHOLD", 0.92))  # Cosine similarity
+
+# OpenAI Batch API (submit-batch / collect-batch)
+BATCH_API_DIR = os.path.join(CACHE_DIR, "batch_requests")  # JSONL request files kept for audit
+BATCH_API_MAX_REQUESTS = 50000  # Per batch file (API limit)
+BATCH_API_COMPLETION_WINDOW = "24h"
+BATCH_API_PRICE_MULTIPLIER = 0.5  # Batch requests are billed at half price
+BATCH_API_POLL_SECONDS = int(os.getenv("BATCH_API_POLL_SECONDS", 60))
+
 # Cost Management
 MAX_TOKENS_PER_REQUEST = 4000
+
+# Batch packing: topics per request are bounded by estimated tokens, not a fixed count
+PROMPT_TOKEN_BUDGET = int(os.getenv("LLM_PROMPT_TOKEN_BUDGET", 12000))
+MAX_COMPLETION_TOKENS = int(os.getenv("LLM_MAX_COMPLETION_TOKENS", 16000))  # gpt-4o output limit is 16384
+COMPLETION_TOKENS_PER_TOPIC = 450  # One refined topic JSON object, with headroom
 MAX_COST_PER_RUN = 10.0  # Maximum $ to spend per refinement run
 
+# Concurrency and rate limits (async engine)
+MAX_CONCURRENT_REQUESTS = int(os.getenv("LLM_MAX_CONCURRENT_REQUESTS", 8))
+REQUESTS_PER_MINUTE = int(os.getenv("LLM_REQUESTS_PER_MINUTE", 500))
+TOKENS_PER_MINUTE = int(os.getenv("LLM_TOKENS_PER_MINUTE", 200000))
+MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 5))
+
 # Processing Modes
 PROCESSING_MODES = {
     "full": {
@@ -2,12 +2,25 @@
 Database connection and operations for topic refinement
 """
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, execute_values
 import json
+import os
+import sys
 from typing import List, Dict, Optional
 from datetime import datetime
 from config import DATABASE_CONFIG
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.bulk_loader import BulkLoader
+
+REFINED_COLUMNS = [
+    'topic_id', 'refined_name', 'refined_label', 'category', 'subcategory',
+    'aligned_theme_ids', 'suggested_new_theme', 'alignment_confidence',
+    'clean_keywords', 'entities', 'overall_sentiment', 'stance',
+    'quality_score', 'relevance_to_project', 'noise_level',
+    'llm_model', 'processing_metadata', 'monitoring_priority', 'recommended_actions'
+]
+
 class TopicDatabase:
     def __init__(self):
         self.conn = None
@@ -150,10 +163,8 @@ class TopicDatabase:
             cur.execute(query, (topic_id, limit))
             return cur.fetchall()
 
-    def save_refined_topic(self, refined_data: Dict):
-        """Save LLM-refined topic data"""
-
-        # First, create table if it doesn't exist
+    def _ensure_refined_table(self):
+        """Create topic_definitions_refined if it doesn't exist"""
         create_table_query = """
         CREATE TABLE IF NOT EXISTS topic_definitions_refined (
             topic_id INTEGER PRIMARY KEY REFERENCES topic_definitions(topic_id),
@@ -182,41 +193,26 @@ class TopicDatabase:
         with self.conn.cursor() as cur:
             cur.execute(create_table_query)
 
-            # Insert or update refined topic
-            upsert_query = """
-            INSERT INTO topic_definitions_refined (
-                topic_id, refined_name, refined_label, category, subcategory,
-                aligned_theme_ids, suggested_new_theme, alignment_confidence,
-                clean_keywords, entities, overall_sentiment, stance,
-                quality_score, relevance_to_project, noise_level,
-                llm_model, processing_metadata, monitoring_priority, recommended_actions
-            ) VALUES (
-                %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-            )
-            ON CONFLICT (topic_id)
-            DO UPDATE SET
-                refined_name = EXCLUDED.refined_name,
-                refined_label = EXCLUDED.refined_label,
-                category = EXCLUDED.category,
-                subcategory = EXCLUDED.subcategory,
-                aligned_theme_ids = EXCLUDED.aligned_theme_ids,
-                suggested_new_theme = EXCLUDED.suggested_new_theme,
-                alignment_confidence = EXCLUDED.alignment_confidence,
-                clean_keywords = EXCLUDED.clean_keywords,
-                entities = EXCLUDED.entities,
-                overall_sentiment = EXCLUDED.overall_sentiment,
-                stance = EXCLUDED.stance,
-                quality_score = EXCLUDED.quality_score,
-                relevance_to_project = EXCLUDED.relevance_to_project,
-                noise_level = EXCLUDED.noise_level,
-                llm_model = EXCLUDED.llm_model,
-                processing_metadata = EXCLUDED.processing_metadata,
-                monitoring_priority = EXCLUDED.monitoring_priority,
-                recommended_actions = EXCLUDED.recommended_actions,
-                processed_at = NOW()
-            """
+    def save_refined_topics(self, refined_list: List[Dict], commit: bool = True) -> int:
+        """
+        Save a batch of LLM-refined topics with one COPY + upsert and a single commit
+        (commit=False leaves the transaction open for the caller)
+        """
+        if not refined_list:
+            return 0
+
+        self._ensure_refined_table()
 
-            cur.execute(upsert_query, (
+        # ON CONFLICT can touch a row only once per statement; keep the last result per topic
+        refined_list = list({r['topic_id']: r for r in refined_list}.values())
+
+        loader = BulkLoader(
+            self.conn, 'topic_definitions_refined', REFINED_COLUMNS,
+            conflict_columns=['topic_id'],
+            extra_updates={'processed_at': 'NOW()'}
+        )
+        saved = loader.load(
+            (
                 refined_data['topic_id'],
                 refined_data.get('refined_name'),
                 refined_data.get('refined_label'),
@@ -236,13 +232,178 @@ class TopicDatabase:
                 json.dumps(refined_data.get('processing_metadata', {})),
                 refined_data.get('monitoring_priority'),
                 json.dumps(refined_data.get('recommended_actions', []))
-            ))
+            )
+            for refined_data in refined_list
+        )
+
+        if commit:
+            self.conn.commit()
+        return saved
+
+    def save_refined_topic(self, refined_data: Dict):
+        """Save LLM-refined topic data"""
+        self.save_refined_topics([refined_data])
+
+    def get_refined_match_candidates(self) -> List[Dict]:
+        """
+        LLM-refined topics with the raw keywords/texts used to embed them.
+        Fallbacks and embedding-match copies are excluded, so matches always
+        point at an actual LLM refinement instead of chaining through copies.
+        """
+        query = f"""
+        SELECT
+            {', '.join('tdr.' + c for c in REFINED_COLUMNS)},
+            td.top_words,
+            td.representative_texts[:5] as sample_texts
+        FROM topic_definitions_refined tdr
+        JOIN topic_definitions td ON td.topic_id = tdr.topic_id
+        WHERE tdr.llm_model IS DISTINCT FROM 'fallback'
+          AND tdr.llm_model IS DISTINCT FROM 'embedding_match'
+          AND COALESCE(tdr.processing_metadata->>'method', '') <> 'embedding_match'
+        """
+
+        self._ensure_refined_table()
+        with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(query)
+            return cur.fetchall()
 
+    def _ensure_embeddings_table(self):
+        """Create topic_embeddings if it doesn't exist"""
+        with self.conn.cursor() as cur:
+            cur.execute("""
+            CREATE TABLE IF NOT EXISTS topic_embeddings (
+                topic_id INTEGER PRIMARY KEY REFERENCES topic_definitions(topic_id),
+                embedding_model VARCHAR(100) NOT NULL,
+                text_hash CHAR(64) NOT NULL,
+                embedding REAL[] NOT NULL,
+                created_at TIMESTAMP DEFAULT NOW()
+            )
+            """)
+
+    def get_topic_embeddings(self, topic_ids: List[int], model: str) -> Dict[int, tuple]:
+        """{topic_id: (text_hash, embedding)} for stored embeddings from `model`"""
+        if not topic_ids:
+            return {}
+
+        self._ensure_embeddings_table()
+        with self.conn.cursor() as cur:
+            cur.execute("""
+            SELECT topic_id, text_hash, embedding
+            FROM topic_embeddings
+            WHERE topic_id = ANY(%s) AND embedding_model = %s
+            """, (list(topic_ids), model))
+            return {row[0]: (row[1], row[2]) for row in cur.fetchall()}
+
+    def save_topic_embeddings(self, rows: List[tuple]) -> int:
+        """Upsert (topic_id, embedding_model, text_hash, embedding) rows"""
+        if not rows:
+            return 0
+
+        self._ensure_embeddings_table()
+        loader = BulkLoader(
+            self.conn, 'topic_embeddings',
+            ['topic_id', 'embedding_model', 'text_hash', 'embedding'],
+            conflict_columns=['topic_id'],
+            extra_updates={'created_at': 'NOW()'}
+        )
+        saved = loader.load(rows)
+        self.conn.commit()
+        return saved
+
+    def _ensure_batch_jobs_table(self):
+        """Create topic_batch_jobs (OpenAI Batch API submissions) if it doesn't exist"""
+        with self.conn.cursor() as cur:
+            cur.execute("""
+            CREATE TABLE IF NOT EXISTS topic_batch_jobs (
+                batch_id VARCHAR(100) PRIMARY KEY,
+                status VARCHAR(20) NOT NULL,
+                mode VARCHAR(20),
+                model VARCHAR(50),
+                input_file_id VARCHAR(100),
+                output_file_id VARCHAR(100),
+                error_file_id VARCHAR(100),
+                request_count INTEGER,
+                topic_ids INTEGER[] NOT NULL,
+                requests JSONB NOT NULL,  -- custom_id -> [topic_id, ...]
+                cache_keys JSONB,  -- topic_id -> response cache key of the submitted prompt
+                refined_count INTEGER,
+                failed_count INTEGER,
+                cost_usd DECIMAL(10,4),
+                created_at TIMESTAMP DEFAULT NOW(),
+                updated_at TIMESTAMP DEFAULT NOW(),
+                collected_at TIMESTAMP
+            )
+            """)
+            cur.execute("ALTER TABLE topic_batch_jobs ADD COLUMN IF NOT EXISTS cache_keys JSONB")
+            cur.execute("""
+            CREATE INDEX IF NOT EXISTS idx_topic_batch_jobs_open
+            ON topic_batch_jobs (created_at) WHERE collected_at IS NULL
+            """)
+
+    def create_batch_job(self, batch_id: str, status: str, mode: str, model: str,
+                         input_file_id: str, requests: Dict[str, List[int]],
+                         cache_keys: Optional[Dict[str, str]] = None):
+        """Record a submitted batch job"""
+        self._ensure_batch_jobs_table()
+        topic_ids = [topic_id for ids in requests.values() for topic_id in ids]
+        with self.conn.cursor() as cur:
+            cur.execute("""
+            INSERT INTO topic_batch_jobs
+            (batch_id, status, mode, model, input_file_id, request_count, topic_ids, requests, cache_keys)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+            """, (batch_id, status, mode, model, input_file_id,
+                  len(requests), topic_ids, json.dumps(requests),
+                  json.dumps(cache_keys) if cache_keys is not None else None))
+        self.conn.commit()
+
+    def get_open_batch_jobs(self) -> List[Dict]:
+        """Batch jobs whose results have not been ingested yet"""
+        self._ensure_batch_jobs_table()
+        with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute("""
+            SELECT * FROM topic_batch_jobs
+            WHERE collected_at IS NULL
+            ORDER BY created_at
+            """)
+            return cur.fetchall()
+
+    def get_pending_batch_topic_ids(self) -> set:
+        """Topic ids already submitted in a batch job that is not collected yet"""
+        self._ensure_batch_jobs_table()
+        with self.conn.cursor() as cur:
+            cur.execute("""
+            SELECT DISTINCT unnest(topic_ids)
+            FROM topic_batch_jobs
+            WHERE collected_at IS NULL
+            """)
+            return {row[0] for row in cur.fetchall()}
+
+    def update_batch_job(self, batch_id: str, collected: bool = False, **fields):
+        """Update status/file ids/counts of a batch job; `collected` stamps collected_at"""
+        assignments = [f"{column} = %s" for column in fields]
+        assignments.append("updated_at = NOW()")
+        if collected:
+            assignments.append("collected_at = NOW()")
+
+        with self.conn.cursor() as cur:
+            cur.execute(
+                f"UPDATE topic_batch_jobs SET {', '.join(assignments)} WHERE batch_id = %s",
+                list(fields.values()) + [batch_id]
+            )
         self.conn.commit()
 
     def log_processing(self, topic_id: int, processing_type: str,
                       prompt: str, response: Dict, tokens: int, cost: float):
         """Log LLM processing for audit and cost tracking"""
+        self.log_processing_batch([(topic_id, processing_type, prompt, response, tokens, cost)])
+
+    def log_processing_batch(self, entries: List[tuple], commit: bool = True):
+        """
+        Log many (topic_id, processing_type, prompt, response, tokens, cost)
+        entries with one INSERT
+        """
+        if not entries:
+            return
 
         # Create log table if doesn't exist
         create_log_table = """
@@ -264,19 +425,23 @@ class TopicDatabase:
             insert_log = """
             INSERT INTO topic_llm_processing_log
             (topic_id, processing_type, prompt_template, llm_response, tokens_used, cost_usd)
-            VALUES (%s, %s, %s, %s, %s, %s)
+            VALUES %s
             """
 
-            cur.execute(insert_log, (
-                topic_id,
-                processing_type,
-                prompt[:1000],  # Store first 1000 chars of prompt
-                json.dumps(response),
-                tokens,
-                cost
-            ))
+            execute_values(cur, insert_log, [
+                (
+                    topic_id,
+                    processing_type,
+                    prompt[:1000],  # Store first 1000 chars of prompt
+                    json.dumps(response),
+                    tokens,
+                    cost
+                )
+                for topic_id, processing_type, prompt, response, tokens, cost in entries
+            ])
 
-        self.conn.commit()
+        if commit:
+            self.conn.commit()
 
     def get_processing_stats(self) -> Dict:
         """Get statistics about processed topics"""
@@ -3,147 +3,348 @@ LLM Analysis module for topic refinement using OpenAI
 """
 import json
 import time
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from openai import OpenAI
-from config import OPENAI_API_KEY, OPENAI_MODEL, OPENAI_MODEL_FALLBACK
+from config import (
+    OPENAI_API_KEY, OPENAI_MODEL, OPENAI_MODEL_FALLBACK, OPENAI_BASE_URL,
+    PROMPT_TOKEN_BUDGET, MAX_COMPLETION_TOKENS, COMPLETION_TOKENS_PER_TOPIC
+)
+from response_cache import ResponseCache
+
+# Bump whenever the prompts or expected JSON change, so cached analyses are not reused
+PROMPT_VERSION = "2"
+
+BATCH_SYSTEM_PROMPT = "You are an expert OSINT analyst. Analyze these social media topics and provide structured categorization and insights."
+
+
+class TruncatedResponse(Exception):
+    """The completion hit max_tokens or is not valid JSON, so the batch has to be split"""
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count without a tokenizer: ~4 bytes of UTF-8 per token, which
+    over-counts English slightly and keeps Arabic (2 bytes/char) on the safe side
+    """
+    return len(text.encode('utf-8')) // 4 + 1
+
 
 class TopicAnalyzer:
-    def __init__(self, model: str = OPENAI_MODEL):
+    def __init__(self, model: str = OPENAI_MODEL, base_url: Optional[str] = OPENAI_BASE_URL,
+                 cache: Optional[ResponseCache] = None):
         """Initialize OpenAI client"""
         if not OPENAI_API_KEY:
             raise ValueError("OPENAI_API_KEY not set in environment variables")
 
-        self.client = OpenAI(api_key=OPENAI_API_KEY)
+        self.client = OpenAI(api_key=OPENAI_API_KEY, base_url=base_url)
         self.model = model
+        self.cache = cache
+        self.price_multiplier = 1.0  # 0.5 for Batch API results
         self.total_tokens = 0
         self.total_cost = 0.0
 
+    def cache_key(self, topic: Dict, themes: List[Dict]) -> str:
+        return ResponseCache.make_key(self.model, PROMPT_VERSION, topic, themes)
+
+    def lookup_cached(self, topics: List[Dict], themes: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+        """Split topics into (cached analyses, topics that still need the LLM)"""
+        if not self.cache:
+            return [], list(topics)
+
+        hits, misses = [], []
+        for topic in topics:
+            cached = self.cache.get(self.cache_key(topic, themes))
+            if cached is None:
+                misses.append(topic)
+                continue
+
+            cached['topic_id'] = topic['topic_id']
+            cached['processing_metadata'] = {
+                'model': self.model,
+                'cached': True,
+                'tokens_used': 0,
+                'cost_usd': 0,
+                'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
+            }
+            hits.append(cached)
+
+        return hits, misses
+
+    def cache_results(self, refined_topics: List[Dict], topics: List[Dict], themes: List[Dict]):
+        """Store successful LLM analyses (never fallbacks) for later runs"""
+        if not self.cache:
+            return
+        self.cache_keyed_results(
+            refined_topics, {str(t['topic_id']): self.cache_key(t, themes) for t in topics}
+        )
+
+    def cache_keyed_results(self, refined_topics: List[Dict], keys: Dict[str, str]):
+        """cache_results with keys computed earlier, e.g. when a Batch API job was submitted"""
+        if not self.cache:
+            return
+
+        entries = []
+        for refined in refined_topics:
+            if not refined or refined.get('llm_model') == 'fallback':
+                continue
+            key = keys.get(str(refined.get('topic_id')))
+            if key is None:
+                continue
+
+            metadata = refined.get('processing_metadata', {})
+            response = {k: v for k, v in refined.items() if k != 'processing_metadata'}
+            entries.append((
+                key, self.model, PROMPT_VERSION, response,
+                metadata.get('tokens_used', metadata.get('tokens_per_topic', 0)),
+                metadata.get('cost_usd', metadata.get('cost_per_topic', 0))
+            ))
+        self.cache.put_many(entries)
+
     def analyze_single_topic(self, topic_data: Dict, themes: List[Dict]) -> Dict:
-        """Analyze a single topic with LLM"""
+        """Analyze a single topic with LLM, unless an identical analysis is cached"""
 
-        # Build the prompt
-        prompt = self._build_analysis_prompt(topic_data, themes)
+        hits, _ = self.lookup_cached([topic_data], themes)
+        if hits:
+            return hits[0]
 
+        result = self._analyze_single_uncached(topic_data, themes)
+        self.cache_results([result], [topic_data], themes)
+        return result
+
+    def _analyze_single_uncached(self, topic_data: Dict, themes: List[Dict]) -> Dict:
         try:
             # Call OpenAI
             response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert OSINT analyst specializing in social media monitoring and narrative analysis. You help clean up and categorize machine-discovered topics from social media data."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.3,  # Lower temperature for consistent categorization
-                max_tokens=1000
+                **self.single_request(topic_data, themes)
             )
+            return self.parse_single_response(response, topic_data)
 
-            # Parse response
-            raw_content = response.choices[0].message.content
+        except Exception as e:
+            print(f"Error analyzing topic {topic_data.get('topic_id')}: {e}")
+            return self._get_fallback_response(topic_data)
 
-            try:
-                result = json.loads(raw_content)
-            except json.JSONDecodeError as e:
-                print(f"    ERROR: Failed to parse JSON response: {e}")
-                return self._get_fallback_response(topic_data)
+    def single_request(self, topic_data: Dict, themes: List[Dict]) -> Dict:
+        """Chat completion arguments for a single topic"""
+        return {
+            "model": self.model,
+            "messages": [
+                {
+                    "role": "system",
+                    "content": "You are an expert OSINT analyst specializing in social media monitoring and narrative analysis. You help clean up and categorize machine-discovered topics from social media data."
+                },
+                {
+                    "role": "user",
+                    "content": self._build_analysis_prompt(topic_data, themes)
+                }
+            ],
+            "response_format": {"type": "json_object"},
+            "temperature": 0.3,  # Lower temperature for consistent categorization
+            "max_tokens": 1000
+        }
 
-            # Track usage
-            tokens_used = response.usage.total_tokens
-            self.total_tokens += tokens_used
+    def parse_single_response(self, response, topic_data: Dict) -> Dict:
+        """Turn a single-topic completion into a refined topic dict"""
 
-            # Estimate cost (gpt-4o pricing as of late 2024)
-            # Input: $2.50 per 1M tokens, Output: $10.00 per 1M tokens
-            input_cost = (response.usage.prompt_tokens / 1_000_000) * 2.50
-            output_cost = (response.usage.completion_tokens / 1_000_000) * 10.00
-            cost = input_cost + output_cost
-            self.total_cost += cost
+        # Parse response
+        raw_content = response.choices[0].message.content
 
-            # Add metadata
-            result['processing_metadata'] = {
-                'model': self.model,
-                'tokens_used': tokens_used,
-                'cost_usd': round(cost, 4),
-                'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
-            }
+        try:
+            result = json.loads(raw_content)
+        except json.JSONDecodeError as e:
+            print(f"    ERROR: Failed to parse JSON response: {e}")
+            return self._get_fallback_response(topic_data)
 
-            return result
+        tokens_used, cost = self.record_usage(response)
 
-        except Exception as e:
-            print(f"Error analyzing topic {topic_data.get('topic_id')}: {e}")
-            return self._get_fallback_response(topic_data)
+        # Add metadata
+        result['processing_metadata'] = {
+            'model': self.model,
+            'tokens_used': tokens_used,
+            'cost_usd': round(cost, 4),
+            'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
+        }
+
+        return result
+
+    def record_usage(self, response) -> Tuple[int, float]:
+        """Add a completion's tokens and cost to the running totals"""
+        tokens_used = response.usage.total_tokens
+        self.total_tokens += tokens_used
+
+        cost = self.estimate_cost(response.usage.prompt_tokens, response.usage.completion_tokens)
+        cost *= self.price_multiplier
+        self.total_cost += cost
+        return tokens_used, cost
+
+    @staticmethod
+    def estimate_cost(prompt_tokens: int, completion_tokens: int) -> float:
+        """Estimate cost (gpt-4o pricing as of late 2024)"""
+        # Input: $2.50 per 1M tokens, Output: $10.00 per 1M tokens
+        input_cost = (prompt_tokens / 1_000_000) * 2.50
+        output_cost = (completion_tokens / 1_000_000) * 10.00
+        return input_cost + output_cost
+
+    def pack_batches(self, topics: List[Dict], themes: List[Dict],
+                     max_topics: Optional[int] = None) -> List[List[Dict]]:
+        """
+        Greedily pack topics, in order, into batches whose estimated prompt
+        stays under PROMPT_TOKEN_BUDGET and whose expected output fits in
+        MAX_COMPLETION_TOKENS. `max_topics` optionally caps the batch length.
+        """
+        if not topics:
+            return []
+
+        # Everything in the prompt except the per-topic blocks
+        overhead = (
+            estimate_tokens(BATCH_SYSTEM_PROMPT)
+            + estimate_tokens(self._build_batch_prompt(topics[:1], themes))
+            - estimate_tokens(self._batch_topic_block(topics[0]))
+        )
+        topic_limit = (MAX_COMPLETION_TOKENS - 200) // COMPLETION_TOKENS_PER_TOPIC
+        if max_topics:
+            topic_limit = min(topic_limit, max_topics)
+
+        batches, batch, batch_tokens = [], [], overhead
+        for topic in topics:
+            # topic block plus its id in the trailing id list
+            topic_tokens = estimate_tokens(self._batch_topic_block(topic)) + 2
+            if batch and (batch_tokens + topic_tokens > PROMPT_TOKEN_BUDGET
+                          or len(batch) >= topic_limit):
+                batches.append(batch)
+                batch, batch_tokens = [], overhead
+            batch.append(topic)
+            batch_tokens += topic_tokens
+
+        if batch:
+            batches.append(batch)
+        return batches
 
     def analyze_batch(self, topics: List[Dict], themes: List[Dict]) -> List[Dict]:
-        """Analyze multiple topics in a batch for efficiency"""
+        """Analyze multiple topics in a batch for efficiency; cached topics are not resent"""
 
-        prompt = self._build_batch_prompt(topics, themes)
+        hits, misses = self.lookup_cached(topics, themes)
+        if not misses:
+            return hits
+
+        refined_topics = self._analyze_batch_uncached(misses, themes)
+        self.cache_results(refined_topics, misses, themes)
+        return hits + refined_topics
+
+    def _analyze_batch_uncached(self, topics: List[Dict], themes: List[Dict]) -> List[Dict]:
+        """One batch call; halves on truncated output and re-asks for topics left out"""
+        if len(topics) == 1:
+            return [self._analyze_single_uncached(topics[0], themes)]
 
         try:
             response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert OSINT analyst. Analyze these social media topics and provide structured categorization and insights."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.3,
-                max_tokens=4000
+                **self.batch_request(topics, themes)
             )
+            refined_topics = self.parse_batch_response(response, topics)
 
-            # Parse batch response
-            result = json.loads(response.choices[0].message.content)
+        except TruncatedResponse as e:
+            half = len(topics) // 2
+            print(f"  Unusable output ({e}), splitting into {half} + {len(topics) - half}")
+            return (self._analyze_batch_uncached(topics[:half], themes)
+                    + self._analyze_batch_uncached(topics[half:], themes))
+
+        except Exception as e:
+            print(f"Error in batch analysis: {e}")
+            # Fall back to individual analysis
+            return [self._analyze_single_uncached(topic, themes) for topic in topics]
 
-            # Track usage
-            tokens_used = response.usage.total_tokens
-            self.total_tokens += tokens_used
-
-            # Calculate cost
-            input_cost = (response.usage.prompt_tokens / 1_000_000) * 2.50
-            output_cost = (response.usage.completion_tokens / 1_000_000) * 10.00
-            cost = input_cost + output_cost
-            self.total_cost += cost
-
-            # Handle both single topic list and 'topics' wrapper
-            if 'topics' in result:
-                refined_topics = result.get('topics', [])
-            elif isinstance(result, list):
-                refined_topics = result
-            elif isinstance(result, dict) and 'id' in result:
-                # Single topic response wrapped as dict
-                refined_topics = [result]
+        missing = self.missing_topics(refined_topics, topics)
+        if missing:
+            print(f"  {len(missing)} topic(s) missing from batch output, retrying them")
+            if len(missing) < len(topics):
+                refined_topics += self._analyze_batch_uncached(missing, themes)
             else:
-                refined_topics = []
-
-            # Fix topic_id field and add metadata
-            for topic in refined_topics:
-                # Map 'id' to 'topic_id' if needed
-                if 'id' in topic and 'topic_id' not in topic:
-                    topic['topic_id'] = topic['id']
-
-                topic['processing_metadata'] = {
-                    'model': self.model,
-                    'batch_size': len(topics),
-                    'tokens_per_topic': tokens_used // len(topics) if len(topics) > 0 else tokens_used,
-                    'cost_per_topic': round(cost / len(topics), 4) if len(topics) > 0 else cost,
-                    'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
+                refined_topics = [self._analyze_single_uncached(topic, themes) for topic in missing]
+
+        return refined_topics
+
+    @staticmethod
+    def missing_topics(refined_topics: List[Dict], topics: List[Dict]) -> List[Dict]:
+        """Input topics with no result in the batch output"""
+        returned = {str(r.get('topic_id')) for r in refined_topics}
+        return [t for t in topics if str(t['topic_id']) not in returned]
+
+    def batch_request(self, topics: List[Dict], themes: List[Dict]) -> Dict:
+        """Chat completion arguments for a batch of topics"""
+        return {
+            "model": self.model,
+            "messages": [
+                {
+                    "role": "system",
+                    "content": BATCH_SYSTEM_PROMPT
+                },
+                {
+                    "role": "user",
+                    "content": self._build_batch_prompt(topics, themes)
                 }
+            ],
+            "response_format": {"type": "json_object"},
+            "temperature": 0.3,
+            # Sized to the batch so large batches are not cut off mid-JSON
+            "max_tokens": min(MAX_COMPLETION_TOKENS, 200 + COMPLETION_TOKENS_PER_TOPIC * len(topics))
+        }
 
-            return refined_topics
+    def parse_batch_response(self, response, topics: List[Dict]) -> List[Dict]:
+        """
+        Turn a batch completion into refined topic dicts for the input topics.
+        Raises TruncatedResponse if output hit max_tokens or is not valid JSON,
+        so the caller splits the batch rather than re-asking topic by topic.
+        """
 
-        except Exception as e:
-            print(f"Error in batch analysis: {e}")
-            # Fall back to individual analysis
-            return [self.analyze_single_topic(topic, themes) for topic in topics]
+        tokens_used, cost = self.record_usage(response)
+
+        if response.choices[0].finish_reason == 'length':
+            raise TruncatedResponse(f"batch of {len(topics)} topics hit max_tokens")
+
+        # Parse batch response
+        try:
+            result = json.loads(response.choices[0].message.content)
+        except json.JSONDecodeError as e:
+            raise TruncatedResponse(f"batch of {len(topics)} topics returned invalid JSON ({e})") from e
+
+        # Handle both single topic list and 'topics' wrapper
+        if 'topics' in result:
+            refined_topics = result.get('topics', [])
+        elif isinstance(result, list):
+            refined_topics = result
+        elif isinstance(result, dict) and 'id' in result:
+            # Single topic response wrapped as dict
+            refined_topics = [result]
+        else:
+            refined_topics = []
+
+        # Keep one result per input topic, with topic_id typed as in the input
+        input_ids = {str(t['topic_id']): t['topic_id'] for t in topics}
+        matched_topics = {}
+
+        # Fix topic_id field and add metadata
+        for topic in refined_topics:
+            if not isinstance(topic, dict):
+                continue
+
+            # Map 'id' to 'topic_id' if needed
+            if 'id' in topic and 'topic_id' not in topic:
+                topic['topic_id'] = topic['id']
+
+            key = str(topic.get('topic_id'))
+            if key not in input_ids or key in matched_topics:
+                continue
+            topic['topic_id'] = input_ids[key]
+            matched_topics[key] = topic
+
+            topic['processing_metadata'] = {
+                'model': self.model,
+                'batch_size': len(topics),
+                'tokens_per_topic': tokens_used // len(topics) if len(topics) > 0 else tokens_used,
+                'cost_per_topic': round(cost / len(topics), 4) if len(topics) > 0 else cost,
+                'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
+            }
+
+        return list(matched_topics.values())
 
     def _build_analysis_prompt(self, topic_data: Dict, themes: List[Dict]) -> str:
         """Build prompt for single topic analysis"""
@@ -243,18 +444,7 @@ DO NOT suggest vague actions like "monitor trends" or "engage stakeholders"."""
             for t in themes
         ])
 
-        topics_info = []
-        for t in topics[:10]:  # Limit to 10 topics per batch
-            keywords = t.get('top_words', [])[:10]
-            if isinstance(keywords, str):
-                keywords = json.loads(keywords) if keywords else []
-
-            topics_info.append(f"""
-Topic {t['topic_id']}:
-- Name: {t['topic_name']}
-- Size: {t['topic_size']} tweets
-- Keywords: {', '.join(keywords[:8])}
-""")
+        topics_info = [self._batch_topic_block(t) for t in topics]
 
         prompt = f"""Analyze these machine-discovered topics from social media:
 
@@ -310,10 +500,23 @@ IMPORTANT:
 - Use "topic_id" not "id"
 - Include ALL topics in the response
 - Each topic MUST have ALL the fields shown above
-- topic_id values: {', '.join([str(t['topic_id']) for t in topics[:10]])}"""
+- topic_id values: {', '.join([str(t['topic_id']) for t in topics])}"""
 
         return prompt
 
+    def _batch_topic_block(self, t: Dict) -> str:
+        """One topic's entry in the batch prompt"""
+        keywords = t.get('top_words') or []
+        if isinstance(keywords, str):
+            keywords = json.loads(keywords) if keywords else []
+
+        return f"""
+Topic {t['topic_id']}:
+- Name: {t['topic_name']}
+- Size: {t['topic_size']} tweets
+- Keywords: {', '.join(keywords[:8])}
+"""
+
     def _get_fallback_response(self, topic_data: Dict) -> Dict:
         """Generate a basic response without LLM if API fails"""
 
@@ -348,8 +551,11 @@ IMPORTANT:
 
     def get_usage_stats(self) -> Dict:
         """Get token usage and cost statistics"""
-        return {
+        stats = {
             'total_tokens': self.total_tokens,
             'total_cost_usd': round(self.total_cost, 2),
             'model': self.model
-        }
\ No newline at end of file
+        }
+        if self.cache:
+            stats['cache'] = self.cache.get_stats()
+        return stats
\ No newline at end of file
@@ -3,16 +3,176 @@
 Main script to refine topics using LLM analysis
 """
 import argparse
+import asyncio
 import sys
 import time
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 from database import TopicDatabase
 from llm_analyzer import TopicAnalyzer
-from config import MIN_TOPIC_SIZE, BATCH_SIZE, MAX_COST_PER_RUN, PROCESSING_MODES
+from response_cache import ResponseCache
+from config import (
+    MIN_TOPIC_SIZE, BATCH_SIZE, MAX_COST_PER_RUN, PROCESSING_MODES,
+    MAX_CONCURRENT_REQUESTS, OPENAI_BASE_URL, TOPIC_MATCH_THRESHOLD, BATCH_API_POLL_SECONDS
+)
+
+
+def _save_and_log(db: TopicDatabase, topics: List[Dict], mode: str):
+    """Save refined topics in one COPY + merge and log them in one INSERT, in one transaction"""
+    db.save_refined_topics(topics, commit=False)
+    db.log_processing_batch([
+        (
+            refined['topic_id'],
+            f"refinement_{mode}",
+            "See analyzer for details",
+            refined,
+            refined['processing_metadata'].get('tokens_used', 0),
+            refined['processing_metadata'].get('cost_usd', 0)
+        )
+        for refined in topics
+    ])
+
+
+def store_refined_batch(db: TopicDatabase, refined_topics: List[Dict],
+                        mode: str, dry_run: bool) -> Tuple[int, int]:
+    """Validate, save and log one batch of LLM results; returns (processed, failed)"""
+    processed_count = 0
+    failed_count = 0
+
+    # Validate results
+    valid_topics = []
+    for refined in refined_topics:
+        # Debug print
+        if refined is None:
+            print(f"  WARNING: Got None response from LLM")
+            failed_count += 1
+            continue
+
+        if 'topic_id' not in refined:
+            print(f"  WARNING: Missing topic_id in response: {refined}")
+            failed_count += 1
+            continue
+
+        valid_topics.append(refined)
+
+    # Save the whole batch in one round trip
+    if valid_topics and not dry_run:
+        try:
+            _save_and_log(db, valid_topics, mode)
+        except Exception as e:
+            # One bad row (e.g. an over-long value from the LLM) fails the whole merge;
+            # retry topic by topic so only that topic is re-sent on the next run
+            print(f"  ✗ Failed to save batch of {len(valid_topics)} topics, saving one by one: {e}")
+            db.conn.rollback()
+            saved = []
+            for refined in valid_topics:
+                try:
+                    _save_and_log(db, [refined], mode)
+                    saved.append(refined)
+                except Exception as e:
+                    print(f"  ✗ Failed to save topic {refined['topic_id']}: {e}")
+                    db.conn.rollback()
+                    failed_count += 1
+            valid_topics = saved
+
+    for refined in valid_topics:
+        processed_count += 1
+
+        # Print summary
+        print(f"  ✓ Topic {refined['topic_id']}: {refined.get('refined_name', 'N/A')}")
+        print(f"    Category: {refined.get('category', 'N/A')}")
+        print(f"    Priority: {refined.get('monitoring_priority', 'N/A')}")
+        print(f"    Quality: {refined.get('quality_score', 0):.2f}")
+
+    return processed_count, failed_count
+
+
+async def process_batches_async(db: TopicDatabase, analyzer: TopicAnalyzer,
+                                batches: List[List[Dict]], themes: List[Dict],
+                                mode: str, dry_run: bool, concurrency: int,
+                                base_url: Optional[str]) -> Tuple[int, int]:
+    """
+    Run batches concurrently, saving each one as soon as it completes.
+    Saving runs in a worker thread (one batch at a time, so the connection is
+    never shared) while the event loop keeps the other requests in flight.
+    """
+    from async_engine import AsyncRefinementEngine
+
+    engine = AsyncRefinementEngine(analyzer, concurrency=concurrency, base_url=base_url)
+    total_topics = sum(len(batch) for batch in batches)
+    processed_count = 0
+    failed_count = 0
+    started = time.time()
+
+    print(f"Running {len(batches)} batches with up to {concurrency} requests in flight")
+
+    async for batch, refined_topics in engine.run(batches, themes):
+        print(f"\nBatch done ({len(batch)} topics)")
+        processed, failed = await asyncio.to_thread(store_refined_batch, db, refined_topics, mode, dry_run)
+        processed_count += processed
+        failed_count += failed
+
+        print(f"\nProgress: {processed_count}/{total_topics} processed, "
+              f"{failed_count} failed")
+        print(f"Cost so far: ${analyzer.total_cost:.2f}")
+
+    elapsed = time.time() - started
+    print(f"\nAsync run: {elapsed:.1f}s, {engine.retries} retries")
+    return processed_count, failed_count
+
+
+def load_topics(db: TopicDatabase, topic_ids: List[int] = None, limit: int = None) -> List[Dict]:
+    """Specific topics if ids are given, otherwise every unprocessed topic"""
+    if topic_ids:
+        # Process specific topics
+        all_topics = []
+        for topic_id in topic_ids:
+            topic = db.get_topic_by_id(topic_id)
+            if topic:
+                all_topics.append(topic)
+    else:
+        # Get unprocessed topics
+        all_topics = db.get_unprocessed_topics(min_size=MIN_TOPIC_SIZE)
+
+    if limit:
+        all_topics = all_topics[:limit]
+
+    print(f"Found {len(all_topics)} topics to process")
+    return all_topics
+
+
+def match_existing_topics(db: TopicDatabase, topics: List[Dict], mode: str, dry_run: bool,
+                          match_threshold: float, base_url: Optional[str]):
+    """
+    Save copied refinements for topics that match an already-refined one.
+    Returns (novel topics, processed, failed, matcher)
+    """
+    from topic_matcher import TopicMatcher
+
+    matcher = None
+    try:
+        matcher = TopicMatcher(db, threshold=match_threshold, base_url=base_url, dry_run=dry_run)
+        indexed = matcher.build_index()
+        matched, novel = matcher.match(topics)
+    except Exception as e:
+        print(f"Embedding match failed, sending all topics to the LLM: {e}")
+        db.conn.rollback()
+        return topics, 0, 0, matcher
+
+    print(f"\nEmbedding match: {len(matched)}/{len(topics)} topics matched "
+          f"{indexed} refined topics (threshold {match_threshold})")
+
+    processed, failed = 0, 0
+    if matched:
+        processed, failed = store_refined_batch(db, matched, f"{mode}_match", dry_run)
+    return novel, processed, failed, matcher
 
 
 def process_topics(mode: str = 'quick', topic_ids: List[int] = None,
-                  limit: int = None, dry_run: bool = False):
+                  limit: int = None, dry_run: bool = False,
+                  concurrency: int = MAX_CONCURRENT_REQUESTS,
+                  base_url: Optional[str] = OPENAI_BASE_URL,
+                  use_cache: bool = True,
+                  match_threshold: Optional[float] = TOPIC_MATCH_THRESHOLD):
     """
     Main function to process and refine topics
 
@@ -21,6 +181,11 @@ def process_topics(mode: str = 'quick', topic_ids: List[int] = None,
         topic_ids: Specific topic IDs to process (None for all)
         limit: Maximum number of topics to process
         dry_run: If True, don't save to database
+        concurrency: LLM requests in flight (1 = sequential)
+        base_url: OpenAI-compatible endpoint override
+        use_cache: Reuse cached analyses for unchanged topics
+        match_threshold: Cosine similarity above which a refined topic's analysis
+            is copied instead of calling the LLM (None disables matching)
     """
 
     print(f"Starting topic refinement in '{mode}' mode...")
@@ -32,25 +197,11 @@ def process_topics(mode: str = 'quick', topic_ids: List[int] = None,
 
     # Initialize database and analyzer
     db = TopicDatabase()
-    analyzer = TopicAnalyzer(model=model)
+    cache = ResponseCache() if use_cache else None
+    analyzer = TopicAnalyzer(model=model, base_url=base_url, cache=cache)
 
     try:
-        # Get topics to process
-        if topic_ids:
-            # Process specific topics
-            all_topics = []
-            for topic_id in topic_ids:
-                topic = db.get_topic_by_id(topic_id)
-                if topic:
-                    all_topics.append(topic)
-        else:
-            # Get unprocessed topics
-            all_topics = db.get_unprocessed_topics(min_size=MIN_TOPIC_SIZE)
-
-        if limit:
-            all_topics = all_topics[:limit]
-
-        print(f"Found {len(all_topics)} topics to process")
+        all_topics = load_topics(db, topic_ids, limit)
 
         if not all_topics:
             print("No topics to process")
@@ -63,12 +214,30 @@ def process_topics(mode: str = 'quick', topic_ids: List[int] = None,
         # Process topics
         processed_count = 0
         failed_count = 0
+        matcher = None
+
+        # Copy refinements to near-identical topics before any LLM call
+        if match_threshold is not None:
+            all_topics, processed_count, failed_count, matcher = match_existing_topics(
+                db, all_topics, mode, dry_run, match_threshold, base_url
+            )
+
+        # Mode batch_size caps topics per request; the token budget decides the rest
+        batches = analyzer.pack_batches(all_topics, themes, max_topics=batch_size)
+        if batches:
+            print(f"Packed {len(all_topics)} topics into {len(batches)} requests")
+
+        if concurrency > 1 and batches:
+            processed, failed = asyncio.run(process_batches_async(
+                db, analyzer, batches, themes, mode, dry_run, concurrency, base_url
+            ))
+            processed_count += processed
+            failed_count += failed
+            batches = []
 
         # Process in batches
-        for i in range(0, len(all_topics), batch_size):
-            batch = all_topics[i:i + batch_size]
-
-            print(f"\nProcessing batch {i//batch_size + 1} ({len(batch)} topics)...")
+        for batch_number, batch in enumerate(batches, 1):
+            print(f"\nProcessing batch {batch_number} ({len(batch)} topics)...")
 
             # Check cost limit
             if analyzer.total_cost >= MAX_COST_PER_RUN:
@@ -87,45 +256,9 @@ def process_topics(mode: str = 'quick', topic_ids: List[int] = None,
                     refined = analyzer.analyze_single_topic(topic, themes)
                     refined_topics.append(refined)
 
-            # Save results
-            for refined in refined_topics:
-                try:
-                    # Debug print
-                    if refined is None:
-                        print(f"  WARNING: Got None response from LLM")
-                        failed_count += 1
-                        continue
-
-                    if 'topic_id' not in refined:
-                        print(f"  WARNING: Missing topic_id in response: {refined}")
-                        failed_count += 1
-                        continue
-
-                    if not dry_run:
-                        db.save_refined_topic(refined)
-                        # Log processing
-                        db.log_processing(
-                            topic_id=refined['topic_id'],
-                            processing_type=f"refinement_{mode}",
-                            prompt="See analyzer for details",
-                            response=refined,
-                            tokens=refined['processing_metadata'].get('tokens_used', 0),
-                            cost=refined['processing_metadata'].get('cost_usd', 0)
-                        )
-
-                    processed_count += 1
-
-                    # Print summary
-                    print(f"  ✓ Topic {refined['topic_id']}: {refined.get('refined_name', 'N/A')}")
-                    print(f"    Category: {refined.get('category', 'N/A')}")
-                    print(f"    Priority: {refined.get('monitoring_priority', 'N/A')}")
-                    print(f"    Quality: {refined.get('quality_score', 0):.2f}")
-
-                except Exception as e:
-                    print(f"  ✗ Failed to save topic {refined.get('topic_id', 'UNKNOWN')}: {e}")
-                    import traceback
-                    traceback.print_exc()
-                    failed_count += 1
+            processed, failed = store_refined_batch(db, refined_topics, mode, dry_run)
+            processed_count += processed
+            failed_count += failed
 
             # Progress update
             print(f"\nProgress: {processed_count}/{len(all_topics)} processed, "
@@ -158,11 +291,104 @@ def process_topics(mode: str = 'quick', topic_ids: List[int] = None,
         print(f"  Total tokens: {usage['total_tokens']:,}")
         print(f"  Total cost: ${usage['total_cost_usd']:.2f}")
 
+        if matcher:
+            match_usage = matcher.get_usage_stats()
+            print("\nEmbedding Match:")
+            print(f"  Indexed refined topics: {match_usage['indexed_topics']}")
+            print(f"  Embedding tokens: {match_usage['total_tokens']:,} (${match_usage['total_cost_usd']:.4f})")
+
+        if cache:
+            cache_stats = usage['cache']
+            evicted = cache.evict()
+            print("\nResponse Cache:")
+            print(f"  Hits: {cache_stats['hits']}, misses: {cache_stats['misses']}")
+            print(f"  Saved: {cache_stats['tokens_saved']:,} tokens, ${cache_stats['cost_saved_usd']:.2f}")
+            print(f"  Entries: {cache_stats['entries']} ({evicted} evicted)")
+
     except Exception as e:
         print(f"Error during processing: {e}")
         raise
 
     finally:
+        if cache:
+            cache.close()
+        db.close()
+
+
+def submit_batch(mode: str = 'full', topic_ids: List[int] = None, limit: int = None,
+                 base_url: Optional[str] = OPENAI_BASE_URL, use_cache: bool = True,
+                 match_threshold: Optional[float] = TOPIC_MATCH_THRESHOLD):
+    """Queue topics for the OpenAI Batch API (results arrive within 24h)"""
+    from batch_jobs import BatchRefiner
+
+    print(f"Submitting batch refinement in '{mode}' mode...")
+
+    config = PROCESSING_MODES.get(mode, PROCESSING_MODES['quick'])
+    db = TopicDatabase()
+    cache = ResponseCache() if use_cache else None
+    analyzer = TopicAnalyzer(model=config['model'], base_url=base_url, cache=cache)
+
+    try:
+        topics = load_topics(db, topic_ids, limit)
+        if not topics:
+            print("No topics to process")
+            return
+
+        themes = db.get_all_themes()
+
+        if match_threshold is not None:
+            topics, _, _, _ = match_existing_topics(
+                db, topics, mode, False, match_threshold, base_url
+            )
+
+        # Cached analyses are saved now instead of being resubmitted
+        hits, topics = analyzer.lookup_cached(topics, themes)
+        if hits:
+            print(f"\nSaving {len(hits)} cached analyses")
+            store_refined_batch(db, hits, mode, False)
+
+        BatchRefiner(db, analyzer, base_url=base_url).submit(
+            topics, themes, mode, config['batch_size']
+        )
+
+    finally:
+        if cache:
+            cache.close()
+        db.close()
+
+
+def collect_batch(wait: bool = False, poll_seconds: int = BATCH_API_POLL_SECONDS,
+                  base_url: Optional[str] = OPENAI_BASE_URL, dry_run: bool = False,
+                  use_cache: bool = True):
+    """Ingest results of finished Batch API jobs; safe to re-run after interruption"""
+    from batch_jobs import BatchRefiner
+
+    db = TopicDatabase()
+    cache = ResponseCache() if use_cache else None
+    analyzer = TopicAnalyzer(base_url=base_url, cache=cache)
+    refiner = BatchRefiner(db, analyzer, base_url=base_url)
+
+    processed_count = 0
+    failed_count = 0
+
+    try:
+        for job, refined_topics, failed in refiner.collect(wait=wait, poll_seconds=poll_seconds):
+            print(f"\nCollecting {job['batch_id']} ({job['status']}): "
+                  f"{len(refined_topics)} refined, {failed} without a result")
+
+            processed, failed_save = store_refined_batch(db, refined_topics, job['mode'], dry_run)
+            processed_count += processed
+            failed_count += failed + failed_save
+
+            if not dry_run:
+                refiner.mark_collected(job, processed, failed + failed_save)
+
+        print(f"\nBatch collect: {processed_count} topics saved, {failed_count} left unprocessed")
+        print(f"Cost: ${analyzer.total_cost:.2f} (batch pricing)")
+
+    finally:
+        if cache:
+            cache.close()
         db.close()
 
 
@@ -235,6 +461,45 @@ def main():
                               help='Maximum number of topics to process')
     process_parser.add_argument('--dry-run', action='store_true',
                               help="Don't save to database")
+    process_parser.add_argument('--concurrency', type=int, default=MAX_CONCURRENT_REQUESTS,
+                              help='LLM requests in flight (1 = sequential)')
+    process_parser.add_argument('--base-url', default=OPENAI_BASE_URL,
+                              help='OpenAI-compatible API base URL')
+    process_parser.add_argument('--no-cache', action='store_true',
+                              help='Ignore the LLM response cache and always call the API')
+    process_parser.add_argument('--match-threshold', type=float, default=TOPIC_MATCH_THRESHOLD,
+                              help='Cosine similarity for copying an existing refinement')
+    process_parser.add_argument('--no-match', action='store_true',
+                              help='Skip embedding match and send every topic to the LLM')
+
+    # Batch API commands
+    submit_parser = subparsers.add_parser('submit-batch',
+                                          help='Submit topics to the OpenAI Batch API (half price, async)')
+    submit_parser.add_argument('--mode', choices=['full', 'quick', 'test'],
+                              default='full', help='Processing mode')
+    submit_parser.add_argument('--topic-ids', type=int, nargs='+',
+                              help='Specific topic IDs to submit')
+    submit_parser.add_argument('--limit', type=int,
+                              help='Maximum number of topics to submit')
+    submit_parser.add_argument('--base-url', default=OPENAI_BASE_URL,
+                              help='OpenAI-compatible API base URL')
+    submit_parser.add_argument('--no-cache', action='store_true',
+                              help='Resubmit topics even if a cached analysis exists')
+    submit_parser.add_argument('--no-match', action='store_true',
+                              help='Skip embedding match and submit every topic')
+
+    collect_parser = subparsers.add_parser('collect-batch',
+                                           help='Ingest results of finished Batch API jobs')
+    collect_parser.add_argument('--wait', action='store_true',
+                              help='Keep polling until every open job has finished')
+    collect_parser.add_argument('--poll-seconds', type=int, default=BATCH_API_POLL_SECONDS,
+                              help='Polling interval with --wait')
+    collect_parser.add_argument('--base-url', default=OPENAI_BASE_URL,
+                              help='OpenAI-compatible API base URL')
+    collect_parser.add_argument('--dry-run', action='store_true',
+                              help="Don't save results or mark jobs collected")
+    collect_parser.add_argument('--no-cache', action='store_true',
+                              help="Don't store collected analyses in the response cache")
 
     # View command
     view_parser = subparsers.add_parser('view', help='View refined topics')
@@ -246,6 +511,13 @@ def main():
     # Stats command
     stats_parser = subparsers.add_parser('stats', help='Show processing statistics')
 
+    # Cache command
+    cache_parser = subparsers.add_parser('cache', help='Show or maintain the LLM response cache')
+    cache_parser.add_argument('--evict', action='store_true',
+                              help='Drop expired and least recently used entries')
+    cache_parser.add_argument('--clear', action='store_true',
+                              help='Delete every cached response')
+
     args = parser.parse_args()
 
     if args.command == 'process':
@@ -253,7 +525,28 @@ def main():
             mode=args.mode,
             topic_ids=args.topic_ids,
             limit=args.limit,
-            dry_run=args.dry_run
+            dry_run=args.dry_run,
+            concurrency=args.concurrency,
+            base_url=args.base_url,
+            use_cache=not args.no_cache,
+            match_threshold=None if args.no_match else args.match_threshold
+        )
+    elif args.command == 'submit-batch':
+        submit_batch(
+            mode=args.mode,
+            topic_ids=args.topic_ids,
+            limit=args.limit,
+            base_url=args.base_url,
+            use_cache=not args.no_cache,
+            match_threshold=None if args.no_match else TOPIC_MATCH_THRESHOLD
+        )
+    elif args.command == 'collect-batch':
+        collect_batch(
+            wait=args.wait,
+            poll_seconds=args.poll_seconds,
+            base_url=args.base_url,
+            dry_run=args.dry_run,
+            use_cache=not args.no_cache
         )
     elif args.command == 'view':
         view_refined_topics(
@@ -272,6 +565,18 @@ def main():
                 else:
                     print(f"{key}: {value}")
         db.close()
+    elif args.command == 'cache':
+        cache = ResponseCache()
+        if args.clear:
+            print(f"Cleared {cache.clear()} cached responses")
+        elif args.evict:
+            print(f"Evicted {cache.evict()} cached responses")
+        print("\nLLM Response Cache:")
+        print("="*40)
+        for key, value in cache.get_stats().items():
+            if key in ('path', 'entries', 'lifetime_hits', 'stored_cost_usd'):
+                print(f"{key}: {value}")
+        cache.close()
     else:
         parser.print_help()
 
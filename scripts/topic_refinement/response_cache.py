@@ -0,0 +1,182 @@
+"""
+Content-addressed cache for LLM topic analyses
+
+Each refined topic is stored under a SHA-256 of everything that shapes its
+analysis: model, prompt template version, topic keywords, sample texts and
+the theme list. Topic ids and names are left out on purpose so a BERTopic
+re-train that reproduces a topic under a new id still hits. Entries live in
+a local SQLite file and are evicted by age (TTL) and least-recent use.
+The async engine reads and writes it from worker threads, so every access
+goes through one lock.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+from config import RESPONSE_CACHE_PATH, RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_TTL_DAYS
+
+
+def _as_list(value) -> List:
+    if isinstance(value, str):
+        return json.loads(value) if value else []
+    return list(value or [])
+
+
+class ResponseCache:
+    def __init__(self, path: str = RESPONSE_CACHE_PATH,
+                 max_entries: int = RESPONSE_CACHE_MAX_ENTRIES,
+                 ttl_days: int = RESPONSE_CACHE_TTL_DAYS):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_days = ttl_days
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_responses (
+                cache_key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                prompt_version TEXT NOT NULL,
+                response TEXT NOT NULL,
+                tokens_used INTEGER NOT NULL DEFAULT 0,
+                cost_usd REAL NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                last_used_at REAL NOT NULL,
+                hit_count INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_llm_responses_last_used ON llm_responses (last_used_at)"
+        )
+        self.conn.commit()
+
+        # Per-run statistics
+        self.hits = 0
+        self.misses = 0
+        self.tokens_saved = 0
+        self.cost_saved = 0.0
+
+    @staticmethod
+    def make_key(model: str, prompt_version: str, topic: Dict, themes: List[Dict]) -> str:
+        """Hash of the inputs that determine a topic's analysis"""
+        payload = {
+            'model': model,
+            'prompt_version': prompt_version,
+            'keywords': _as_list(topic.get('top_words'))[:20],
+            'samples': _as_list(topic.get('sample_texts'))[:5],
+            'themes': sorted(
+                (t['theme_id'], t['theme_name'], t.get('description') or '')
+                for t in themes
+            )
+        }
+        encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Cached analysis for `key`, or None on a miss or expired entry"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT response, tokens_used, cost_usd, created_at FROM llm_responses WHERE cache_key = ?",
+                (key,)
+            ).fetchone()
+
+            if row is None or (self.ttl_days and row[3] < time.time() - self.ttl_days * 86400):
+                self.misses += 1
+                return None
+
+            self.conn.execute(
+                "UPDATE llm_responses SET last_used_at = ?, hit_count = hit_count + 1 WHERE cache_key = ?",
+                (time.time(), key)
+            )
+            self.conn.commit()
+
+            self.hits += 1
+            self.tokens_saved += row[1]
+            self.cost_saved += row[2]
+        return json.loads(row[0])
+
+    def put(self, key: str, model: str, prompt_version: str, response: Dict,
+            tokens_used: int = 0, cost_usd: float = 0.0):
+        self.put_many([(key, model, prompt_version, response, tokens_used, cost_usd)])
+
+    def put_many(self, entries: List[tuple]):
+        """Store (key, model, prompt_version, response, tokens_used, cost_usd) entries in one transaction"""
+        if not entries:
+            return
+        now = time.time()
+        with self.lock:
+            self.conn.executemany("""
+                INSERT INTO llm_responses
+                    (cache_key, model, prompt_version, response, tokens_used, cost_usd, created_at, last_used_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (cache_key) DO UPDATE SET
+                    response = excluded.response,
+                    tokens_used = excluded.tokens_used,
+                    cost_usd = excluded.cost_usd,
+                    created_at = excluded.created_at,
+                    last_used_at = excluded.last_used_at
+            """, [
+                (key, model, prompt_version, json.dumps(response, default=str),
+                 tokens_used, cost_usd, now, now)
+                for key, model, prompt_version, response, tokens_used, cost_usd in entries
+            ])
+            self.conn.commit()
+
+    def evict(self) -> int:
+        """Drop expired entries, then least recently used ones beyond max_entries"""
+        removed = 0
+        with self.lock:
+            if self.ttl_days:
+                cur = self.conn.execute(
+                    "DELETE FROM llm_responses WHERE created_at < ?",
+                    (time.time() - self.ttl_days * 86400,)
+                )
+                removed += cur.rowcount
+
+            if self.max_entries:
+                cur = self.conn.execute("""
+                    DELETE FROM llm_responses WHERE cache_key IN (
+                        SELECT cache_key FROM llm_responses
+                        ORDER BY last_used_at DESC
+                        LIMIT -1 OFFSET ?
+                    )
+                """, (self.max_entries,))
+                removed += cur.rowcount
+
+            self.conn.commit()
+        return removed
+
+    def clear(self) -> int:
+        with self.lock:
+            cur = self.conn.execute("DELETE FROM llm_responses")
+            self.conn.commit()
+        return cur.rowcount
+
+    def get_stats(self) -> Dict:
+        """Run hit/miss counts plus what is stored on disk"""
+        with self.lock:
+            entries, total_hits, stored_cost = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(hit_count), 0), COALESCE(SUM(cost_usd), 0) FROM llm_responses"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            'path': self.path,
+            'entries': entries,
+            'lifetime_hits': total_hits,
+            'stored_cost_usd': round(stored_cost, 2),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else None,
+            'tokens_saved': self.tokens_saved,
+            'cost_saved_usd': round(self.cost_saved, 2)
+        }
+
+    def close(self):
+        self.conn.close()
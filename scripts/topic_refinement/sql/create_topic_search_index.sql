@@ -0,0 +1,46 @@
+-- Trigram Search Index for topic_definitions_refined
+-- Backs GET /api/topics/search: fuzzy (word_similarity) and substring (ILIKE)
+-- matching over name, label, category, subcategory and clean keywords.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- ================================================================
+-- SEARCHABLE TEXT
+-- Single lower-cased document per topic. Declared IMMUTABLE so it can
+-- be indexed; the API calls this same function so the index matches.
+-- ================================================================
+
+CREATE OR REPLACE FUNCTION osint.topic_search_text(
+    p_refined_name TEXT,
+    p_refined_label TEXT,
+    p_category TEXT,
+    p_subcategory TEXT,
+    p_clean_keywords TEXT[]
+)
+RETURNS TEXT
+LANGUAGE sql
+IMMUTABLE
+PARALLEL SAFE
+AS $$
+    SELECT lower(concat_ws(' ',
+        p_refined_name,
+        p_refined_label,
+        p_category,
+        p_subcategory,
+        array_to_string(p_clean_keywords, ' ')
+    ))
+$$;
+
+-- ================================================================
+-- GIN TRIGRAM INDEX
+-- Serves both `term <% doc` (word similarity) and `doc ILIKE '%term%'`
+-- ================================================================
+
+CREATE INDEX IF NOT EXISTS idx_topic_refined_search_trgm
+ON osint.topic_definitions_refined
+USING GIN (
+    osint.topic_search_text(refined_name, refined_label, category, subcategory, clean_keywords)
+    gin_trgm_ops
+);
+
+ANALYZE osint.topic_definitions_refined;
@@ -0,0 +1,171 @@
+"""
+Embedding match of new topics against already-refined ones
+
+Every BERTopic retrain creates fresh topic_definitions rows, most of which
+describe a topic that was refined before. Each topic is embedded from its
+keywords and representative texts (embeddings are stored in
+topic_embeddings and reused while the text is unchanged), the refined
+topics form an in-memory flat index of L2-normalised vectors, and a new
+topic whose nearest neighbour clears the cosine threshold gets a copy of
+that refinement instead of an LLM call.
+"""
+import hashlib
+import json
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from openai import OpenAI
+
+from config import (
+    OPENAI_API_KEY, OPENAI_BASE_URL, EMBEDDING_MODEL, EMBEDDING_BATCH_SIZE,
+    TOPIC_MATCH_THRESHOLD
+)
+from database import REFINED_COLUMNS, TopicDatabase
+
+# text-embedding-3-small pricing: $0.02 per 1M tokens
+EMBEDDING_COST_PER_MILLION = 0.02
+
+
+def topic_text(topic: Dict) -> str:
+    """Text embedded for a topic: top keywords, then sample texts"""
+    keywords = topic.get('top_words') or []
+    if isinstance(keywords, str):
+        keywords = json.loads(keywords) if keywords else []
+    samples = topic.get('sample_texts') or []
+
+    lines = ["Keywords: " + ", ".join(keywords[:20])]
+    lines += [s for s in samples[:5] if s]
+    return "\n".join(lines)
+
+
+class TopicMatcher:
+    def __init__(self, db: TopicDatabase, threshold: float = TOPIC_MATCH_THRESHOLD,
+                 model: str = EMBEDDING_MODEL, base_url: Optional[str] = OPENAI_BASE_URL,
+                 dry_run: bool = False):
+        self.db = db
+        # Dry runs still embed (to report matches) but leave topic_embeddings untouched
+        self.dry_run = dry_run
+        self.threshold = threshold
+        self.model = model
+        self.client = OpenAI(api_key=OPENAI_API_KEY, base_url=base_url)
+
+        self.index_ids: List[int] = []
+        self.index_rows: List[Dict] = []
+        self.index_matrix: Optional[np.ndarray] = None
+
+        self.total_tokens = 0
+        self.total_cost = 0.0
+
+    def embed(self, topics: List[Dict]) -> Dict[int, np.ndarray]:
+        """Normalised embedding per topic_id, calling the API only for new or changed text"""
+        texts = {t['topic_id']: topic_text(t) for t in topics}
+        hashes = {
+            topic_id: hashlib.sha256(text.encode('utf-8')).hexdigest()
+            for topic_id, text in texts.items()
+        }
+
+        stored = self.db.get_topic_embeddings(list(texts), self.model)
+        vectors = {
+            topic_id: np.asarray(embedding, dtype=np.float32)
+            for topic_id, (text_hash, embedding) in stored.items()
+            if text_hash == hashes[topic_id]
+        }
+
+        missing = [topic_id for topic_id in texts if topic_id not in vectors]
+        new_rows = []
+        for i in range(0, len(missing), EMBEDDING_BATCH_SIZE):
+            chunk = missing[i:i + EMBEDDING_BATCH_SIZE]
+            response = self.client.embeddings.create(
+                model=self.model,
+                input=[texts[topic_id] for topic_id in chunk]
+            )
+            self.total_tokens += response.usage.total_tokens
+            self.total_cost += response.usage.total_tokens / 1_000_000 * EMBEDDING_COST_PER_MILLION
+
+            for topic_id, item in zip(chunk, response.data):
+                vectors[topic_id] = np.asarray(item.embedding, dtype=np.float32)
+                new_rows.append((topic_id, self.model, hashes[topic_id], item.embedding))
+
+        if not self.dry_run:
+            self.db.save_topic_embeddings(new_rows)
+
+        for topic_id, vector in vectors.items():
+            norm = np.linalg.norm(vector)
+            if norm > 0:
+                vectors[topic_id] = vector / norm
+        return vectors
+
+    def build_index(self) -> int:
+        """Load refined topics and their embeddings into the flat index"""
+        candidates = self.db.get_refined_match_candidates()
+        vectors = self.embed(candidates)
+
+        self.index_rows = [c for c in candidates if c['topic_id'] in vectors]
+        self.index_ids = [c['topic_id'] for c in self.index_rows]
+        if self.index_rows:
+            self.index_matrix = np.vstack([vectors[topic_id] for topic_id in self.index_ids])
+        else:
+            self.index_matrix = None
+        return len(self.index_ids)
+
+    def match(self, topics: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Split topics into (refinements copied from a near-identical refined
+        topic, novel topics that still need the LLM)
+        """
+        if self.index_matrix is None:
+            self.build_index()
+        if self.index_matrix is None or not topics:
+            return [], list(topics)
+
+        vectors = self.embed(topics)
+        index_position = {topic_id: i for i, topic_id in enumerate(self.index_ids)}
+
+        matched, novel = [], []
+        for topic in topics:
+            vector = vectors.get(topic['topic_id'])
+            if vector is None:
+                novel.append(topic)
+                continue
+
+            scores = self.index_matrix @ vector
+            # A topic must not match its own earlier refinement when it is re-processed
+            own = index_position.get(topic['topic_id'])
+            if own is not None:
+                scores[own] = -1.0
+
+            best = int(np.argmax(scores))
+            similarity = float(scores[best])
+            if similarity < self.threshold:
+                novel.append(topic)
+                continue
+
+            matched.append(self._copy_refinement(self.index_rows[best], topic, similarity))
+
+        return matched, novel
+
+    def _copy_refinement(self, source: Dict, topic: Dict, similarity: float) -> Dict:
+        refined = {c: source[c] for c in REFINED_COLUMNS}
+        refined['topic_id'] = topic['topic_id']
+        # Copies are marked so they never become match candidates themselves
+        refined['llm_model'] = 'embedding_match'
+        refined['processing_metadata'] = {
+            'method': 'embedding_match',
+            'matched_topic_id': source['topic_id'],
+            'source_llm_model': source['llm_model'],
+            'similarity': round(similarity, 4),
+            'embedding_model': self.model,
+            'tokens_used': 0,
+            'cost_usd': 0,
+            'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
+        }
+        return refined
+
+    def get_usage_stats(self) -> Dict:
+        return {
+            'indexed_topics': len(self.index_ids),
+            'embedding_model': self.model,
+            'total_tokens': self.total_tokens,
+            'total_cost_usd': round(self.total_cost, 4)
+        }
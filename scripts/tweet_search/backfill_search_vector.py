@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Set up full-text search on tweets_deduplicated
+Applies sql/create_tweet_search.sql, backfills search_vector in batches
+and builds the GIN index concurrently
+"""
+
+import psycopg2
+import sys
+import time
+import argparse
+import os
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv('../../.env')
+
+DATABASE_CONFIG = {
+    "host": os.getenv("POSTGRES_HOST", "localhost"),
+    "port": int(os.getenv("POSTGRES_PORT", 5432)),
+    "database": os.getenv("POSTGRES_DATABASE", "neuron"),
+    "user": os.getenv("POSTGRES_USER", "tabreaz"),
+    "password": os.getenv("POSTGRES_PASSWORD", "admin"),
+    "schema": os.getenv("POSTGRES_SCHEMA", "osint")
+}
+
+SQL_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sql', 'create_tweet_search.sql')
+
+
+class SearchVectorBackfill:
+    def __init__(self):
+        self.conn = None
+        self.connect()
+
+    def connect(self):
+        """Establish database connection"""
+        try:
+            self.conn = psycopg2.connect(
+                host=DATABASE_CONFIG["host"],
+                port=DATABASE_CONFIG["port"],
+                database=DATABASE_CONFIG["database"],
+                user=DATABASE_CONFIG["user"],
+                password=DATABASE_CONFIG["password"]
+            )
+            with self.conn.cursor() as cur:
+                cur.execute(f"SET search_path TO {DATABASE_CONFIG['schema']}")
+            self.conn.commit()
+            print(f"Connected to database: {DATABASE_CONFIG['database']}")
+        except Exception as e:
+            print(f"Database connection failed: {e}")
+            raise
+
+    def apply_schema(self):
+        """Create the search column, config function and trigger"""
+        with open(SQL_FILE) as f:
+            ddl = f.read()
+
+        with self.conn.cursor() as cur:
+            cur.execute(ddl)
+        self.conn.commit()
+        print("Search column and trigger installed")
+
+    def backfill(self, batch_size: int = 10000, start_after: str = ''):
+        """Fill search_vector for existing rows, walking tweet_id in batches"""
+
+        # Keyset over tweet_id so each batch is an index range, not a rescan
+        query = """
+        WITH batch AS (
+            SELECT tweet_id
+            FROM tweets_deduplicated
+            WHERE tweet_id > %s
+            ORDER BY tweet_id
+            LIMIT %s
+        ),
+        updated AS (
+            UPDATE tweets_deduplicated t
+            SET search_vector = to_tsvector(tweet_search_config(t.lang), COALESCE(t.text, ''))
+            FROM batch
+            WHERE t.tweet_id = batch.tweet_id
+            AND t.search_vector IS NULL
+            RETURNING t.tweet_id
+        )
+        SELECT
+            (SELECT MAX(tweet_id) FROM batch) as last_id,
+            (SELECT COUNT(*) FROM updated) as updated_count
+        """
+
+        last_id = start_after
+        total_updated = 0
+        started = time.time()
+
+        while True:
+            with self.conn.cursor() as cur:
+                cur.execute(query, (last_id, batch_size))
+                batch_last_id, updated_count = cur.fetchone()
+            self.conn.commit()
+
+            if batch_last_id is None:
+                break
+
+            last_id = batch_last_id
+            total_updated += updated_count
+            elapsed = time.time() - started
+            rate = total_updated / elapsed if elapsed > 0 else 0
+            print(f"  Updated {total_updated:,} rows (last tweet_id {last_id}, {rate:,.0f} rows/s)")
+
+        print(f"Backfill complete: {total_updated:,} rows in {time.time() - started:.1f}s")
+
+    def create_index(self):
+        """Build the GIN index without blocking writes"""
+        # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+        self.conn.autocommit = True
+        try:
+            with self.conn.cursor() as cur:
+                cur.execute(
+                    "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_tweets_search_vector "
+                    "ON tweets_deduplicated USING GIN (search_vector)"
+                )
+                cur.execute("ANALYZE tweets_deduplicated")
+        finally:
+            self.conn.autocommit = False
+        print("GIN index created")
+
+    def close(self):
+        if self.conn:
+            self.conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Set up full-text search on tweets')
+    parser.add_argument('--batch-size', type=int, default=10000,
+                       help='Rows updated per transaction (default: 10000)')
+    parser.add_argument('--start-after', type=str, default='',
+                       help='Resume backfill after this tweet_id')
+    parser.add_argument('--schema-only', action='store_true',
+                       help='Only install column, function and trigger')
+    parser.add_argument('--skip-index', action='store_true',
+                       help='Do not build the GIN index')
+
+    args = parser.parse_args()
+
+    backfill = SearchVectorBackfill()
+
+    try:
+        backfill.apply_schema()
+
+        if not args.schema_only:
+            backfill.backfill(batch_size=args.batch_size, start_after=args.start_after)
+
+            if not args.skip_index:
+                backfill.create_index()
+
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    finally:
+        backfill.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,16 @@
+-- Indexes for keyset pagination of tweet listings (osint-api/app/pagination.py)
+-- Listings order by (created_at DESC, tweet_id DESC) and seek past the cursor
+-- with (created_at, tweet_id) < (...). Without a matching composite index every
+-- page sorts the whole filtered set, so deep pages are no cheaper than OFFSET.
+--
+-- CREATE INDEX CONCURRENTLY cannot run inside a transaction block; run with
+--   psql -f create_tweet_keyset_indexes.sql
+-- (not with -1 / --single-transaction).
+
+-- Unfiltered and theme listings (theme filter joins tweet_collections on tweet_id)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_tweets_created_keyset
+ON osint.tweets_deduplicated (created_at DESC, tweet_id DESC);
+
+-- Per-author listings (monitored users)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_tweets_author_created_keyset
+ON osint.tweets_deduplicated (author_id, created_at DESC, tweet_id DESC);
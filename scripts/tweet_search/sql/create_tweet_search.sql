@@ -0,0 +1,60 @@
+-- Full-Text Search for tweets_deduplicated
+-- Adds a language-aware tsvector column, keeps it current with a trigger,
+-- and indexes it with GIN. Existing rows are filled by backfill_search_vector.py
+-- in batches; the GIN index is built CONCURRENTLY after the backfill.
+
+-- ================================================================
+-- LANGUAGE -> TEXT SEARCH CONFIGURATION
+-- Maps the tweet `lang` code to a Postgres text search config.
+-- Unknown or missing languages use 'simple' (no stemming, no stopwords).
+-- ================================================================
+
+CREATE OR REPLACE FUNCTION osint.tweet_search_config(p_lang TEXT)
+RETURNS regconfig
+LANGUAGE sql
+IMMUTABLE
+PARALLEL SAFE
+AS $$
+    SELECT (CASE p_lang
+        WHEN 'en' THEN 'english'
+        WHEN 'ar' THEN 'arabic'
+        WHEN 'fr' THEN 'french'
+        WHEN 'es' THEN 'spanish'
+        WHEN 'de' THEN 'german'
+        WHEN 'it' THEN 'italian'
+        WHEN 'pt' THEN 'portuguese'
+        WHEN 'nl' THEN 'dutch'
+        WHEN 'ru' THEN 'russian'
+        WHEN 'tr' THEN 'turkish'
+        ELSE 'simple'
+    END)::regconfig
+$$;
+
+-- ================================================================
+-- SEARCH VECTOR COLUMN
+-- Plain (not GENERATED) column so existing rows can be filled in
+-- batches instead of one table rewrite under an exclusive lock.
+-- ================================================================
+
+ALTER TABLE osint.tweets_deduplicated
+ADD COLUMN IF NOT EXISTS search_vector tsvector;
+
+CREATE OR REPLACE FUNCTION osint.tweets_search_vector_update()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    NEW.search_vector := to_tsvector(
+        osint.tweet_search_config(NEW.lang),
+        COALESCE(NEW.text, '')
+    );
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_tweets_search_vector ON osint.tweets_deduplicated;
+
+CREATE TRIGGER trg_tweets_search_vector
+BEFORE INSERT OR UPDATE OF text, lang ON osint.tweets_deduplicated
+FOR EACH ROW
+EXECUTE FUNCTION osint.tweets_search_vector_update();